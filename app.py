@@ -14,6 +14,8 @@ from models import Company, User, MeetingHub
 from auth import *
 from google.oauth2 import service_account
 from super_admin import super_admin_bp  # Ensure this is correct
+import identity
+from db_routing import replica_binds
 
 
 
@@ -80,6 +82,7 @@ def create_app():
     CORS(app, supports_credentials=True, resources={r"/*": {"origins": frontend_url}})
 
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL').replace("postgres://", "postgresql://")
+    app.config['SQLALCHEMY_BINDS'] = replica_binds()  # Optional read replica, see db_routing.py
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.secret_key = os.getenv('SECRET_KEY', 'supersecretkey')
     app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=7)
@@ -105,7 +108,8 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        # A cached Principal, not a User row; see identity.py
+        return identity.load_principal(user_id)
 
     @app.before_request
     def make_session_permanent():
@@ -125,6 +129,16 @@ def create_app():
     app.register_blueprint(auth, url_prefix='/auth')
     app.register_blueprint(super_admin_bp)
 
+    # CLI commands
+    from batch_backfill import backfill_cli
+    app.cli.add_command(backfill_cli)
+    from query_plans import plans_cli
+    app.cli.add_command(plans_cli)
+    from usage_rollups import usage_cli
+    app.cli.add_command(usage_cli)
+    from recording_partitions import partitions_cli
+    app.cli.add_command(partitions_cli)
+
     @app.route('/test', methods=['GET'])
     def test():
         logging.info('Test endpoint hit')
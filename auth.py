@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from models import User, Company, MeetingHub, Subscription
 import logging
 from extensions import db
+import entitlements
 from flask_login import login_user, logout_user, login_required, current_user
 import os
 
@@ -109,6 +110,7 @@ def signup():
     )
     db.session.add(default_subscription)
     db.session.commit()
+    entitlements.invalidate(default_company.id)
 
     # Log the user in automatically
     login_user(new_user)
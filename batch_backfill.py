@@ -0,0 +1,391 @@
+# minutememo_app/batch_backfill.py
+"""
+Bulk regeneration of LLM outputs through the OpenAI Batch API.
+
+A BackfillJob selects sessions (by hub, date range and stored prompt
+version), packages their requests into JSONL batch files and submits them at
+the Batch API's reduced price. advance_job() is safe to call repeatedly: it
+submits work that has not been submitted yet, polls the open batches and
+bulk-writes the results of finished ones. All progress lives on the job row,
+so an interrupted job resumes where it stopped.
+
+What is regenerated is defined per kind with register_kind(); routes.py
+registers 'summaries' and 'action_points' next to the prompts they use.
+"""
+import io
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy.orm import selectinload
+
+import openai_client
+from extensions import db
+from models import BackfillJob, MeetingSession, MeetingSessionBody, Meeting
+
+logger = logging.getLogger(__name__)
+
+# The Batch API accepts up to 50,000 requests and 200 MB per input file
+MAX_SESSIONS_PER_BATCH = 2000
+APPLY_CHUNK_SIZE = 200
+COMPLETION_WINDOW = '24h'
+OPEN_BATCH_STATUSES = {'validating', 'in_progress', 'finalizing', 'cancelling'}
+# Batches a session may end up in that fail, expire or are cancelled before the job gives up
+MAX_BATCH_ATTEMPTS = 3
+
+_kinds = {}
+
+
+class BackfillError(Exception):
+    """Raised when a backfill job cannot make progress."""
+
+
+def register_kind(name, prompt_version, version_column, build_requests, apply_results):
+    """
+    Registers something that can be backfilled.
+
+    Args:
+        name (str): Kind name used by jobs and the CLI, e.g. 'summaries'.
+        prompt_version (str): The current prompt version of this kind.
+        version_column (str): MeetingSession column holding the version of the stored output.
+        build_requests (callable): build_requests(session) -> {part: chat completion body}.
+        apply_results (callable): apply_results(sessions_results, prompt_version), where
+            sessions_results is a list of (session, {part: message content}). Returns the
+            number of sessions written; must not commit.
+    """
+    _kinds[name] = {
+        'prompt_version': prompt_version,
+        'version_column': version_column,
+        'build_requests': build_requests,
+        'apply_results': apply_results,
+    }
+
+
+def _selection_query(job):
+    kind = _kinds[job.kind]
+    version_column = getattr(MeetingSession, kind['version_column'])
+    filters = job.filters or {}
+
+    query = MeetingSession.query.join(MeetingSession.body).filter(MeetingSessionBody.transcription.isnot(None))
+    if filters.get('hub_id'):
+        query = query.join(Meeting).filter(Meeting.meeting_hub_id == filters['hub_id'])
+    if filters.get('since'):
+        query = query.filter(MeetingSession.session_datetime >= datetime.fromisoformat(filters['since']))
+    if filters.get('until'):
+        query = query.filter(MeetingSession.session_datetime < datetime.fromisoformat(filters['until']))
+    if filters.get('prompt_version'):
+        query = query.filter(version_column == filters['prompt_version'])
+
+    # Sessions already at the target version are done, which makes reruns cheap
+    return query.filter(db.or_(version_column.is_(None), version_column != job.prompt_version))
+
+
+def create_job(kind, prompt_version=None, hub_id=None, since=None, until=None, selected_version=None):
+    """
+    Creates a backfill job for the sessions matching the filters.
+
+    Returns:
+        BackfillJob: The committed job, ready for advance_job().
+    """
+    if kind not in _kinds:
+        raise ValueError(f"Unknown backfill kind: {kind}")
+
+    job = BackfillJob(
+        kind=kind,
+        prompt_version=prompt_version or _kinds[kind]['prompt_version'],
+        filters={'hub_id': hub_id, 'since': since, 'until': until, 'prompt_version': selected_version},
+        status='pending',
+        batches=[]
+    )
+    db.session.add(job)
+    db.session.flush()
+    job.total_sessions = _selection_query(job).count()
+    db.session.commit()
+    logger.info(f"Created {kind} backfill job {job.id} for {job.total_sessions} sessions")
+    return job
+
+
+def _claimed_session_ids(job):
+    # Sessions of batches that ended without completing are released to be submitted again
+    return {
+        session_id
+        for batch in job.batches or [] if not batch.get('released')
+        for session_id in batch['session_ids']
+    }
+
+
+def _failed_attempts(job):
+    """Returns how many released batches each session of the job was part of."""
+    return Counter(
+        session_id
+        for batch in job.batches or [] if batch.get('released')
+        for session_id in batch['session_ids']
+    )
+
+
+def _submit_pending(job):
+    """Submits batches for the selected sessions that are not part of a batch of this job yet."""
+    kind = _kinds[job.kind]
+    claimed = _claimed_session_ids(job)
+    pending_ids = [
+        session_id
+        for (session_id,) in _selection_query(job).with_entities(MeetingSession.id).order_by(MeetingSession.id)
+        if session_id not in claimed
+    ]
+
+    # A batch that is rejected every time (bad request body, quota) must not be re-uploaded forever
+    attempts = _failed_attempts(job)
+    exhausted = [session_id for session_id in pending_ids if attempts[session_id] >= MAX_BATCH_ATTEMPTS]
+    if exhausted:
+        raise BackfillError(
+            f"{len(exhausted)} sessions were in {MAX_BATCH_ATTEMPTS} batches that did not complete, "
+            f"e.g. session {exhausted[0]}"
+        )
+
+    for start in range(0, len(pending_ids), MAX_SESSIONS_PER_BATCH):
+        sessions = MeetingSession.query.options(
+            selectinload(MeetingSession.body).undefer(MeetingSessionBody.transcription)
+        ).filter(
+            MeetingSession.id.in_(pending_ids[start:start + MAX_SESSIONS_PER_BATCH])
+        ).all()
+        lines = [
+            json.dumps({
+                'custom_id': f"{session.id}:{part}",
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': body
+            })
+            for session in sessions
+            for part, body in kind['build_requests'](session).items()
+        ]
+
+        input_file = openai_client.call(
+            'batch_upload',
+            lambda client, timeout: client.files.create(
+                file=(f"backfill-{job.id}-{start}.jsonl", io.BytesIO('\n'.join(lines).encode('utf-8'))),
+                purpose='batch',
+                timeout=timeout
+            ),
+            deadline=600
+        )
+        batch = openai_client.call(
+            'batch_create',
+            lambda client, timeout: client.batches.create(
+                input_file_id=input_file.id,
+                endpoint='/v1/chat/completions',
+                completion_window=COMPLETION_WINDOW,
+                metadata={'backfill_job': str(job.id), 'kind': job.kind},
+                timeout=timeout
+            )
+        )
+
+        # Record every batch as soon as it exists so a crash never submits it twice
+        job.batches = list(job.batches or []) + [{
+            'batch_id': batch.id,
+            'input_file_id': input_file.id,
+            'status': batch.status,
+            'session_ids': [session.id for session in sessions],
+            'attempt': 1 + max((attempts[session.id] for session in sessions), default=0),
+            'applied': False
+        }]
+        db.session.commit()
+        logger.info(f"Backfill job {job.id}: submitted batch {batch.id} with {len(lines)} requests")
+
+
+def _read_file(file_id):
+    content = openai_client.call(
+        'batch_download',
+        lambda client, timeout: client.files.content(file_id, timeout=timeout),
+        deadline=600
+    )
+    return [json.loads(line) for line in content.text.splitlines() if line.strip()]
+
+
+def _apply_batch(job, batch):
+    """Bulk-writes the results of a finished batch and returns (processed, failed) session counts."""
+    kind = _kinds[job.kind]
+    results = {}
+    for line in _read_file(batch['output_file_id']) if batch.get('output_file_id') else []:
+        session_id, part = line['custom_id'].split(':', 1)
+        response = line.get('response') or {}
+        if response.get('status_code') == 200:
+            results.setdefault(int(session_id), {})[part] = response['body']['choices'][0]['message']['content']
+        else:
+            logger.warning(f"Backfill job {job.id}: request {line['custom_id']} failed: {line.get('error')}")
+
+    processed = 0
+    session_ids = batch['session_ids']
+    for start in range(0, len(session_ids), APPLY_CHUNK_SIZE):
+        sessions = MeetingSession.query.options(
+            selectinload(MeetingSession.body).undefer(MeetingSessionBody.transcription)
+        ).filter(
+            MeetingSession.id.in_(session_ids[start:start + APPLY_CHUNK_SIZE])
+        ).all()
+        # Only sessions for which every request of the kind succeeded are written
+        complete = [
+            (session, results[session.id])
+            for session in sessions
+            if session.id in results and set(kind['build_requests'](session)) <= set(results[session.id])
+        ]
+
+        try:
+            processed += kind['apply_results'](complete, job.prompt_version)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    return processed, len(session_ids) - processed
+
+
+def _poll_batches(job):
+    """Checks the open batches of a job and applies the ones that completed."""
+    for batch_id in [batch['batch_id'] for batch in job.batches or [] if not batch['applied']]:
+        remote = openai_client.call(
+            'batch_retrieve',
+            lambda client, timeout: client.batches.retrieve(batch_id, timeout=timeout)
+        )
+        batches = [dict(batch) for batch in job.batches]
+        batch = next(batch for batch in batches if batch['batch_id'] == batch_id)
+        batch['status'] = remote.status
+
+        if remote.status == 'completed':
+            batch['output_file_id'] = remote.output_file_id
+            processed, failed = _apply_batch(job, batch)
+            batch['applied'] = True
+            job.processed_sessions += processed
+            job.failed_sessions += failed
+            logger.info(f"Backfill job {job.id}: applied batch {batch_id} ({processed} sessions, {failed} failed)")
+        elif remote.status not in OPEN_BATCH_STATUSES:
+            # Failed, expired or cancelled. An expired batch keeps the results it completed in time;
+            # sessions without a written result are released and submitted again
+            processed = 0
+            if remote.output_file_id:
+                batch['output_file_id'] = remote.output_file_id
+                processed, _ = _apply_batch(job, batch)
+                job.processed_sessions += processed
+            batch['applied'] = True
+            batch['released'] = True
+            logger.warning(
+                f"Backfill job {job.id}: batch {batch_id} ended as {remote.status} after {processed} sessions, "
+                f"resubmitting the rest (attempt {batch.get('attempt', 1)} of {MAX_BATCH_ATTEMPTS})"
+            )
+
+        job.batches = batches
+        db.session.commit()
+
+
+def advance_job(job_id):
+    """
+    Moves a backfill job forward: poll and apply open batches, then submit unsubmitted sessions.
+
+    Returns:
+        str: The job status afterwards; 'running' means advance_job() should be called again later.
+    """
+    job = BackfillJob.query.get(job_id)
+    if not job:
+        return 'missing'
+    if job.status in ('completed', 'cancelled'):
+        return job.status
+
+    try:
+        job.status = 'running'
+        job.error = None
+        db.session.commit()
+
+        _poll_batches(job)
+        _submit_pending(job)
+
+        if all(batch['applied'] for batch in job.batches):
+            job.status = 'completed'
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        job = BackfillJob.query.get(job_id)
+        job.status = 'failed'
+        job.error = str(e)
+        db.session.commit()
+        logger.error(f"Backfill job {job_id} failed: {str(e)}")
+
+    return job.status
+
+
+def cancel_job(job_id):
+    """
+    Cancels the open batches of a job and marks it cancelled.
+
+    Raises:
+        BackfillError: If there is no job with this id.
+    """
+    job = BackfillJob.query.get(job_id)
+    if not job:
+        raise BackfillError(f"Backfill job {job_id} not found")
+    for batch_id in [batch['batch_id'] for batch in job.batches or [] if not batch['applied']]:
+        openai_client.call(
+            'batch_cancel',
+            lambda client, timeout: client.batches.cancel(batch_id, timeout=timeout)
+        )
+    job.status = 'cancelled'
+    db.session.commit()
+    return job
+
+
+backfill_cli = AppGroup('backfill', help='Regenerate LLM outputs for historical sessions via the Batch API.')
+
+
+@backfill_cli.command('start')
+@click.argument('kind')
+@click.option('--hub-id', type=int, help='Only sessions of this meeting hub.')
+@click.option('--since', help='Only sessions on or after this ISO date.')
+@click.option('--until', help='Only sessions before this ISO date.')
+@click.option('--selected-version', help='Only sessions whose stored output has this prompt version.')
+@click.option('--prompt-version', help='Target prompt version; defaults to the current one.')
+def start_command(kind, hub_id, since, until, selected_version, prompt_version):
+    """Create a backfill job for KIND (summaries or action_points) and queue it."""
+    from routes import run_backfill_job
+
+    job = create_job(kind, prompt_version, hub_id, since, until, selected_version)
+    run_backfill_job.delay(job.id)
+    click.echo(f"Backfill job {job.id} queued for {job.total_sessions} sessions")
+
+
+@backfill_cli.command('resume')
+@click.argument('job_id', type=int)
+def resume_command(job_id):
+    """Queue an interrupted or failed job again."""
+    from routes import run_backfill_job
+
+    run_backfill_job.delay(job_id)
+    click.echo(f"Backfill job {job_id} queued")
+
+
+@backfill_cli.command('cancel')
+@click.argument('job_id', type=int)
+def cancel_command(job_id):
+    """Cancel a job and its open batches."""
+    try:
+        cancel_job(job_id)
+    except BackfillError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Backfill job {job_id} cancelled")
+
+
+@backfill_cli.command('status')
+@click.argument('job_id', type=int, required=False)
+def status_command(job_id):
+    """Show one job, or the most recent jobs."""
+    if job_id:
+        jobs = [job for job in [BackfillJob.query.get(job_id)] if job]
+    else:
+        jobs = BackfillJob.query.order_by(BackfillJob.id.desc()).limit(10).all()
+    if not jobs:
+        click.echo('No backfill jobs found')
+    for job in jobs:
+        click.echo(
+            f"#{job.id} {job.kind} -> {job.prompt_version}: {job.status}, "
+            f"{job.processed_sessions}/{job.total_sessions} done, {job.failed_sessions} failed"
+            + (f" ({job.error})" if job.error else '')
+        )
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.schedules import crontab
 import os
 
 # Set Redis URL from environment variables, using the primary Redis URL.
@@ -20,6 +21,22 @@ def init_celery():
         result_serializer='json',
         timezone='UTC',
         enable_utc=True,
+        beat_schedule={
+            # Recompute the usage rollups of the last days from the source tables
+            'compact-usage-rollups': {
+                'task': 'routes.compact_usage_rollups',
+                'schedule': crontab(hour=2, minute=15),
+            },
+            # Keep recording partitions ahead of time and archive the old ones
+            'maintain-recording-partitions': {
+                'task': 'routes.maintain_recording_partitions',
+                'schedule': crontab(hour=1, minute=30),
+            },
+            'archive-recording-partitions': {
+                'task': 'routes.archive_recording_partitions',
+                'schedule': crontab(day_of_month=1, hour=3, minute=0),
+            },
+        },
     )
 
     # Autodiscover tasks to ensure Celery knows about the tasks in routes
@@ -0,0 +1,108 @@
+# minutememo_app/db_routing.py
+"""
+Read replica routing for db.session.
+
+When DATABASE_REPLICA_URL is set, the app gets a second bind, 'replica'.
+Handlers decorated with @read_replica (decorators.py) send the SELECTs of GET
+requests to it; everything else, and every write, uses the primary.
+
+Two things keep replica reads from showing stale data:
+
+- Read-your-writes: a request that writes to the primary leaves a short-lived
+  marker in the user's Flask session, and that user's GET requests read from
+  the primary until it expires (STICKY_SECONDS).
+- Lag fallback: the replica's replay lag is checked at most every
+  LAG_CHECK_SECONDS per process. If it exceeds MAX_LAG_SECONDS, or the check
+  fails, reads go to the primary.
+"""
+import logging
+import os
+import time
+
+import sqlalchemy as sa
+from flask import g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 5))
+STICKY_SESSION_KEY = 'db_primary_until'
+
+# Replay lag in seconds; 0 when everything received has been replayed, NULL on a primary
+_LAG_SQL = sa.text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+_lag_checked_at = 0.0
+_replica_healthy = False
+
+
+def replica_binds():
+    """Returns the SQLALCHEMY_BINDS entry of the replica, or an empty dict without one."""
+    url = os.getenv('DATABASE_REPLICA_URL')
+    return {REPLICA_BIND: url.replace("postgres://", "postgresql://")} if url else {}
+
+
+def replica_healthy(engines):
+    """Returns whether the replica exists and lags less than MAX_LAG_SECONDS (checked at most every LAG_CHECK_SECONDS)."""
+    global _lag_checked_at, _replica_healthy
+    if REPLICA_BIND not in engines:
+        return False
+
+    now = time.monotonic()
+    if now - _lag_checked_at >= LAG_CHECK_SECONDS:
+        _lag_checked_at = now
+        try:
+            with engines[REPLICA_BIND].connect() as connection:
+                lag = connection.execute(_LAG_SQL).scalar()
+            _replica_healthy = (lag or 0) <= MAX_LAG_SECONDS
+            if not _replica_healthy:
+                logger.warning(f"Replica lags {lag:.1f}s, reading from the primary")
+        except sa.exc.SQLAlchemyError as e:
+            _replica_healthy = False
+            logger.warning(f"Replica lag check failed, reading from the primary: {str(e)}")
+    return _replica_healthy
+
+
+def sticky_to_primary():
+    """Returns whether the current user wrote recently and must read from the primary."""
+    return flask_session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+def use_replica(engines):
+    """Routes the reads of the current request to the replica if that is safe."""
+    g.read_replica = not sticky_to_primary() and replica_healthy(engines)
+
+
+def _is_write(clause):
+    if isinstance(clause, sa.UpdateBase):
+        return True
+    return isinstance(clause, sa.TextClause) and not clause.text.lstrip().upper().startswith(('SELECT', 'EXPLAIN'))
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends the reads of replica requests to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        writing = self._flushing or _is_write(clause)
+        if writing:
+            self.info['wrote'] = True
+        elif bind is None and has_request_context() and g.get('read_replica'):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _mark_sticky(session):
+    # The user's next reads must see this commit, so they go to the primary for a while
+    if session.info.pop('wrote', False) and has_request_context():
+        flask_session[STICKY_SESSION_KEY] = time.time() + STICKY_SECONDS
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop('wrote', None)
@@ -1,13 +1,24 @@
 from functools import wraps
-from flask import jsonify, g
+from flask import jsonify, g, request
 from flask_login import current_user
-from models import Company  # Assuming your models are in a file called models.py
+from extensions import db
+import db_routing
+import entitlements
 
 def subscription_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        company = Company.query.get(current_user.company_id)
-        if not company or not company.subscriptions or not any(sub.is_active for sub in company.subscriptions):
+        # Served from the entitlement cache; the database is only queried on a miss
+        if not entitlements.is_entitled(current_user.company_id):
             return jsonify({'status': 'error', 'message': 'No active subscription found'}), 403
         return f(*args, **kwargs)
+    return decorated_function
+
+def read_replica(f):
+    # Reads of GET requests go to the read replica unless it lags or the user just wrote (see db_routing.py)
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if request.method == 'GET':
+            db_routing.use_replica(db.engines)
+        return f(*args, **kwargs)
     return decorated_function
\ No newline at end of file
@@ -0,0 +1,104 @@
+# minutememo_app/entitlements.py
+"""
+Cached subscription entitlement of companies.
+
+An entitlement is stored as the moment it runs out: the end date of the
+company's longest-running active subscription, infinity for an ongoing one
+and 0 for none. Checking it is a comparison with the current time, so a
+subscription that reaches its end date stops entitling without anyone having
+to invalidate the cache. Lookups are served from a small in-process TTL cache
+first, then from Redis, and computed with one indexed query on a miss.
+
+Writes to subscriptions must call invalidate(). That clears this process and
+Redis at once; other processes drop their copy within LOCAL_CACHE_TTL_SECONDS.
+"""
+import logging
+import math
+import os
+import time
+from datetime import datetime, timezone
+
+import redis
+from cachetools import TTLCache
+from sqlalchemy import or_, select
+
+from extensions import db, get_redis
+from models import Subscription
+
+logger = logging.getLogger(__name__)
+
+ENTITLEMENT_PREFIX = 'entitlement:v1'
+REDIS_TTL_SECONDS = int(os.getenv('ENTITLEMENT_TTL_SECONDS', 3600))
+LOCAL_CACHE_SIZE = int(os.getenv('ENTITLEMENT_LOCAL_SIZE', 4096))
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv('ENTITLEMENT_LOCAL_TTL_SECONDS', 30))
+
+_local_cache = TTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+
+def _key(company_id):
+    return f"{ENTITLEMENT_PREFIX}:{company_id}"
+
+
+def entitlement_query(company_id, now):
+    """The active subscription of a company that runs longest (served by ix_subscription_company_id_status)."""
+    return (
+        select(Subscription.end_date)
+        .where(
+            Subscription.company_id == company_id,
+            Subscription.status == 'active',
+            or_(Subscription.end_date.is_(None), Subscription.end_date > now)
+        )
+        .order_by(Subscription.end_date.desc().nulls_first())
+        .limit(1)
+    )
+
+
+def _entitled_until(company_id):
+    """Computes the entitlement of a company with one query."""
+    row = db.session.execute(entitlement_query(company_id, datetime.utcnow())).first()
+    if row is None:
+        return 0.0
+    if row.end_date is None:
+        return math.inf
+    # Timestamps in the models are naive UTC
+    return row.end_date.replace(tzinfo=timezone.utc).timestamp()
+
+
+def entitled_until(company_id):
+    """Returns the epoch time at which the company's entitlement runs out (0 for none)."""
+    if company_id in _local_cache:
+        return _local_cache[company_id]
+
+    try:
+        raw = get_redis().get(_key(company_id))
+    except redis.RedisError as e:
+        logger.warning(f"Entitlement cache lookup failed for company {company_id}: {str(e)}")
+        raw = None
+
+    if raw is not None:
+        value = float(raw)
+    else:
+        value = _entitled_until(company_id)
+        try:
+            get_redis().set(_key(company_id), repr(value), ex=REDIS_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Entitlement cache write failed for company {company_id}: {str(e)}")
+
+    _local_cache[company_id] = value
+    return value
+
+
+def is_entitled(company_id):
+    """Returns whether the company currently has an active subscription."""
+    if company_id is None:
+        return False
+    return entitled_until(company_id) > time.time()
+
+
+def invalidate(company_id):
+    """Drops the cached entitlement of a company; call after writing its subscriptions."""
+    _local_cache.pop(company_id, None)
+    try:
+        get_redis().delete(_key(company_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate entitlement of company {company_id}: {str(e)}")
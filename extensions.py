@@ -1,5 +1,18 @@
 # minutememo_app/extensions.py
 
+import os
 from flask_sqlalchemy import SQLAlchemy
+import redis
+from db_routing import RoutingSession
 
-db = SQLAlchemy()  # Define the SQLAlchemy instance here
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # Define the SQLAlchemy instance here
+
+_redis_client = None
+
+
+def get_redis():
+    """Returns the process-wide Redis client, created on first use."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    return _redis_client
@@ -51,7 +51,8 @@ const AppContent = () => {
   const fetchMeetingHubs = async () => {
     try {
       setIsLoading(true);
-      const response = await axios.get(`${backendUrl}/api/meetinghubs`);
+      // The hub switcher only needs names, not the member lists
+      const response = await axios.get(`${backendUrl}/api/meetinghubs`, { params: { include_members: false } });
       if (response.status === 200) {
         const hubs = response.data.meeting_hubs || [];
         if (hubs.length > 0) {
@@ -194,34 +194,26 @@ const AudioRecorder = ({ sessionId }) => {
       });
   };
 
-  const concatenateChunks = async () => {
+  const startProcessing = async () => {
     try {
-      console.log('Starting concatenation for recording ID:', recordingIdRef.current);
+      console.log('Starting post-recording processing for recording ID:', recordingIdRef.current);
 
-      const response = await axios.post(`${backendUrl}/concatenate`, {
+      // Concatenation, transcription, summaries and action points all run server side
+      const response = await axios.post(`${backendUrl}/api/sessions/${sessionId}/process`, {
         recording_id: recordingIdRef.current,
       });
 
-      if (response.status === 200) {
-        const audioUrl = response.data.file_url;
-        console.log('Concatenation successful. Audio file URL:', audioUrl);
-
-        console.log(`Updating recording ${recordingIdRef.current} with audio URL: ${audioUrl}`);
-        await axios.patch(`${backendUrl}/api/recordings/${recordingIdRef.current}`, {
-          audio_url: audioUrl,
-        });
-
-        console.log('Audio URL successfully stored in the database');
+      if (response.status === 202) {
+        console.log('Processing workflow started:', response.data.task_id);
       } else {
-        console.error('Concatenation failed:', response.data.message);
+        console.error('Failed to start processing:', response.data.message);
       }
     } catch (error) {
-      console.error('Error during concatenation or updating the recording:', error);
+      console.error('Error starting post-recording processing:', error);
 
       if (error.response) {
         console.error('Response data:', error.response.data);
         console.error('Response status:', error.response.status);
-        console.error('Response headers:', error.response.headers);
       }
     }
   };
@@ -243,35 +235,7 @@ const AudioRecorder = ({ sessionId }) => {
       streamRef.current.getTracks().forEach(track => track.stop());
     }
 
-    await concatenateChunks();
-
-    try {
-      console.log("Starting transcription...");
-      const transcriptionResponse = await axios.post(`${backendUrl}/api/transcribe/${sessionId}`);
-      if (transcriptionResponse.status === 200) {
-        console.log("Transcription successful:", transcriptionResponse.data);
-
-        console.log("Starting summarization...");
-        const summaryResponse = await axios.post(`${backendUrl}/api/sessions/${sessionId}/summarize`);
-        if (summaryResponse.status === 200) {
-          console.log("Summarization successful:", summaryResponse.data);
-
-          console.log("Starting action point extraction...");
-          const actionPointsResponse = await axios.post(`${backendUrl}/api/extract_action_points/${sessionId}`);
-          if (actionPointsResponse.status === 200) {
-            console.log("Action points extraction successful:", actionPointsResponse.data);
-          } else {
-            console.error("Error extracting action points:", actionPointsResponse.data);
-          }
-        } else {
-          console.error("Error during summarization:", summaryResponse.data);
-        }
-      } else {
-        console.error("Error during transcription:", transcriptionResponse.data);
-      }
-    } catch (error) {
-      console.error("Error during transcription, summarization, or action point extraction:", error);
-    }
+    await startProcessing();
   };
 
   return (
@@ -1,10 +1,138 @@
 // src/components/ActionItemsPage.js
-import React from 'react';
+import React, { useState, useEffect } from 'react';
+import { Link } from 'react-router-dom';
+import axios from 'axios';
 
-const ActionItemsPage = () => (
-  <div>
-    <h2>Action Items</h2>
-  </div>
-);
+const ActionItemsPage = ({ selectedHub }) => {
+  const [actionItems, setActionItems] = useState([]);
+  const [cursor, setCursor] = useState(null); // Cursor of the next page of action items
+  const [completed, setCompleted] = useState('false'); // 'false' (open), 'true' or 'all'
+  const [assignedTo, setAssignedTo] = useState('');
+  const [dueFrom, setDueFrom] = useState('');
+  const [dueTo, setDueTo] = useState('');
+  const [error, setError] = useState('');
+  const [loading, setLoading] = useState(false);
 
-export default ActionItemsPage;
\ No newline at end of file
+  // Environment variable for backend URL
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:5000';
+
+  // Filters of the hub board; empty ones are left out
+  const filterParams = () => {
+    const params = { completed };
+    if (assignedTo) params.assigned_to = assignedTo;
+    if (dueFrom) params.due_from = dueFrom;
+    if (dueTo) params.due_to = dueTo;
+    return params;
+  };
+
+  // Reload the first page when the hub or a filter changes
+  useEffect(() => {
+    if (!selectedHub) {
+      return;
+    }
+
+    const fetchActionItems = async () => {
+      try {
+        setLoading(true);
+        setError('');
+        const response = await axios.get(`${backendUrl}/api/hubs/${selectedHub}/action_items`, {
+          params: filterParams()
+        });
+        setActionItems(response.data.action_items);
+        setCursor(response.data.next_cursor);
+      } catch (err) {
+        console.error('Error fetching action items:', err);
+        setError('Error fetching action items.');
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchActionItems();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedHub, completed, assignedTo, dueFrom, dueTo, backendUrl]);
+
+  // Append the next page of action items
+  const loadMoreActionItems = async () => {
+    try {
+      const response = await axios.get(`${backendUrl}/api/hubs/${selectedHub}/action_items`, {
+        params: { ...filterParams(), cursor }
+      });
+      setActionItems((prevItems) => [...prevItems, ...response.data.action_items]);
+      setCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more action items:', err);
+      setError('Error fetching action items.');
+    }
+  };
+
+  if (!selectedHub) {
+    return <p>Select a meeting hub to see its action items.</p>;
+  }
+
+  return (
+    <div>
+      <h2>Action Items</h2>
+
+      <div className="box-shadow-container">
+        <select value={completed} onChange={(e) => setCompleted(e.target.value)}>
+          <option value="false">Open</option>
+          <option value="true">Completed</option>
+          <option value="all">All</option>
+        </select>
+        <input
+          type="text"
+          placeholder="Assigned to"
+          value={assignedTo}
+          onChange={(e) => setAssignedTo(e.target.value)}
+        />
+        <input type="date" value={dueFrom} onChange={(e) => setDueFrom(e.target.value)} />
+        <input type="date" value={dueTo} onChange={(e) => setDueTo(e.target.value)} />
+      </div>
+
+      {error && <p className="error">{error}</p>}
+
+      {loading ? (
+        <p>Loading...</p>
+      ) : (
+        <div className="box-shadow-container">
+          {actionItems.length > 0 ? (
+            <table>
+              <thead>
+                <tr>
+                  <th>Title</th>
+                  <th>Assigned To</th>
+                  <th>Due Date</th>
+                  <th>Completed</th>
+                  <th>Session</th>
+                </tr>
+              </thead>
+              <tbody>
+                {actionItems.map(item => (
+                  <tr key={item.id}>
+                    <td>{item.title}</td>
+                    <td>{item.assigned_to}</td>
+                    <td>{item.due_date ? new Date(item.due_date).toLocaleDateString() : '-'}</td>
+                    <td>{item.completed ? 'Yes' : 'No'}</td>
+                    <td>
+                      <Link to={`/sessions/${item.meeting_session_id}`}>View session</Link>
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          ) : (
+            <p>No action items found.</p>
+          )}
+          {cursor && (
+            <button onClick={loadMoreActionItems} className="btn btn-secondary">
+              Load more
+            </button>
+          )}
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default ActionItemsPage;
@@ -75,32 +75,7 @@ const ActionPoints = ({ actionPoints, onReorder, onToggleComplete, onUpdateTitle
 
   const handleCheckboxClick = (event, id, completed) => {
     event.stopPropagation();
-  
-    const newCompletedStatus = !completed;
-  
-    fetch(`/api/action_item/${id}/complete`, {
-      method: 'PUT',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({ completed: newCompletedStatus }),
-    })
-    .then(response => {
-      if (!response.ok) {
-        throw new Error('Network response was not ok');
-      }
-      return response.json();
-    })
-    .then(data => {
-      if (data.status === 'success') {
-        onToggleComplete(id, newCompletedStatus);  // Update the UI
-      } else {
-        console.error('Failed to update action item completion:', data.message);
-      }
-    })
-    .catch(error => {
-      console.error('Error:', error);
-    });
+    onToggleComplete(id, !completed);
   };
 
   return (
@@ -8,6 +8,8 @@ const DashboardPage = ({ selectedHub }) => {
   const { user } = useUser(); // Get the user context
   const [meetings, setMeetings] = useState([]);
   const [meetingSessions, setMeetingSessions] = useState([]);
+  const [meetingsCursor, setMeetingsCursor] = useState(null); // Cursor of the next page of meetings
+  const [sessionsCursor, setSessionsCursor] = useState(null); // Cursor of the next page of sessions
   const [error, setError] = useState('');
   const [subscriptionActive, setSubscriptionActive] = useState(false);
   const [subscriptionEmpty, setSubscriptionEmpty] = useState(false);
@@ -48,37 +50,45 @@ const DashboardPage = ({ selectedHub }) => {
     }
   }, [user, backendUrl, navigate]);
 
-  useEffect(() => {
-    if (selectedHub && subscriptionActive) {
-      const fetchMeetings = async () => {
-        try {
-          const response = await axios.get(`${backendUrl}/api/meetings?hub_id=${selectedHub}`);
-          if (response.status === 200) {
-            setMeetings(response.data.meetings);
-          } else {
-            setError('Failed to fetch meetings');
-          }
-        } catch (err) {
-          setError('Error fetching meetings');
-        }
-      };
+  // Both lists are paged on the server; a cursor appends the next page
+  const fetchMeetings = async (cursor = null) => {
+    try {
+      const response = await axios.get(`${backendUrl}/api/meetings`, {
+        params: { hub_id: selectedHub, cursor: cursor || undefined }
+      });
+      if (response.status === 200) {
+        setMeetings((prevMeetings) => (cursor ? [...prevMeetings, ...response.data.meetings] : response.data.meetings));
+        setMeetingsCursor(response.data.next_cursor);
+      } else {
+        setError('Failed to fetch meetings');
+      }
+    } catch (err) {
+      setError('Error fetching meetings');
+    }
+  };
 
-      const fetchMeetingSessions = async () => {
-        try {
-          const response = await axios.get(`${backendUrl}/api/meetingsessions?hub_id=${selectedHub}`);
-          if (response.status === 200) {
-            setMeetingSessions(response.data.meeting_sessions);
-          } else {
-            setError('Failed to fetch meeting sessions');
-          }
-        } catch (err) {
-          setError('Error fetching meeting sessions');
-        }
-      };
+  const fetchMeetingSessions = async (cursor = null) => {
+    try {
+      const response = await axios.get(`${backendUrl}/api/meetingsessions`, {
+        params: { hub_id: selectedHub, cursor: cursor || undefined }
+      });
+      if (response.status === 200) {
+        setMeetingSessions((prevSessions) => (cursor ? [...prevSessions, ...response.data.meeting_sessions] : response.data.meeting_sessions));
+        setSessionsCursor(response.data.next_cursor);
+      } else {
+        setError('Failed to fetch meeting sessions');
+      }
+    } catch (err) {
+      setError('Error fetching meeting sessions');
+    }
+  };
 
+  useEffect(() => {
+    if (selectedHub && subscriptionActive) {
       fetchMeetings();
       fetchMeetingSessions();
     }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [selectedHub, backendUrl, subscriptionActive]);
 
   const handleCreateMeeting = async () => {
@@ -169,6 +179,11 @@ const DashboardPage = ({ selectedHub }) => {
             ))}
           </tbody>
         </table>
+        {meetingsCursor && (
+          <button onClick={() => fetchMeetings(meetingsCursor)} className="btn btn-secondary">
+            Load more
+          </button>
+        )}
       </div>
 
       <div className="box-shadow-container">
@@ -191,6 +206,11 @@ const DashboardPage = ({ selectedHub }) => {
             ))}
           </tbody>
         </table>
+        {sessionsCursor && (
+          <button onClick={() => fetchMeetingSessions(sessionsCursor)} className="btn btn-secondary">
+            Load more
+          </button>
+        )}
       </div>
     </div>
   );
@@ -25,20 +25,33 @@ const LongSummary = ({ sessionId, backendUrl }) => {
     fetchLongSummary();
   }, [sessionId, backendUrl]);
 
-  const handleSummarize = async () => {
+  const handleSummarize = () => {
     setIsSummarizing(true);
-    try {
-      const response = await axios.post(`${backendUrl}/api/sessions/${sessionId}/summarize_long`);
-      if (response.status === 200) {
-        setLongSummary(response.data.long_summary);
-      } else {
-        setError('Failed to summarize.');
-      }
-    } catch (err) {
+    setError('');
+    setLongSummary('');
+
+    // Stream the summary token by token instead of waiting for the full completion
+    const eventSource = new EventSource(
+      `${backendUrl}/api/sessions/${sessionId}/summarize/stream?kind=long`,
+      { withCredentials: true }
+    );
+
+    eventSource.addEventListener('token', (event) => {
+      const { text } = JSON.parse(event.data);
+      setLongSummary((previous) => previous + text);
+    });
+
+    eventSource.addEventListener('done', (event) => {
+      setLongSummary(JSON.parse(event.data).long_summary);
+      eventSource.close();
+      setIsSummarizing(false);
+    });
+
+    eventSource.onerror = () => {
       setError('Error summarizing.');
-    } finally {
+      eventSource.close();
       setIsSummarizing(false);
-    }
+    };
   };
 
   return (
@@ -14,6 +14,7 @@ const MeetingSessionPage = () => {
   const [isTranscribing, setIsTranscribing] = useState(false);
   const [actionPoints, setActionPoints] = useState([]);
   const [isExtracting, setIsExtracting] = useState(false);
+  const [isGeneratingInsights, setIsGeneratingInsights] = useState(false);
   const [isTranscriptionExpanded, setIsTranscriptionExpanded] = useState(false);
   const [summaries, setSummaries] = useState({ short: '', long: '' });
   const audioRef = useRef(null);
@@ -42,7 +43,10 @@ const MeetingSessionPage = () => {
           setError('Failed to fetch summaries.');
         }
 
-        const actionPointsResponse = await axios.get(`${backendUrl}/api/sessions/${sessionId}/action_points`);
+        // A session's action points fit in one (maximum size) page
+        const actionPointsResponse = await axios.get(`${backendUrl}/api/sessions/${sessionId}/action_points`, {
+          params: { limit: 200 }
+        });
         if (actionPointsResponse.status === 200) {
           setActionPoints(actionPointsResponse.data.action_items);
         } else {
@@ -56,22 +60,12 @@ const MeetingSessionPage = () => {
     fetchSessionData();
   }, [sessionId, backendUrl]);
 
-  const handleReorder = (newOrder) => {
-    setActionPoints(newOrder);
-  };
-
-  const handleToggleComplete = async (id, completed) => {
+  // Sends changed fields of one or more action items in a single request
+  const patchActionPoints = async (changes) => {
     try {
-      const response = await axios.put(`${backendUrl}/api/action_item/${id}/complete`, {
-        completed: !completed,
-      });
-
+      const response = await axios.patch(`${backendUrl}/api/sessions/${sessionId}/action_points`, { action_items: changes });
       if (response.status === 200) {
-        setActionPoints(prevItems =>
-          prevItems.map(item =>
-            item.id === id ? { ...item, completed: !completed } : item
-          )
-        );
+        setActionPoints(response.data.action_items);
       } else {
         setError('Failed to update action point.');
       }
@@ -80,21 +74,27 @@ const MeetingSessionPage = () => {
     }
   };
 
-  const handleUpdateTitle = async (id, newTitle) => {
-    try {
-      const response = await axios.put(`${backendUrl}/api/sessions/${sessionId}/action_points/${id}`, { title: newTitle });
-      if (response.status === 200) {
-        setActionPoints(prevItems =>
-          prevItems.map(item =>
-            item.id === id ? { ...item, title: newTitle } : item
-          )
-        );
-      } else {
-        setError('Failed to update action point.');
-      }
-    } catch (err) {
-      setError('Error updating action point.');
-    }
+  const handleReorder = (newOrder) => {
+    setActionPoints(newOrder);
+    patchActionPoints(newOrder.map((item, index) => ({ id: item.id, sorting_id: index + 1 })));
+  };
+
+  const handleToggleComplete = (id, completed) => {
+    setActionPoints(prevItems =>
+      prevItems.map(item =>
+        item.id === id ? { ...item, completed } : item
+      )
+    );
+    patchActionPoints([{ id, completed }]);
+  };
+
+  const handleUpdateTitle = (id, newTitle) => {
+    setActionPoints(prevItems =>
+      prevItems.map(item =>
+        item.id === id ? { ...item, title: newTitle } : item
+      )
+    );
+    patchActionPoints([{ id, title: newTitle }]);
   };
 
   const handleAddActionPoint = async (title) => {
@@ -165,6 +165,27 @@ const MeetingSessionPage = () => {
     }
   };
 
+  const handleGenerateInsights = async () => {
+    setIsGeneratingInsights(true);
+    try {
+      // One request produces both summaries and the action points
+      const response = await axios.post(`${backendUrl}/api/sessions/${sessionId}/insights`);
+      if (response.status === 200) {
+        setSummaries({
+          short: response.data.short_summary,
+          long: response.data.long_summary,
+        });
+        setActionPoints(response.data.action_items);
+      } else {
+        setError('Failed to generate summaries and action points.');
+      }
+    } catch (err) {
+      setError('Error generating summaries and action points.');
+    } finally {
+      setIsGeneratingInsights(false);
+    }
+  };
+
   const toggleTranscription = () => {
     setIsTranscriptionExpanded(!isTranscriptionExpanded);
   };
@@ -201,6 +222,10 @@ const MeetingSessionPage = () => {
               {isTranscribing ? 'Transcribing...' : 'Transcribe Audio'}
             </button>
 
+            <button onClick={handleGenerateInsights} disabled={isGeneratingInsights}>
+              {isGeneratingInsights ? 'Generating...' : 'Generate Summaries & Action Points'}
+            </button>
+
             <button onClick={handleSummarize} disabled={isSummarizing}>
               {isSummarizing ? 'Summarizing...' : 'Generate Summaries'}
             </button>
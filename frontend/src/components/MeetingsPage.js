@@ -7,6 +7,8 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
   const { meetingId } = useParams();
   const [meetings, setMeetings] = useState([]);
   const [sessions, setSessions] = useState([]);
+  const [meetingsCursor, setMeetingsCursor] = useState(null); // Cursor of the next page of meetings
+  const [sessionsCursor, setSessionsCursor] = useState(null); // Cursor of the next page of sessions
   const [error, setError] = useState('');
   const [loading, setLoading] = useState(true);
   const { user } = useUser();
@@ -37,6 +39,7 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
 
           if (response.status === 200 && response.data.meetings) {
             setMeetings(response.data.meetings);
+            setMeetingsCursor(response.data.next_cursor);
             console.log('Meetings fetched:', response.data.meetings);
           } else {
             setError('Failed to fetch meetings.');
@@ -72,8 +75,10 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
 
         if (response.status === 200 && response.data.sessions.length > 0) {
           setSessions(response.data.sessions);
+          setSessionsCursor(response.data.next_cursor);
         } else {
           setSessions([]);  // Ensure sessions state is reset if no sessions found
+          setSessionsCursor(null);
         }
       } catch (err) {
         console.error('Error fetching sessions:', err); // Only log the error
@@ -85,6 +90,32 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
     fetchSessions();
   }, [selectedHub, meetingId, user, backendUrl]);
 
+  // Append the next page of meetings or sessions
+  const loadMoreMeetings = async () => {
+    try {
+      const response = await axios.get(`${backendUrl}/api/meetings`, {
+        params: { hub_id: selectedHub, cursor: meetingsCursor }
+      });
+      setMeetings((prevMeetings) => [...prevMeetings, ...response.data.meetings]);
+      setMeetingsCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more meetings:', err);
+      setError('Error fetching meetings.');
+    }
+  };
+
+  const loadMoreSessions = async () => {
+    try {
+      const response = await axios.get(`${backendUrl}/api/meetings`, {
+        params: { meeting_id: meetingId, cursor: sessionsCursor }
+      });
+      setSessions((prevSessions) => [...prevSessions, ...response.data.sessions]);
+      setSessionsCursor(response.data.next_cursor);
+    } catch (err) {
+      console.error('Error fetching more sessions:', err);
+    }
+  };
+
   // Handle meeting selection and notify parent component
   const handleMeetingSelect = (meetingId) => {
     if (onMeetingSelect) {
@@ -144,6 +175,11 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
               ))}
             </tbody>
           </table>
+          {meetingsCursor && (
+            <button onClick={loadMoreMeetings} className="btn btn-secondary">
+              Load more
+            </button>
+          )}
         </div>
       )}
 
@@ -173,6 +209,11 @@ const MeetingsPage = ({ selectedHub, onMeetingSelect }) => {
           ) : (
             <p>Start your first session here!</p> // Updated message for no sessions
           )}
+          {sessionsCursor && (
+            <button onClick={loadMoreSessions} className="btn btn-secondary">
+              Load more
+            </button>
+          )}
 
           <button onClick={handleStartNewSession}>Start New Session</button>
         </div>
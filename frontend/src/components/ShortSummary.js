@@ -25,20 +25,33 @@ const ShortSummary = ({ sessionId, backendUrl }) => {
     fetchShortSummary();
   }, [sessionId, backendUrl]);
 
-  const handleSummarize = async () => {
+  const handleSummarize = () => {
     setIsSummarizing(true);
-    try {
-      const response = await axios.post(`${backendUrl}/api/sessions/${sessionId}/summarize_short`);
-      if (response.status === 200) {
-        setShortSummary(response.data.short_summary);
-      } else {
-        setError('Failed to summarize.');
-      }
-    } catch (err) {
+    setError('');
+    setShortSummary('');
+
+    // Stream the summary token by token instead of waiting for the full completion
+    const eventSource = new EventSource(
+      `${backendUrl}/api/sessions/${sessionId}/summarize/stream?kind=short`,
+      { withCredentials: true }
+    );
+
+    eventSource.addEventListener('token', (event) => {
+      const { text } = JSON.parse(event.data);
+      setShortSummary((previous) => previous + text);
+    });
+
+    eventSource.addEventListener('done', (event) => {
+      setShortSummary(JSON.parse(event.data).short_summary);
+      eventSource.close();
+      setIsSummarizing(false);
+    });
+
+    eventSource.onerror = () => {
       setError('Error summarizing.');
-    } finally {
+      eventSource.close();
       setIsSummarizing(false);
-    }
+    };
   };
 
   return (
@@ -12,12 +12,34 @@ const SuperAdminDashboard = () => {
   const [companySearch, setCompanySearch] = useState('');
   const [userSearch, setUserSearch] = useState('');
   const [selectedStatuses, setSelectedStatuses] = useState({}); // New state for tracking selected statuses
+  const [companiesCursor, setCompaniesCursor] = useState(null); // Cursor of the next page of companies
+  const [companiesTotal, setCompaniesTotal] = useState(null);
+  const [usersCursor, setUsersCursor] = useState(null); // Cursor of the next page of users
   const navigate = useNavigate();
   const { user } = useUser() || {};
   const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:5000';
 
   const subscriptionOptions = ['active', 'inactive', 'pending', 'canceled'];
 
+  // Companies are searched and paged on the server; a cursor appends the next page
+  const fetchCompanies = async (search = '', cursor = null) => {
+    try {
+      console.log("Fetching companies...");
+      const response = await axios.get(`${backendUrl}/api/companies`, {
+        params: { q: search || undefined, cursor: cursor || undefined },
+        withCredentials: true
+      });
+      const page = response.data.companies;
+      const updated = cursor ? [...companies, ...page] : page;
+      setCompanies(updated);
+      setFilteredCompanies(updated);
+      setCompaniesCursor(response.data.next_cursor);
+      setCompaniesTotal(response.data.total_is_estimate ? `${response.data.total}+` : response.data.total);
+    } catch (err) {
+      console.error('Error fetching companies:', err);
+    }
+  };
+
   useEffect(() => {
     if (!user || user.internal_user_role !== 'super_admin') {
       console.log("User not authorized, redirecting to login...");
@@ -25,53 +47,47 @@ const SuperAdminDashboard = () => {
       return;
     }
 
-    const fetchCompanies = async () => {
-      try {
-        console.log("Fetching companies...");
-        const response = await axios.get(`${backendUrl}/api/companies`, { withCredentials: true });
-        setCompanies(response.data.companies);
-        setFilteredCompanies(response.data.companies);
-        console.log("Companies fetched:", response.data.companies);
-      } catch (err) {
-        console.error('Error fetching companies:', err);
-      }
-    };
-
     fetchCompanies();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [backendUrl, navigate, user]);
 
-  const handleCompanyClick = async (companyId) => {
+  const fetchUsers = async (companyId, search = '', cursor = null) => {
     try {
       console.log(`Fetching users for company ${companyId}...`);
-      const response = await axios.get(`${backendUrl}/api/companies/${companyId}/users`, { withCredentials: true });
+      const response = await axios.get(`${backendUrl}/api/companies/${companyId}/users`, {
+        params: { q: search || undefined, cursor: cursor || undefined },
+        withCredentials: true
+      });
+      const updated = cursor ? [...users, ...response.data.users] : response.data.users;
       setSelectedCompany(companyId);
-      setUsers(response.data.users);
-      setFilteredUsers(response.data.users);
-      console.log(`Users for company ${companyId}:`, response.data.users);
+      setUsers(updated);
+      setFilteredUsers(updated);
+      setUsersCursor(response.data.next_cursor);
     } catch (err) {
       console.error('Error fetching users for company:', err);
     }
   };
 
+  const handleCompanyClick = (companyId) => {
+    setUserSearch('');
+    fetchUsers(companyId);
+  };
+
   const handleBackClick = () => {
     setSelectedCompany(null);
     setUsers([]);
   };
 
   const handleCompanySearch = (e) => {
-    const searchValue = e.target.value.toLowerCase();
+    const searchValue = e.target.value;
     setCompanySearch(searchValue);
-    setFilteredCompanies(companies.filter(company => company.name.toLowerCase().includes(searchValue)));
+    fetchCompanies(searchValue);
   };
 
   const handleUserSearch = (e) => {
-    const searchValue = e.target.value.toLowerCase();
+    const searchValue = e.target.value;
     setUserSearch(searchValue);
-    setFilteredUsers(users.filter(user => 
-      user.first_name.toLowerCase().includes(searchValue) ||
-      user.last_name.toLowerCase().includes(searchValue) ||
-      user.email.toLowerCase().includes(searchValue)
-    ));
+    fetchUsers(selectedCompany, searchValue);
   };
 
   const handleSubscriptionChange = (companyId, newStatus) => {
@@ -190,6 +206,12 @@ const SuperAdminDashboard = () => {
               })}
             </tbody>
           </table>
+          {companiesTotal !== null && <p>{companies.length} of {companiesTotal} companies</p>}
+          {companiesCursor && (
+            <button onClick={() => fetchCompanies(companySearch, companiesCursor)} className="btn btn-secondary">
+              Load more
+            </button>
+          )}
         </>
       )}
 
@@ -258,6 +280,11 @@ const SuperAdminDashboard = () => {
               ))}
             </tbody>
           </table>
+          {usersCursor && (
+            <button onClick={() => fetchUsers(selectedCompany, userSearch, usersCursor)} className="btn btn-secondary">
+              Load more
+            </button>
+          )}
         </>
       )}
     </div>
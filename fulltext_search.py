@@ -0,0 +1,210 @@
+# minutememo_app/fulltext_search.py
+"""
+Full-text search over transcripts, summaries and action items.
+
+Every searchable table has a stored tsvector column generated by Postgres
+with the Dutch text search configuration and a GIN index on it, so a search
+only reads the rows that match. Transcript segments carry their hub id in the
+same GIN index (btree_gin), and so do action items, which keeps hub-scoped
+searches cheap on very large tables.
+
+Results from the three sources are ranked together with ts_rank_cd and paged
+with a keyset cursor on (rank, kind, id). Highlighted snippets (ts_headline,
+which re-parses the text) are only computed for the rows of the returned page.
+"""
+import html
+import logging
+
+from sqlalchemy import cast, func, literal, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, REGCONFIG
+
+import pagination
+from extensions import db
+from models import SEARCH_CONFIG, ActionItem, Meeting, MeetingSession, MeetingSessionBody, TranscriptSegment, user_meeting_hub
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('transcript', 'summary', 'action_item')
+DEFAULT_PAGE_SIZE = 20
+# Results are paged by (rank, kind, id) descending
+CURSOR_SORT = 'rank-kind-id:desc'
+# Highlights are marked with control characters so the text can be HTML-escaped before inserting <mark>
+_START_SEL, _STOP_SEL = '\x02', '\x03'
+HEADLINE_OPTIONS = f"StartSel={_START_SEL}, StopSel={_STOP_SEL}, MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=\" … \""
+_CONFIG = cast(literal(SEARCH_CONFIG), REGCONFIG)
+
+
+def user_hub_ids(user_id):
+    """Returns the ids of the hubs a user belongs to."""
+    return db.session.execute(
+        select(user_meeting_hub.c.meeting_hub_id).where(user_meeting_hub.c.user_id == user_id)
+    ).scalars().all()
+
+
+def to_tsquery(query):
+    """Parses search terms in web search syntax with the search configuration."""
+    return func.websearch_to_tsquery(_CONFIG, query)
+
+
+def _rank(vector, tsquery):
+    # As double precision, so the rank survives the round trip through a cursor exactly
+    return cast(func.ts_rank_cd(vector, tsquery), DOUBLE_PRECISION).label('rank')
+
+
+def matches(tsquery, hub_ids, kinds):
+    """One SELECT per kind yielding (kind, id, session_id, rank) for every match within the hubs."""
+    branches = []
+    if 'transcript' in kinds:
+        branches.append(
+            select(
+                literal('transcript').label('kind'),
+                TranscriptSegment.id.label('id'),
+                TranscriptSegment.meeting_session_id.label('session_id'),
+                _rank(TranscriptSegment.search_vector, tsquery)
+            )
+            .where(TranscriptSegment.meeting_hub_id.in_(hub_ids), TranscriptSegment.search_vector.op('@@')(tsquery))
+        )
+    if 'summary' in kinds:
+        # Names are indexed on meeting_session and summaries on meeting_session_body; a session
+        # matching both is one result ranked by the sum
+        hits = union_all(
+            select(MeetingSession.id.label('id'), _rank(MeetingSession.search_vector, tsquery))
+            .where(MeetingSession.meeting_hub_id.in_(hub_ids), MeetingSession.search_vector.op('@@')(tsquery)),
+            select(MeetingSessionBody.meeting_session_id.label('id'), _rank(MeetingSessionBody.search_vector, tsquery))
+            .join(MeetingSession, MeetingSession.id == MeetingSessionBody.meeting_session_id)
+            .where(MeetingSession.meeting_hub_id.in_(hub_ids), MeetingSessionBody.search_vector.op('@@')(tsquery))
+        ).subquery('summary_hits')
+        branches.append(
+            select(
+                literal('summary').label('kind'),
+                hits.c.id.label('id'),
+                hits.c.id.label('session_id'),
+                func.sum(hits.c.rank).label('rank')
+            )
+            .group_by(hits.c.id)
+        )
+    if 'action_item' in kinds:
+        branches.append(
+            select(
+                literal('action_item').label('kind'),
+                ActionItem.id.label('id'),
+                ActionItem.meeting_session_id.label('session_id'),
+                _rank(ActionItem.search_vector, tsquery)
+            )
+            .where(ActionItem.meeting_hub_id.in_(hub_ids), ActionItem.search_vector.op('@@')(tsquery))
+        )
+    return union_all(*branches).subquery('matches') if len(branches) > 1 else branches[0].subquery('matches')
+
+
+def _headline(document, tsquery):
+    return func.ts_headline(_CONFIG, document, tsquery, HEADLINE_OPTIONS)
+
+
+def _highlight(headline):
+    return html.escape(headline or '').replace(_START_SEL, '<mark>').replace(_STOP_SEL, '</mark>')
+
+
+def _headlines(kind, ids, tsquery):
+    """Returns {id: highlighted snippet} for the rows of one kind on the page."""
+    if not ids:
+        return {}
+    if kind == 'transcript':
+        query = select(TranscriptSegment.id, _headline(TranscriptSegment.text, tsquery)).where(TranscriptSegment.id.in_(ids))
+    elif kind == 'summary':
+        # Sessions that only matched by name fall back to their name
+        document = func.coalesce(
+            func.nullif(func.concat_ws(' ', MeetingSessionBody.short_summary, MeetingSessionBody.long_summary), ''),
+            MeetingSession.name
+        )
+        query = (
+            select(MeetingSession.id, _headline(document, tsquery))
+            .outerjoin(MeetingSessionBody, MeetingSessionBody.meeting_session_id == MeetingSession.id)
+            .where(MeetingSession.id.in_(ids))
+        )
+    else:
+        document = func.concat_ws(' ', ActionItem.title, ActionItem.description)
+        query = select(ActionItem.id, _headline(document, tsquery)).where(ActionItem.id.in_(ids))
+
+    return {row_id: _highlight(headline) for row_id, headline in db.session.execute(query)}
+
+
+def search(user_id, query, hub_id=None, kinds=KINDS, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Searches the hubs a user belongs to.
+
+    Args:
+        user_id (int): The searching user; only their hubs are searched.
+        query (str): Search terms in web search syntax ("quoted phrases", or, -excluded).
+        hub_id (int, optional): Restrict the search to this hub.
+        kinds (iterable): Any of 'transcript', 'summary' and 'action_item'.
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Page size.
+
+    Returns:
+        tuple: (results, next_cursor). Each result has kind, id, rank, the session,
+        meeting and hub it belongs to and an HTML snippet with <mark> highlights.
+
+    Raises:
+        pagination.InvalidCursor: If the cursor cannot be decoded.
+        LookupError: If hub_id is not one of the user's hubs.
+    """
+    hub_ids = user_hub_ids(user_id)
+    if hub_id is not None:
+        if hub_id not in hub_ids:
+            raise LookupError(f"Meeting hub {hub_id} not found")
+        hub_ids = [hub_id]
+    if not hub_ids or not kinds:
+        return [], None
+
+    tsquery = to_tsquery(query)
+    hits = matches(tsquery, hub_ids, kinds)
+    keys = (hits.c.rank, hits.c.kind, hits.c.id)
+
+    page_query = select(hits)
+    if cursor:
+        rank, kind, row_id = pagination.decode_cursor(cursor, 3, CURSOR_SORT)
+        if not isinstance(rank, (int, float)) or kind not in KINDS or not isinstance(row_id, int):
+            raise pagination.InvalidCursor('Invalid cursor')
+        page_query = page_query.where(tuple_(*keys) < tuple_(rank, kind, row_id))
+    rows = db.session.execute(
+        page_query.order_by(*(key.desc() for key in keys)).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = pagination.encode_cursor([rows[-1].rank, rows[-1].kind, rows[-1].id], CURSOR_SORT)
+
+    headlines = {}
+    for kind in KINDS:
+        headlines[kind] = _headlines(kind, [row.id for row in rows if row.kind == kind], tsquery)
+
+    # Session, meeting and hub of every result in one query
+    sessions = {
+        session.id: session
+        for session in db.session.execute(
+            select(
+                MeetingSession.id, MeetingSession.name, MeetingSession.session_datetime,
+                Meeting.id.label('meeting_id'), Meeting.name.label('meeting_name'), Meeting.meeting_hub_id
+            )
+            .join(Meeting, Meeting.id == MeetingSession.meeting_id)
+            .where(MeetingSession.id.in_(sorted({row.session_id for row in rows})))
+        )
+    } if rows else {}
+
+    results = []
+    for row in rows:
+        session = sessions.get(row.session_id)
+        results.append({
+            'kind': row.kind,
+            'id': row.id,
+            'rank': row.rank,
+            'snippet': headlines[row.kind].get(row.id, ''),
+            'session_id': row.session_id,
+            'session_name': session.name if session else None,
+            'session_datetime': session.session_datetime.isoformat() if session else None,
+            'meeting_id': session.meeting_id if session else None,
+            'meeting_name': session.meeting_name if session else None,
+            'meeting_hub_id': session.meeting_hub_id if session else None,
+        })
+    return results, next_cursor
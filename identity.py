@@ -0,0 +1,109 @@
+# minutememo_app/identity.py
+"""
+Cached identity resolution for Flask-Login.
+
+load_user runs on every authenticated request, and most requests only need
+the user's id, email, role, company and active hub. Those fields are cached
+per user id as a slim Principal (in-process TTL cache first, then Redis), so
+resolving the current user normally does not query Postgres at all. Only the
+cache miss loads the User row.
+
+current_user is therefore a Principal, not an ORM instance: code that changes
+the user loads the User row explicitly and calls invalidate() afterwards.
+Other processes drop their copy within LOCAL_CACHE_TTL_SECONDS.
+"""
+import json
+import logging
+import os
+
+import redis
+from cachetools import TTLCache
+
+from extensions import db, get_redis
+from models import Company, User
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_PREFIX = 'identity:v1'
+REDIS_TTL_SECONDS = int(os.getenv('IDENTITY_TTL_SECONDS', 300))
+LOCAL_CACHE_SIZE = int(os.getenv('IDENTITY_LOCAL_SIZE', 4096))
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv('IDENTITY_LOCAL_TTL_SECONDS', 30))
+
+_local_cache = TTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+
+class Principal:
+    """The cached fields of a logged-in user, with the interface Flask-Login expects."""
+
+    __slots__ = (
+        'id', 'email', 'first_name', 'last_name', 'company_id',
+        'active_meeting_hub_id', 'user_type', 'internal_user_role',
+    )
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{name: getattr(user, name) for name in cls.__slots__})
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def get_id(self):
+        return str(self.id)
+
+    @property
+    def company(self):
+        """The user's company, loaded on access."""
+        return db.session.get(Company, self.company_id) if self.company_id else None
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.email}>"
+
+
+def _key(user_id):
+    return f"{IDENTITY_PREFIX}:{user_id}"
+
+
+def load_principal(user_id):
+    """Returns the Principal of a user id, or None if the user does not exist."""
+    user_id = int(user_id)
+    principal = _local_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    try:
+        raw = get_redis().get(_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Identity cache lookup failed for user {user_id}: {str(e)}")
+        raw = None
+
+    if raw is not None:
+        principal = Principal(**json.loads(raw))
+    else:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        try:
+            get_redis().set(_key(user_id), json.dumps(principal.to_dict()), ex=REDIS_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Identity cache write failed for user {user_id}: {str(e)}")
+
+    _local_cache[user_id] = principal
+    return principal
+
+
+def invalidate(user_id):
+    """Drops the cached identity of a user; call after changing the user, its role or its company."""
+    _local_cache.pop(int(user_id), None)
+    try:
+        get_redis().delete(_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate identity of user {user_id}: {str(e)}")
@@ -0,0 +1,106 @@
+# minutememo_app/llm_cache.py
+"""
+Response cache for LLM calls on meeting transcripts.
+
+Entries are keyed by a hash of the transcript content, the prompt template
+(text and version), the model and the response schema, so a changed
+transcript or prompt simply misses the cache instead of needing an explicit
+invalidation. Hits are served from a small in-process LRU/TTL cache first and
+from Redis second; Redis entries use a sliding TTL so rarely used entries
+expire while hot ones stay around.
+"""
+import hashlib
+import json
+import logging
+import os
+
+import redis
+from cachetools import TTLCache
+
+from extensions import get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'llm-cache:v1'
+REDIS_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600))  # 30 days
+LOCAL_CACHE_SIZE = int(os.getenv('LLM_CACHE_LOCAL_SIZE', 256))
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_LOCAL_TTL_SECONDS', 15 * 60))
+
+# TTLCache evicts the least recently used entry once maxsize is reached
+_local_cache = TTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+
+def content_hash(text):
+    """Returns the SHA-256 hex digest of a string (None is treated as empty)."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def make_key(operation, transcript, model, prompt, prompt_version, schema=None):
+    """Builds the cache key for one LLM operation on one transcript."""
+    parts = {
+        'operation': operation,
+        'transcript': content_hash(transcript),
+        'model': model,
+        'prompt': content_hash(prompt),
+        'prompt_version': prompt_version,
+        'schema': content_hash(json.dumps(schema, sort_keys=True)) if schema else None,
+    }
+    digest = content_hash(json.dumps(parts, sort_keys=True))
+    return f"{CACHE_PREFIX}:{operation}:{digest}"
+
+
+def get(key):
+    """Returns the cached value for key, or None on a miss."""
+    if key in _local_cache:
+        return _local_cache[key]
+
+    try:
+        client = get_redis()
+        raw = client.get(key)
+        if raw is None:
+            return None
+        client.expire(key, REDIS_TTL_SECONDS)  # Sliding expiry for entries that are still in use
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache lookup failed for {key}: {str(e)}")
+        return None
+
+    value = json.loads(raw)
+    _local_cache[key] = value
+    return value
+
+
+def store(key, value):
+    """Stores a JSON-serializable value under key in both cache tiers."""
+    _local_cache[key] = value
+    try:
+        get_redis().set(key, json.dumps(value), ex=REDIS_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache write failed for {key}: {str(e)}")
+
+
+def cached(operation, transcript, model, prompt, prompt_version, compute, schema=None):
+    """
+    Returns the cached result of an LLM operation, calling compute() on a miss.
+
+    Args:
+        operation (str): Name of the operation, e.g. 'short_summary'.
+        transcript (str): The transcript the operation runs on.
+        model (str): The model used for the completion.
+        prompt (str): The prompt template sent along with the transcript.
+        prompt_version (str): Version tag of the prompt template.
+        compute (callable): Produces the JSON-serializable result on a miss.
+        schema (dict, optional): Structured output schema, if any.
+
+    Returns:
+        The cached or freshly computed result.
+    """
+    key = make_key(operation, transcript, model, prompt, prompt_version, schema)
+    value = get(key)
+    if value is not None:
+        logger.debug(f"LLM cache hit for {operation} ({key})")
+        return value
+
+    logger.debug(f"LLM cache miss for {operation} ({key})")
+    value = compute()
+    store(key, value)
+    return value
@@ -0,0 +1,38 @@
+"""Add foreign key and access path indexes
+
+Revision ID: 0a7d3e5b9c41
+Revises: f2b6d84e1a93
+Create Date: 2026-10-19 17:11:35.204816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d3e5b9c41'
+down_revision = 'f2b6d84e1a93'
+branch_labels = None
+depends_on = None
+
+# meeting_session.meeting_id, recording.user_id, action_item.meeting_session_id and
+# meeting.meeting_hub_id lead the composite pagination indexes of f2b6d84e1a93.
+INDEXES = [
+    ('ix_recording_meeting_session_id', 'recording', ['meeting_session_id']),
+    ('ix_subscription_company_id_status', 'subscription', ['company_id', 'status']),
+    ('ix_user_meeting_hub_hub_id_user_id', 'user_meeting_hub', ['meeting_hub_id', 'user_id']),
+    ('ix_user_company_id', 'user', ['company_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,61 @@
+"""Add full-text search vectors to transcript segments, sessions and action items
+
+Revision ID: 1c4e9b7f2d58
+Revises: 0a7d3e5b9c41
+Create Date: 2026-10-19 18:03:52.771940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1c4e9b7f2d58'
+down_revision = '0a7d3e5b9c41'
+branch_labels = None
+depends_on = None
+
+# Meetings are held in Dutch; keep in sync with models.SEARCH_CONFIG
+VECTORS = {
+    'transcript_segment': "to_tsvector('dutch'::regconfig, text)",
+    'meeting_session': (
+        "setweight(to_tsvector('dutch'::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('dutch'::regconfig, coalesce(short_summary, '')), 'B') || "
+        "setweight(to_tsvector('dutch'::regconfig, coalesce(long_summary, '')), 'C')"
+    ),
+    'action_item': (
+        "setweight(to_tsvector('dutch'::regconfig, title), 'A') || "
+        "setweight(to_tsvector('dutch'::regconfig, description), 'B')"
+    ),
+}
+
+INDEXES = [
+    ('ix_transcript_segment_hub_id_search_vector', 'transcript_segment', ['meeting_hub_id', 'search_vector']),
+    ('ix_meeting_session_search_vector', 'meeting_session', ['search_vector']),
+    ('ix_action_item_search_vector', 'action_item', ['search_vector']),
+]
+
+
+def upgrade():
+    # Lets one GIN index combine the hub id with the search vector
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+
+    # Stored generated columns are computed for existing rows while the column is added
+    for table, expression in VECTORS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(expression, persisted=True)))
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for table in reversed(list(VECTORS)):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('search_vector')
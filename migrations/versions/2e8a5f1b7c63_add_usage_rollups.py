@@ -0,0 +1,50 @@
+"""Add usage rollups per company and day
+
+Revision ID: 2e8a5f1b7c63
+Revises: 1c4e9b7f2d58
+Create Date: 2026-10-19 19:22:14.508316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e8a5f1b7c63'
+down_revision = '1c4e9b7f2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('usage_rollup',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('recorded_seconds', sa.Integer(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('transcriptions', sa.Integer(), nullable=False),
+    sa.Column('llm_input_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('llm_output_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('active_users', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'day')
+    )
+    op.create_table('usage_active_user',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('company_id', 'day', 'user_id')
+    )
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('audio_seconds', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('audio_seconds')
+
+    op.drop_table('usage_active_user')
+    op.drop_table('usage_rollup')
@@ -0,0 +1,28 @@
+"""Add processing status and state to MeetingSession
+
+Revision ID: 5a1c7e9d2b40
+Revises: 1fe65f02e979
+Create Date: 2026-10-19 09:12:04.381522
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a1c7e9d2b40'
+down_revision = '1fe65f02e979'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('processing_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('processing_state', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('processing_state')
+        batch_op.drop_column('processing_status')
@@ -0,0 +1,94 @@
+"""Move the large text of meeting sessions to meeting_session_body
+
+Revision ID: 5b9d2c7e4f16
+Revises: 2e8a5f1b7c63
+Create Date: 2026-10-19 20:41:07.318224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9d2c7e4f16'
+down_revision = '2e8a5f1b7c63'
+branch_labels = None
+depends_on = None
+
+TEXT_COLUMNS = ['agenda', 'notes', 'transcription', 'short_summary', 'long_summary']
+
+# Meetings are held in Dutch; keep in sync with models.SEARCH_CONFIG
+NAME_VECTOR = "setweight(to_tsvector('dutch'::regconfig, coalesce(name, '')), 'A')"
+SUMMARY_VECTOR = (
+    "setweight(to_tsvector('dutch'::regconfig, coalesce(short_summary, '')), 'B') || "
+    "setweight(to_tsvector('dutch'::regconfig, coalesce(long_summary, '')), 'C')"
+)
+
+
+def upgrade():
+    # The old vector covers the summaries, which cannot be dropped while it depends on them
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
+
+    op.create_table('meeting_session_body',
+    sa.Column('meeting_session_id', sa.Integer(), nullable=False),
+    sa.Column('agenda', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('transcription', sa.Text(), nullable=True),
+    sa.Column('short_summary', sa.Text(), nullable=True),
+    sa.Column('long_summary', sa.Text(), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SUMMARY_VECTOR, persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['meeting_session_id'], ['meeting_session.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('meeting_session_id')
+    )
+
+    # lz4 compresses and decompresses TOASTed text much faster than the default pglz (Postgres 14+
+    # built with lz4); where it is unavailable the default stays
+    for column in TEXT_COLUMNS:
+        op.execute(f"""
+            DO $$
+            BEGIN
+                EXECUTE 'ALTER TABLE meeting_session_body ALTER COLUMN {column} SET COMPRESSION lz4';
+            EXCEPTION WHEN OTHERS THEN
+                RAISE NOTICE 'lz4 compression unavailable for meeting_session_body.{column}: %', SQLERRM;
+            END
+            $$
+        """)
+
+    columns = ', '.join(TEXT_COLUMNS)
+    op.execute(f"""
+        INSERT INTO meeting_session_body (meeting_session_id, {columns})
+        SELECT id, {columns} FROM meeting_session
+        WHERE {' OR '.join(f'{column} IS NOT NULL' for column in TEXT_COLUMNS)}
+    """)
+
+    # The space of the dropped columns is reused by new rows; VACUUM FULL (or pg_repack) reclaims it at once
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        for column in TEXT_COLUMNS:
+            batch_op.drop_column(column)
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(NAME_VECTOR, persisted=True)))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meeting_session_search_vector', 'meeting_session', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_meeting_session_body_search_vector', 'meeting_session_body', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('search_vector')
+        for column in TEXT_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Text(), nullable=True))
+
+    op.execute(f"""
+        UPDATE meeting_session SET {', '.join(f'{column} = body.{column}' for column in TEXT_COLUMNS)}
+        FROM meeting_session_body AS body
+        WHERE body.meeting_session_id = meeting_session.id
+    """)
+    op.drop_table('meeting_session_body')
+
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(f"{NAME_VECTOR} || {SUMMARY_VECTOR}", persisted=True)))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meeting_session_search_vector', 'meeting_session', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
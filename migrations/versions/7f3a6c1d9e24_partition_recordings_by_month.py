@@ -0,0 +1,90 @@
+"""Partition recordings by month and add a BRIN index on session dates
+
+Revision ID: 7f3a6c1d9e24
+Revises: 5b9d2c7e4f16
+Create Date: 2026-10-19 21:36:52.604419
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3a6c1d9e24'
+down_revision = '5b9d2c7e4f16'
+branch_labels = None
+depends_on = None
+
+# Keep in sync with recording_partitions.MONTHS_AHEAD
+MONTHS_AHEAD = 3
+COLUMNS = 'id, file_name, timestamp, user_id, concatenation_status, concatenation_file_name, meeting_session_id'
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _columns():
+    return [
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('file_name', sa.String(length=256), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('concatenation_status', sa.String(length=10), nullable=False),
+        sa.Column('concatenation_file_name', sa.String(length=256), nullable=False),
+        sa.Column('meeting_session_id', sa.Integer(), nullable=False),
+    ]
+
+
+def _create_keys_and_indexes(primary_key):
+    op.create_primary_key('pk_recording', 'recording', primary_key)
+    op.create_foreign_key('recording_user_id_fkey', 'recording', 'user', ['user_id'], ['id'])
+    op.create_foreign_key('recording_meeting_session_id_fkey', 'recording', 'meeting_session', ['meeting_session_id'], ['id'])
+    op.create_index('ix_recording_user_id_timestamp_id', 'recording', ['user_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_recording_meeting_session_id', 'recording', ['meeting_session_id'], unique=False)
+
+
+def upgrade():
+    op.create_table('recording_partitioned', *_columns(), postgresql_partition_by='RANGE (timestamp)')
+
+    # One partition per month from the oldest recording until MONTHS_AHEAD months from now
+    oldest = op.get_bind().execute(sa.text('SELECT min(timestamp) FROM recording')).scalar() or datetime.utcnow()
+    month = date(oldest.year, oldest.month, 1)
+    today = datetime.utcnow().date()
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE recording_y{month.year}m{month.month:02d} PARTITION OF recording_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute('CREATE TABLE recording_default PARTITION OF recording_partitioned DEFAULT')
+
+    op.execute(f'INSERT INTO recording_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM recording')
+    op.drop_table('recording')
+    op.rename_table('recording_partitioned', 'recording')
+
+    # Unique keys of a partitioned table must contain the partition key, so id alone is no longer
+    # enforced unique; ids are random UUIDs. These are built in the migration's transaction: Postgres
+    # cannot index a partitioned table CONCURRENTLY, and the copied table is locked by the swap anyway
+    _create_keys_and_indexes(['id', 'timestamp'])
+
+    # meeting_session is referenced by too many tables to partition (their foreign keys would need
+    # session_datetime); date range scans of it get a BRIN index, which stays tiny on append-mostly data
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meeting_session_session_datetime_brin', 'meeting_session', ['session_datetime'], unique=False, postgresql_using='brin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_meeting_session_session_datetime_brin', table_name='meeting_session', postgresql_concurrently=True, if_exists=True)
+
+    # Rows of detached partitions are not moved back
+    op.create_table('recording_unpartitioned', *_columns())
+    op.execute(f'INSERT INTO recording_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM recording')
+    op.drop_table('recording')
+    op.rename_table('recording_unpartitioned', 'recording')
+    _create_keys_and_indexes(['id'])
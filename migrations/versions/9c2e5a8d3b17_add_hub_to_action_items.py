@@ -0,0 +1,56 @@
+"""Add the hub and a due date sort key to action items for the hub board
+
+Revision ID: 9c2e5a8d3b17
+Revises: 7f3a6c1d9e24
+Create Date: 2026-10-19 22:18:40.927563
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2e5a8d3b17'
+down_revision = '7f3a6c1d9e24'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_action_item_hub_id_completed_due_sort_id', ['meeting_hub_id', 'completed', 'due_date_sort', 'id'], None),
+    ('ix_action_item_hub_id_assignee_completed_due_sort_id', ['meeting_hub_id', 'assigned_to', 'completed', 'due_date_sort', 'id'], None),
+    ('ix_action_item_hub_id_search_vector', ['meeting_hub_id', 'search_vector'], 'gin'),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('action_item', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('meeting_hub_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('due_date_sort', sa.DateTime(), sa.Computed("coalesce(due_date, '9999-12-31'::timestamp)", persisted=True)))
+        batch_op.create_foreign_key('action_item_meeting_hub_id_fkey', 'meeting_hub', ['meeting_hub_id'], ['id'])
+
+    # Backfill the hub of existing items from their session's meeting
+    op.execute("""
+        UPDATE action_item SET meeting_hub_id = meeting.meeting_hub_id
+        FROM meeting_session JOIN meeting ON meeting.id = meeting_session.meeting_id
+        WHERE meeting_session.id = action_item.meeting_session_id
+    """)
+    # Open items are filtered with completed = false, which NULL would never match
+    op.execute('UPDATE action_item SET completed = false WHERE completed IS NULL')
+
+    with op.get_context().autocommit_block():
+        for name, columns, using in INDEXES:
+            op.create_index(name, 'action_item', columns, unique=False, postgresql_using=using, postgresql_concurrently=True, if_not_exists=True)
+        # Replaced by the hub-scoped search index
+        op.drop_index('ix_action_item_search_vector', table_name='action_item', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_action_item_search_vector', 'action_item', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        for name, columns, using in reversed(INDEXES):
+            op.drop_index(name, table_name='action_item', postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('action_item', schema=None) as batch_op:
+        batch_op.drop_constraint('action_item_meeting_hub_id_fkey', type_='foreignkey')
+        batch_op.drop_column('due_date_sort')
+        batch_op.drop_column('meeting_hub_id')
@@ -0,0 +1,40 @@
+"""Add archived recordings of detached recording partitions
+
+Revision ID: a3e6f9c2d5b8
+Revises: d1f5a9c3e7b2
+Create Date: 2026-10-20 11:38:06.917452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3e6f9c2d5b8'
+down_revision = 'd1f5a9c3e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archived_recording',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('file_name', sa.String(length=256), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('meeting_session_id', sa.Integer(), nullable=False),
+    sa.Column('partition_name', sa.String(length=64), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['meeting_session_id'], ['meeting_session.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The table is new and empty, so its indexes are built in the migration's transaction
+    op.create_index('ix_archived_recording_user_id_timestamp_id', 'archived_recording', ['user_id', 'timestamp', 'id'], unique=False)
+    op.create_index(op.f('ix_archived_recording_meeting_session_id'), 'archived_recording', ['meeting_session_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_archived_recording_meeting_session_id'), table_name='archived_recording')
+    op.drop_index('ix_archived_recording_user_id_timestamp_id', table_name='archived_recording')
+    op.drop_table('archived_recording')
@@ -0,0 +1,41 @@
+"""Add the hub to meeting sessions for the hub session listing
+
+Revision ID: b4d8e2f6a3c9
+Revises: 9c2e5a8d3b17
+Create Date: 2026-10-20 09:12:37.482915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d8e2f6a3c9'
+down_revision = '9c2e5a8d3b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('meeting_hub_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('meeting_session_meeting_hub_id_fkey', 'meeting_hub', ['meeting_hub_id'], ['id'])
+
+    # Backfill the hub of existing sessions from their meeting
+    op.execute("""
+        UPDATE meeting_session SET meeting_hub_id = meeting.meeting_hub_id
+        FROM meeting
+        WHERE meeting.id = meeting_session.meeting_id
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meeting_session_hub_id_datetime_id', 'meeting_session', ['meeting_hub_id', 'session_datetime', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_meeting_session_hub_id_datetime_id', table_name='meeting_session', postgresql_concurrently=True, if_exists=True)
+
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_constraint('meeting_session_meeting_hub_id_fkey', type_='foreignkey')
+        batch_op.drop_column('meeting_hub_id')
@@ -0,0 +1,40 @@
+"""Add rolling series summary to Meeting
+
+Revision ID: b7e2f4a19c63
+Revises: 5a1c7e9d2b40
+Create Date: 2026-10-19 10:41:27.905113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2f4a19c63'
+down_revision = '5a1c7e9d2b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('series_summary', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('series_session_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('series_summary_updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('in_series_summary', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    # Remove server defaults after existing rows are updated
+    op.alter_column('meeting', 'series_session_count', server_default=None)
+    op.alter_column('meeting_session', 'in_series_summary', server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('in_series_summary')
+
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.drop_column('series_summary_updated_at')
+        batch_op.drop_column('series_session_count')
+        batch_op.drop_column('series_summary')
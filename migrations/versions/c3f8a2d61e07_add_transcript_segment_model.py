@@ -0,0 +1,42 @@
+"""Add TranscriptSegment model
+
+Revision ID: c3f8a2d61e07
+Revises: b7e2f4a19c63
+Create Date: 2026-10-19 11:58:03.417220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a2d61e07'
+down_revision = 'b7e2f4a19c63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('transcript_segment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meeting_session_id', sa.Integer(), nullable=False),
+    sa.Column('meeting_hub_id', sa.Integer(), nullable=True),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('embedding', sa.LargeBinary(), nullable=False),
+    sa.Column('embedding_model', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['meeting_session_id'], ['meeting_session.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['meeting_hub_id'], ['meeting_hub.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('transcript_segment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_transcript_segment_meeting_session_id'), ['meeting_session_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transcript_segment_meeting_hub_id'), ['meeting_hub_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transcript_segment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transcript_segment_meeting_hub_id'))
+        batch_op.drop_index(batch_op.f('ix_transcript_segment_meeting_session_id'))
+
+    op.drop_table('transcript_segment')
@@ -0,0 +1,26 @@
+"""Add the series summary folding claim to meeting sessions
+
+Revision ID: d1f5a9c3e7b2
+Revises: b4d8e2f6a3c9
+Create Date: 2026-10-20 10:04:51.276318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1f5a9c3e7b2'
+down_revision = 'b4d8e2f6a3c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('series_folding_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('series_folding_at')
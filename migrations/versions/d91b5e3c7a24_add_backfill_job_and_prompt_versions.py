@@ -0,0 +1,45 @@
+"""Add BackfillJob model and prompt versions to MeetingSession
+
+Revision ID: d91b5e3c7a24
+Revises: c3f8a2d61e07
+Create Date: 2026-10-19 13:12:45.608931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b5e3c7a24'
+down_revision = 'c3f8a2d61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('backfill_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('prompt_version', sa.String(length=32), nullable=False),
+    sa.Column('filters', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('batches', sa.JSON(), nullable=False),
+    sa.Column('total_sessions', sa.Integer(), nullable=False),
+    sa.Column('processed_sessions', sa.Integer(), nullable=False),
+    sa.Column('failed_sessions', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary_prompt_version', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('action_points_prompt_version', sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('action_points_prompt_version')
+        batch_op.drop_column('summary_prompt_version')
+
+    op.drop_table('backfill_job')
@@ -0,0 +1,32 @@
+"""Add LLM token counts to MeetingSession
+
+Revision ID: e4a7c0b9d315
+Revises: d91b5e3c7a24
+Create Date: 2026-10-19 14:26:09.118457
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c0b9d315'
+down_revision = 'd91b5e3c7a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('llm_input_tokens', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('llm_output_tokens', sa.Integer(), nullable=False, server_default='0'))
+
+    # Remove server defaults after existing rows are updated
+    op.alter_column('meeting_session', 'llm_input_tokens', server_default=None)
+    op.alter_column('meeting_session', 'llm_output_tokens', server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table('meeting_session', schema=None) as batch_op:
+        batch_op.drop_column('llm_output_tokens')
+        batch_op.drop_column('llm_input_tokens')
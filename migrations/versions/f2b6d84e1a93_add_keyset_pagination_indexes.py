@@ -0,0 +1,36 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: f2b6d84e1a93
+Revises: e4a7c0b9d315
+Create Date: 2026-10-19 16:02:47.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b6d84e1a93'
+down_revision = 'e4a7c0b9d315'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_meeting_hub_id_id', 'meeting', ['meeting_hub_id', 'id']),
+    ('ix_meeting_session_meeting_id_datetime_id', 'meeting_session', ['meeting_id', 'session_datetime', 'id']),
+    ('ix_action_item_session_id_sorting_id_id', 'action_item', ['meeting_session_id', 'sorting_id', 'id']),
+    ('ix_recording_user_id_timestamp_id', 'recording', ['user_id', 'timestamp', 'id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY does not block writes but cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -3,7 +3,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from extensions import db
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.ext.associationproxy import association_proxy
 from datetime import datetime
 
 class Company(db.Model):
@@ -33,7 +34,7 @@ class User(UserMixin, db.Model):
     password_hash = db.Column(db.String(512), nullable=False)
     first_name = db.Column(db.String(64))
     last_name = db.Column(db.String(64))
-    company_id = db.Column(db.Integer, db.ForeignKey('company.id'))
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), index=True)
     recordings = db.relationship('Recording', backref='user', lazy=True)
     meeting_hubs = db.relationship('MeetingHub', secondary='user_meeting_hub', backref=db.backref('users', lazy=True))
     meetings = db.relationship('Meeting', secondary='user_meeting', backref=db.backref('users', lazy=True))
@@ -52,7 +53,10 @@ class User(UserMixin, db.Model):
 
 
 class Subscription(db.Model):
-    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+    __table_args__ = (
+        db.Index('ix_subscription_company_id_status', 'company_id', 'status'),  # A company's active subscription
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)  # Link to the Company
@@ -101,7 +105,10 @@ class MeetingHub(db.Model):
 
 
 class Meeting(db.Model):
-    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+    __table_args__ = (
+        db.Index('ix_meeting_hub_id_id', 'meeting_hub_id', 'id'),  # Keyset pagination of a hub's meetings
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), nullable=False)
@@ -109,26 +116,86 @@ class Meeting(db.Model):
     meeting_hub_id = db.Column(db.Integer, db.ForeignKey('meeting_hub.id'), nullable=False)
     is_recurring = db.Column(db.Boolean, default=False)
     meeting_sessions = db.relationship('MeetingSession', backref='meeting', lazy=True)
+    series_summary = db.deferred(db.Column(db.Text))  # Running summary of all sessions of a recurring meeting
+    series_session_count = db.Column(db.Integer, nullable=False, default=0)  # Sessions folded into series_summary
+    series_summary_updated_at = db.Column(db.DateTime)
+
+
+# Meetings are held in Dutch (transcripts are transcribed with language="nl")
+SEARCH_CONFIG = 'dutch'
 
 
 class MeetingSession(db.Model):
-    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+    __table_args__ = (
+        db.Index('ix_meeting_session_meeting_id_datetime_id', 'meeting_id', 'session_datetime', 'id'),  # Keyset pagination of a meeting's sessions
+        db.Index('ix_meeting_session_hub_id_datetime_id', 'meeting_hub_id', 'session_datetime', 'id'),  # Keyset pagination of a hub's sessions
+        db.Index('ix_meeting_session_search_vector', 'search_vector', postgresql_using='gin'),  # Full-text search
+        db.Index('ix_meeting_session_session_datetime_brin', 'session_datetime', postgresql_using='brin'),  # Date range scans
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(256), nullable=False)
     session_datetime = db.Column(db.DateTime, nullable=False)
-    agenda = db.Column(db.Text)
-    notes = db.Column(db.Text)
     meeting_id = db.Column(db.Integer, db.ForeignKey('meeting.id'), nullable=True)
+    meeting_hub_id = db.Column(db.Integer, db.ForeignKey('meeting_hub.id'), nullable=True)  # Denormalized from the meeting for hub listings
     audio_url = db.Column(db.Text)  # Audio URL for the session
-    transcription = db.Column(db.Text)  # Field for storing the transcription
     recordings = db.relationship('Recording', backref='meeting_session', lazy=True)
     action_items = db.relationship('ActionItem', backref='meeting_session', lazy=True)
-    short_summary = db.Column(db.Text)  # Store short summary
-    long_summary = db.Column(db.Text)  # Store long summary
+    # Large text bodies live in meeting_session_body and load on first access
+    body = db.relationship('MeetingSessionBody', uselist=False, lazy='select', cascade='all, delete-orphan')
+    agenda = association_proxy('body', 'agenda', creator=lambda value: MeetingSessionBody(agenda=value))
+    notes = association_proxy('body', 'notes', creator=lambda value: MeetingSessionBody(notes=value))
+    transcription = association_proxy('body', 'transcription', creator=lambda value: MeetingSessionBody(transcription=value))
+    short_summary = association_proxy('body', 'short_summary', creator=lambda value: MeetingSessionBody(short_summary=value))
+    long_summary = association_proxy('body', 'long_summary', creator=lambda value: MeetingSessionBody(long_summary=value))
+    processing_status = db.Column(db.String(20))  # Post-recording workflow: 'pending', 'processing', 'ready' or 'error'
+    processing_state = db.Column(db.JSON)  # Per-stage state of the post-recording workflow
+    in_series_summary = db.Column(db.Boolean, nullable=False, default=False)  # Folded into the meeting's series summary
+    series_folding_at = db.Column(db.DateTime)  # Claimed for folding into the series summary; cleared when done
+    summary_prompt_version = db.Column(db.String(32))  # Prompt version that produced the stored summaries
+    action_points_prompt_version = db.Column(db.String(32))  # Prompt version that produced the stored action items
+    llm_input_tokens = db.Column(db.Integer, nullable=False, default=0)  # Prompt tokens of all LLM calls for this session
+    llm_output_tokens = db.Column(db.Integer, nullable=False, default=0)  # Completion tokens of all LLM calls for this session
+    audio_seconds = db.Column(db.Float)  # Length of the concatenated recording
+    # Full-text search over the name, maintained by Postgres (the summaries are indexed in meeting_session_body)
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(name, '')), 'A')",
+        persisted=True
+    )))
+
+class MeetingSessionBody(db.Model):
+    __table_args__ = (
+        db.Index('ix_meeting_session_body_search_vector', 'search_vector', postgresql_using='gin'),  # Full-text search
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
+
+    # The large text of a session, kept out of meeting_session so its rows stay narrow
+    TEXT_FIELDS = ('agenda', 'notes', 'transcription', 'short_summary', 'long_summary')
+
+    meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id', ondelete='CASCADE'), primary_key=True)
+    agenda = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    transcription = db.deferred(db.Column(db.Text))  # Only loaded where the transcript itself is needed
+    short_summary = db.Column(db.Text)
+    long_summary = db.Column(db.Text)
+    # Full-text search over the summaries, maintained by Postgres
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(short_summary, '')), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(long_summary, '')), 'C')",
+        persisted=True
+    )))
 
 class ActionItem(db.Model):
-    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+    __table_args__ = (
+        db.Index('ix_action_item_session_id_sorting_id_id', 'meeting_session_id', 'sorting_id', 'id'),  # Keyset pagination in display order
+        # Hub board: open/completed items by due date, optionally of one assignee
+        db.Index('ix_action_item_hub_id_completed_due_sort_id', 'meeting_hub_id', 'completed', 'due_date_sort', 'id'),
+        db.Index('ix_action_item_hub_id_assignee_completed_due_sort_id', 'meeting_hub_id', 'assigned_to', 'completed', 'due_date_sort', 'id'),
+        # Full-text search within a set of hubs from one index (btree_gin provides the integer column)
+        db.Index('ix_action_item_hub_id_search_vector', 'meeting_hub_id', 'search_vector', postgresql_using='gin'),
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -138,7 +205,15 @@ class ActionItem(db.Model):
     completed = db.Column(db.Boolean, default=False)
     status = db.Column(db.String(50), nullable=False, default='explicit')
     meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id'), nullable=False)
+    meeting_hub_id = db.Column(db.Integer, db.ForeignKey('meeting_hub.id'), nullable=True)  # Denormalized for the hub board and search
     sorting_id = db.Column(db.Integer, nullable=False)
+    # Due date with items without one sorted last, so the board's keyset never compares NULLs
+    due_date_sort = db.Column(db.DateTime, db.Computed("coalesce(due_date, '9999-12-31'::timestamp)", persisted=True))
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(  # Full-text search, maintained by Postgres
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, title), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, description), 'B')",
+        persisted=True
+    )))
 
     def to_dict(self):
         return {
@@ -150,19 +225,127 @@ class ActionItem(db.Model):
             'completed': self.completed,
             'status': self.status,
             'meeting_session_id': self.meeting_session_id,
+            'meeting_hub_id': self.meeting_hub_id,
             'sorting_id': self.sorting_id
         }
 
-class Recording(db.Model):
+class TranscriptSegment(db.Model):
+    __table_args__ = (
+        # Full-text search within a set of hubs from one index (btree_gin provides the integer column)
+        db.Index('ix_transcript_segment_hub_id_search_vector', 'meeting_hub_id', 'search_vector', postgresql_using='gin'),
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id', ondelete='CASCADE'), nullable=False, index=True)
+    meeting_hub_id = db.Column(db.Integer, db.ForeignKey('meeting_hub.id'), nullable=True, index=True)  # Denormalized for per-hub search
+    position = db.Column(db.Integer, nullable=False)  # Order of the segment within the transcript
+    text = db.Column(db.Text, nullable=False)
+    embedding = db.Column(db.LargeBinary, nullable=False)  # L2-normalized float32 vector
+    embedding_model = db.Column(db.String(64), nullable=False)  # Provider and dimensions the embedding was made with
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(  # Full-text search, maintained by Postgres
+        f"to_tsvector('{SEARCH_CONFIG}'::regconfig, text)", persisted=True
+    )))
+
+class BackfillJob(db.Model):
+    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)  # 'summaries' or 'action_points'
+    prompt_version = db.Column(db.String(32), nullable=False)  # Version the selected sessions are regenerated with
+    filters = db.Column(db.JSON, nullable=False, default=dict)  # Session selection: hub_id, since, until, prompt_version
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'running', 'completed', 'failed' or 'cancelled'
+    batches = db.Column(db.JSON, nullable=False, default=list)  # One entry per submitted OpenAI batch
+    total_sessions = db.Column(db.Integer, nullable=False, default=0)
+    processed_sessions = db.Column(db.Integer, nullable=False, default=0)
+    failed_sessions = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'prompt_version': self.prompt_version,
+            'filters': self.filters,
+            'status': self.status,
+            'batches': len(self.batches or []),
+            'total_sessions': self.total_sessions,
+            'processed_sessions': self.processed_sessions,
+            'failed_sessions': self.failed_sessions,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+
+class UsageRollup(db.Model):
+    __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
+
+    # One row per company and (UTC) day, maintained by usage_rollups.py
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    recorded_seconds = db.Column(db.Integer, nullable=False, default=0)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    transcriptions = db.Column(db.Integer, nullable=False, default=0)
+    llm_input_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    llm_output_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    active_users = db.Column(db.Integer, nullable=False, default=0)  # Distinct users who recorded that day
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'company_id': self.company_id,
+            'day': self.day.isoformat(),
+            'recorded_minutes': round(self.recorded_seconds / 60, 1),
+            'sessions': self.sessions,
+            'transcriptions': self.transcriptions,
+            'llm_input_tokens': self.llm_input_tokens,
+            'llm_output_tokens': self.llm_output_tokens,
+            'active_users': self.active_users
+        }
+
+class UsageActiveUser(db.Model):
     __table_args__ = {'extend_existing': True}  # Prevent table redefinition error
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, nullable=False)
+    # Users counted in UsageRollup.active_users, so each is only counted once per day
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+
+class Recording(db.Model):
+    __table_args__ = (
+        db.Index('ix_recording_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),  # Keyset pagination of a user's recordings
+        # Monthly partitions, maintained by recording_partitions.py
+        {'extend_existing': True, 'postgresql_partition_by': 'RANGE (timestamp)'},  # Prevent table redefinition error
+    )
+
+    # The table's primary key includes the partition key; rows are still identified by id alone
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     file_name = db.Column(db.String(256), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     concatenation_status = db.Column(db.String(10), nullable=False)
     concatenation_file_name = db.Column(db.String(256), nullable=False)
-    meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id'), nullable=False)
+    meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id'), nullable=False, index=True)
+
+    __mapper_args__ = {'primary_key': [id]}
+
+
+class ArchivedRecording(db.Model):
+    __table_args__ = (
+        db.Index('ix_archived_recording_user_id_timestamp_id', 'user_id', 'timestamp', 'id'),  # Keyset pagination of a user's archived recordings
+        {'extend_existing': True},  # Prevent table redefinition error
+    )
+
+    # Recordings of detached partitions, recorded by recording_partitions.detach_partition
+    id = db.Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    file_name = db.Column(db.String(256), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    meeting_session_id = db.Column(db.Integer, db.ForeignKey('meeting_session.id'), nullable=False, index=True)
+    partition_name = db.Column(db.String(64), nullable=False)  # Detached table that still holds the row
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
 
 # Junction table to manage many-to-many relationship between User and MeetingHub
@@ -170,6 +353,7 @@ user_meeting_hub = db.Table('user_meeting_hub',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
     db.Column('meeting_hub_id', db.Integer, db.ForeignKey('meeting_hub.id'), primary_key=True),
     db.UniqueConstraint('user_id', 'meeting_hub_id'),
+    db.Index('ix_user_meeting_hub_hub_id_user_id', 'meeting_hub_id', 'user_id'),  # Members of a hub; the primary key covers a user's hubs
     extend_existing=True,  # Apply extend_existing in the table_args
 )
 
@@ -0,0 +1,309 @@
+# minutememo_app/openai_client.py
+"""
+Process-wide OpenAI client.
+
+All OpenAI traffic goes through one client per process so TLS sessions and
+keep-alive connections are reused across requests and Celery tasks. Calls are
+wrapped with jittered exponential backoff that honours Retry-After, an overall
+per-call deadline, and latency/token metrics, and every attempt draws from the
+shared rate budget in rate_governor.py.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+import openai
+from openai import OpenAI
+
+import rate_governor
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by every call made from this process
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv('OPENAI_MAX_CONNECTIONS', 20)),
+    max_keepalive_connections=int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', 10)),
+    keepalive_expiry=60.0,
+)
+# Timeout for a single attempt; long transcriptions may need the full read timeout
+ATTEMPT_TIMEOUT = httpx.Timeout(connect=5.0, read=300.0, write=60.0, pool=10.0)
+
+DEFAULT_DEADLINE_SECONDS = 120.0
+MAX_ATTEMPTS = int(os.getenv('OPENAI_MAX_ATTEMPTS', 5))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call's deadline passes before an attempt could be sent."""
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_client():
+    """
+    Returns the OpenAI client for this process, creating it on first use.
+
+    The client is rebuilt after a fork (gunicorn and Celery prefork workers)
+    so connection pools are never shared between processes. SDK-level retries
+    are disabled because call() implements its own retry policy.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                http_client = httpx.Client(
+                    http2=_http2_available(),
+                    limits=POOL_LIMITS,
+                    timeout=ATTEMPT_TIMEOUT,
+                )
+                _client = OpenAI(
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    http_client=http_client,
+                    max_retries=0,
+                    timeout=ATTEMPT_TIMEOUT,
+                )
+                _client_pid = pid
+    return _client
+
+
+def _is_retryable(exc):
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _retry_after_seconds(exc):
+    """Returns the server-requested delay from Retry-After headers, if any."""
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
+
+    retry_after_ms = response.headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = response.headers.get('retry-after')
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def _backoff_seconds(attempt):
+    """Full-jitter exponential backoff for the given (1-based) attempt."""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def _record(operation, latency, attempts, error=None, usage=None):
+    with _metrics_lock:
+        stats = _metrics.setdefault(operation, {
+            'calls': 0,
+            'errors': 0,
+            'retries': 0,
+            'total_latency_ms': 0.0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+        })
+        stats['calls'] += 1
+        stats['retries'] += attempts - 1
+        stats['total_latency_ms'] += latency * 1000
+        if error is not None:
+            stats['errors'] += 1
+        if usage is not None:
+            stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+            stats['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+    if error is not None:
+        logger.error(f"OpenAI {operation} failed after {attempts} attempt(s) in {latency * 1000:.0f} ms: {str(error)}")
+    else:
+        tokens = ''
+        if usage is not None:
+            tokens = f", tokens in/out: {getattr(usage, 'prompt_tokens', 0)}/{getattr(usage, 'completion_tokens', 0)}"
+        logger.info(f"OpenAI {operation} completed in {latency * 1000:.0f} ms after {attempts} attempt(s){tokens}")
+
+
+def get_metrics():
+    """Returns a snapshot of the per-operation call metrics of this process."""
+    with _metrics_lock:
+        return {operation: dict(stats) for operation, stats in _metrics.items()}
+
+
+def call(operation, fn, deadline=DEFAULT_DEADLINE_SECONDS, model=None, estimated_tokens=0, record=True):
+    """
+    Runs an OpenAI request with retries, backoff and a deadline.
+
+    Args:
+        operation (str): Name used for logging and metrics, e.g. 'short_summary'.
+        fn (callable): Called as fn(client, timeout) and performs one attempt.
+        deadline (float): Total seconds allowed across all attempts.
+        model (str, optional): Model the request is for; enables the shared rate governor.
+        estimated_tokens (int): Estimated tokens of one attempt, reserved with the governor.
+        record (bool): Whether to record the call in the metrics; callers that
+            record the whole operation themselves (streams) pass False.
+
+    Returns:
+        Whatever fn returns for the first successful attempt.
+
+    Raises:
+        The last OpenAI error when the request is not retryable, the attempts
+        are exhausted or the deadline would be exceeded, RateBudgetExceeded
+        when no rate-limit capacity frees up before the deadline, or
+        DeadlineExceeded when waiting for capacity used up the deadline.
+    """
+    def record_call(**kwargs):
+        if record:
+            _record(operation, time.monotonic() - started, attempt, **kwargs)
+
+    client = get_client()
+    started = time.monotonic()
+    expires = started + deadline
+    attempt = 0
+
+    while True:
+        attempt += 1
+        if model:
+            try:
+                rate_governor.acquire(model, estimated_tokens, max_wait=expires - time.monotonic())
+            except rate_governor.RateBudgetExceeded as e:
+                record_call(error=e)
+                raise
+
+        # Waiting for capacity may have used up the deadline; a zero timeout is bound to fail
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            error = DeadlineExceeded(f"OpenAI {operation} deadline of {deadline:.0f}s passed before attempt {attempt}")
+            record_call(error=error)
+            raise error
+        timeout = httpx.Timeout(
+            connect=min(ATTEMPT_TIMEOUT.connect, remaining),
+            read=min(ATTEMPT_TIMEOUT.read, remaining),
+            write=min(ATTEMPT_TIMEOUT.write, remaining),
+            pool=min(ATTEMPT_TIMEOUT.pool, remaining),
+        )
+        try:
+            result = fn(client, timeout)
+        except openai.OpenAIError as e:
+            if not _is_retryable(e) or attempt >= MAX_ATTEMPTS:
+                record_call(error=e)
+                raise
+
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = _backoff_seconds(attempt)
+            if time.monotonic() + delay >= expires:
+                record_call(error=e)
+                raise
+
+            logger.warning(f"OpenAI {operation} attempt {attempt} failed ({str(e)}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            continue
+
+        usage = getattr(result, 'usage', None)
+        if model and usage is not None:
+            rate_governor.settle(model, estimated_tokens, getattr(usage, 'total_tokens', None))
+        record_call(usage=usage)
+        return result
+
+
+def chat_completion(operation, deadline=DEFAULT_DEADLINE_SECONDS, **kwargs):
+    """Creates a chat completion through the shared client; kwargs go to the SDK."""
+    return call(
+        operation,
+        lambda client, timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+        deadline=deadline,
+        model=kwargs.get('model'),
+        estimated_tokens=rate_governor.estimate_tokens(kwargs.get('messages', [])),
+    )
+
+
+def transcription(operation, file_path, deadline=600.0, **kwargs):
+    """Transcribes an audio file through the shared client; kwargs go to the SDK."""
+    def attempt(client, timeout):
+        # Reopen the file for every attempt so a retry uploads it from the start
+        with open(file_path, 'rb') as audio_file:
+            return client.audio.transcriptions.create(file=audio_file, timeout=timeout, **kwargs)
+
+    return call(operation, attempt, deadline=deadline, model=kwargs.get('model'))
+
+
+def stream_chat_completion(operation, deadline=DEFAULT_DEADLINE_SECONDS, on_usage=None, **kwargs):
+    """
+    Streams a chat completion through the shared client, yielding content deltas.
+
+    Retries only cover opening the stream; once tokens have been yielded a
+    failure is raised to the caller. Token usage is requested in the final
+    chunk so streamed calls show up in the metrics like regular ones, and is
+    passed to on_usage(usage) when given. The call is recorded once, under
+    operation, when the stream ends.
+    """
+    started = time.monotonic()
+    try:
+        stream = call(
+            operation,
+            lambda client, timeout: client.chat.completions.create(
+                timeout=timeout,
+                stream=True,
+                stream_options={'include_usage': True},
+                **kwargs
+            ),
+            deadline=deadline,
+            model=kwargs.get('model'),
+            estimated_tokens=rate_governor.estimate_tokens(kwargs.get('messages', [])),
+            record=False,
+        )
+    except Exception as e:
+        _record(operation, time.monotonic() - started, 1, error=e)
+        raise
+
+    usage = None
+    try:
+        for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except openai.OpenAIError as e:
+        _record(operation, time.monotonic() - started, 1, error=e)
+        raise
+    finally:
+        stream.close()
+
+    if usage is not None:
+        if on_usage is not None:
+            on_usage(usage)
+        rate_governor.settle(
+            kwargs.get('model'),
+            rate_governor.estimate_tokens(kwargs.get('messages', [])),
+            getattr(usage, 'total_tokens', None)
+        )
+    _record(operation, time.monotonic() - started, 1, usage=usage)
@@ -0,0 +1,212 @@
+# minutememo_app/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are selected with a WHERE on the sort key of the last row of the
+previous page instead of OFFSET, so every page costs the same no matter how
+deep the client pages. The sort key always ends in a unique column (usually
+the primary key) to make the order total. Cursors are opaque to clients.
+
+List endpoints also take a fields= argument (a sparse fieldset) so clients
+only receive, and the database only reads, the columns they display.
+"""
+import base64
+import hashlib
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select, text, tuple_
+
+from extensions import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Filtered totals are counted exactly up to this many rows and reported as "at least" beyond
+COUNT_CAP = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised for cursors that cannot be decoded or do not match the requested sort."""
+
+
+class InvalidFields(ValueError):
+    """Raised for a fields argument that names fields the listing does not have."""
+
+
+def encode_cursor(values, sort):
+    """
+    Encodes the sort key of a row into an opaque, URL-safe cursor.
+
+    sort names the order the values belong to (see sort_signature); the cursor
+    is only accepted back for the same order.
+    """
+    payload = {
+        'sort': sort,
+        'values': [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, key_count, sort):
+    """Decodes a cursor created by encode_cursor for the same sort into its list of key values."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(payload, dict) or payload.get('sort') != sort:
+        raise InvalidCursor('Cursor does not match the requested sort')
+    values = payload.get('values')
+    if not isinstance(values, list) or len(values) != key_count:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def sort_signature(keys, descending):
+    """Identifies an order by its key expressions and direction, e.g. to tell sort=name from sort=id."""
+    expressions = ','.join(str(expression) for expression, _ in keys)
+    digest = hashlib.blake2b(expressions.encode('utf-8'), digest_size=6).hexdigest()
+    return f"{digest}:{'desc' if descending else 'asc'}"
+
+
+def _cursor_value(value, expression, convert=None):
+    """Converts a decoded cursor value to the Python type of its key expression."""
+    if value is None:
+        return None
+    try:
+        if convert is not None:
+            value = convert(value)
+        python_type = expression.type.python_type
+    except NotImplementedError:
+        return value
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidCursor('Invalid cursor')
+
+    try:
+        if python_type is datetime and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif python_type is uuid.UUID and isinstance(value, str):
+            value = uuid.UUID(value)
+    except ValueError:
+        raise InvalidCursor('Invalid cursor')
+
+    # bool is an int subclass but never a valid id or count
+    if python_type is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, python_type) and (python_type is bool or not isinstance(value, bool))
+    if not valid:
+        raise InvalidCursor('Invalid cursor')
+    return value
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE):
+    """Parses a limit request argument, clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE)) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_fields(value, available, default):
+    """
+    Parses a comma-separated fields request argument.
+
+    Args:
+        value (str): The fields argument; None or empty selects the default fields.
+        available (iterable): Field names the listing can return.
+        default (iterable): Field names returned when no fields are requested.
+
+    Returns:
+        list: The selected field names, in request order.
+
+    Raises:
+        InvalidFields: If a requested field is not available.
+    """
+    if not value:
+        return list(default)
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def page_query(query, keys, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=False, key_types=None):
+    """
+    Returns the query for one page: past the cursor, ordered by keys, limit + 1 rows.
+
+    Takes the arguments of paginate(); the extra row tells whether there is a next page.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded or belongs to another sort.
+    """
+    expressions = [expression for expression, _ in keys]
+    if cursor:
+        values = decode_cursor(cursor, len(keys), sort_signature(keys, descending))
+        converters = list(key_types or []) + [None] * len(keys)
+        values = [
+            _cursor_value(value, expression, convert)
+            for value, expression, convert in zip(values, expressions, converters)
+        ]
+        # Row-value comparison: (a, b) > (x, y) uses a matching composite index
+        if descending:
+            query = query.filter(tuple_(*expressions) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*expressions) > tuple_(*values))
+
+    order = [expression.desc() if descending else expression.asc() for expression in expressions]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def paginate(query, keys, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=False, key_types=None):
+    """
+    Returns one page of a query ordered by keys.
+
+    Args:
+        query: SQLAlchemy ORM query with all filters applied and no ORDER BY.
+        keys (list): (expression, getter) pairs making up the sort key; the last
+            must be unique. getter(row) returns the expression's value for a row.
+        cursor (str, optional): next_cursor of the previous page.
+        limit (int): Page size.
+        descending (bool): Sort direction for all keys.
+        key_types (list, optional): Callables converting decoded cursor values
+            back to column types, e.g. datetime.fromisoformat; None keeps the value.
+            Every value is then checked against its key expression's type.
+
+    Returns:
+        tuple: (rows, next_cursor); next_cursor is None on the last page.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded, belongs to another sort or
+            holds values of the wrong type.
+    """
+    rows = page_query(query, keys, cursor, limit, descending, key_types).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getter(rows[-1]) for _, getter in keys], sort_signature(keys, descending))
+    return rows, next_cursor
+
+
+def estimate_total(query, table_name=None):
+    """
+    Returns (total, is_estimate) for a listing.
+
+    Unfiltered listings use the planner's row estimate for the table
+    (pg_class.reltuples), which costs nothing. Filtered listings are counted
+    exactly up to COUNT_CAP rows, so the count never scans more than that.
+    """
+    if table_name:
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {'table_name': table_name}
+        ).scalar()
+        # reltuples is -1 (or 0) until the table has been analyzed; small tables are cheap to count
+        if estimate is not None and estimate > COUNT_CAP:
+            return int(estimate), True
+
+    capped = query.order_by(None).limit(COUNT_CAP + 1).subquery()
+    total = db.session.execute(select(func.count()).select_from(capped)).scalar()
+    return min(total, COUNT_CAP), total > COUNT_CAP
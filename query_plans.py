@@ -0,0 +1,237 @@
+# minutememo_app/query_plans.py
+"""
+Query plan regression check for the main query of each listing endpoint.
+
+`flask plans check` seeds a realistic amount of data inside a transaction,
+runs EXPLAIN on every query of plan_queries() and fails when a plan reads a
+table with a sequential scan, or sorts the rows of a keyset-paged listing,
+i.e. when no index serves the filter or the order of a page. Both are disabled for the check
+(enable_seqscan = off, enable_sort = off), so the planner only falls back to
+them when no index can serve the query, which makes the result independent of
+the seeded volume.
+The transaction is rolled back afterwards; nothing is left in the database.
+Run it against a development or CI database after `flask db upgrade`.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import with_parent
+
+import entitlements
+import fulltext_search
+import pagination
+import routes
+from extensions import db
+from models import (
+    ActionItem, Company, Meeting, MeetingHub, MeetingSession, MeetingSessionBody, Recording, Subscription, User,
+    user_meeting_hub
+)
+
+# Seeded rows per parent row
+SEED_COMPANIES = 20
+SEED_USERS_PER_COMPANY = 10
+SEED_HUBS_PER_COMPANY = 3
+SEED_MEETINGS_PER_HUB = 5
+SEED_SESSIONS_PER_MEETING = 20
+SEED_ITEMS_PER_SESSION = 4
+SEED_RECORDINGS_PER_SESSION = 1
+
+
+def _insert(model_or_table, rows, returning):
+    return [row[0] for row in db.session.execute(insert(model_or_table).returning(returning, sort_by_parameter_order=True), rows)]
+
+
+def seed():
+    """Inserts the check data set and returns one id of each kind to query for."""
+    now = datetime.utcnow()
+    company_ids = _insert(Company, [{'name': f"Plan check {i}"} for i in range(SEED_COMPANIES)], Company.id)
+    _insert(Subscription, [
+        {
+            'company_id': company_id, 'plan_name': 'Basic Plan', 'price': 50.0, 'billing_cycle': 'monthly',
+            'max_users': 10, 'status': 'active' if i % 4 else 'canceled'
+        }
+        for i, company_id in enumerate(company_ids)
+    ], Subscription.id)
+    user_rows = [
+        {
+            'email': f"plan-check-{uuid.uuid4().hex}@example.com", 'password_hash': '-', 'company_id': company_id
+        }
+        for company_id in company_ids
+        for _ in range(SEED_USERS_PER_COMPANY)
+    ]
+    user_ids = _insert(User, user_rows, User.id)
+    users_by_company = {}
+    for user_id, row in zip(user_ids, user_rows):
+        users_by_company.setdefault(row['company_id'], []).append(user_id)
+
+    hub_rows = [
+        {'name': f"Hub {i}", 'company_id': company_id}
+        for company_id in company_ids
+        for i in range(SEED_HUBS_PER_COMPANY)
+    ]
+    hub_ids = _insert(MeetingHub, hub_rows, MeetingHub.id)
+    db.session.execute(insert(user_meeting_hub), [
+        {'user_id': user_id, 'meeting_hub_id': hub_id}
+        for hub_id, row in zip(hub_ids, hub_rows)
+        for user_id in users_by_company[row['company_id']]
+    ])
+
+    meeting_ids = _insert(Meeting, [
+        {'name': f"Meeting {i}", 'meeting_hub_id': hub_id}
+        for hub_id in hub_ids
+        for i in range(SEED_MEETINGS_PER_HUB)
+    ], Meeting.id)
+    meeting_hub_ids = [hub_id for hub_id in hub_ids for _ in range(SEED_MEETINGS_PER_HUB)]
+    session_ids = _insert(MeetingSession, [
+        {'name': f"Session {i}", 'meeting_id': meeting_id, 'meeting_hub_id': hub_id, 'session_datetime': now - timedelta(days=i)}
+        for meeting_id, hub_id in zip(meeting_ids, meeting_hub_ids)
+        for i in range(SEED_SESSIONS_PER_MEETING)
+    ], MeetingSession.id)
+    _insert(MeetingSessionBody, [
+        {'meeting_session_id': session_id, 'transcription': 'Plan check transcript.', 'short_summary': 'Plan check summary.'}
+        for session_id in session_ids
+    ], MeetingSessionBody.meeting_session_id)
+    session_hub_ids = [hub_id for hub_id in meeting_hub_ids for _ in range(SEED_SESSIONS_PER_MEETING)]
+    _insert(ActionItem, [
+        {
+            'title': f"Action {i}", 'description': 'Plan check action item.',
+            'meeting_session_id': session_id, 'meeting_hub_id': hub_id, 'sorting_id': i,
+            'assigned_to': f"Person {i}", 'completed': i % 3 == 0,
+            'due_date': now + timedelta(days=i) if i % 4 else None
+        }
+        for session_id, hub_id in zip(session_ids, session_hub_ids)
+        for i in range(SEED_ITEMS_PER_SESSION)
+    ], ActionItem.id)
+    _insert(Recording, [
+        {
+            'id': uuid.uuid4(), 'file_name': f"{session_id}-{i}.webm", 'timestamp': now,
+            'user_id': user_ids[session_id % len(user_ids)], 'concatenation_status': 'done',
+            'concatenation_file_name': f"{session_id}-{i}.webm", 'meeting_session_id': session_id
+        }
+        for session_id in session_ids
+        for i in range(SEED_RECORDINGS_PER_SESSION)
+    ], Recording.id)
+
+    return {
+        'company_id': company_ids[-1],
+        'user_id': user_ids[-1],
+        'hub_id': hub_ids[-1],
+        'meeting_id': meeting_ids[-1],
+        'session_id': session_ids[-1],
+    }
+
+
+def _page(query, keys, descending=False):
+    """The statement of the first page of a listing, as the endpoint pages it."""
+    return pagination.page_query(query, keys, descending=descending).statement
+
+
+def plan_queries(ids):
+    """
+    The main query of each endpoint, as (endpoint, statement, keyset) tuples.
+
+    The statements come from the query builders of the endpoints themselves,
+    so they cannot drift from what is served. keyset marks listings paged
+    with a keyset cursor, whose order an index must serve.
+    """
+    tsquery = fulltext_search.to_tsquery('actiepunt')
+    return [
+        ('GET /api/recordings', _page(routes.user_recordings_query(ids['user_id']), routes.RECORDING_PAGE_KEYS, descending=True), True),
+        ('GET /api/recordings?hub_id', _page(
+            routes.user_recordings_query(ids['user_id'], ids['hub_id']), routes.RECORDING_PAGE_KEYS, descending=True), True),
+        ('GET /api/recordings/archived', _page(
+            routes.user_archived_recordings_query(ids['user_id']), routes.ARCHIVED_RECORDING_PAGE_KEYS, descending=True), True),
+        ('recording by id', routes.recent_recording_query(uuid.uuid4()).statement, False),
+        ('recordings of a session', select(Recording).where(
+            with_parent(MeetingSession(id=ids['session_id']), MeetingSession.recordings)), False),
+        ('GET /api/meetingsessions', _page(
+            routes.hub_sessions_query(ids['hub_id'], routes.HUB_SESSION_DEFAULT_FIELDS), routes.SESSION_PAGE_KEYS, descending=True), True),
+        ('GET /api/meetings?meeting_id', _page(
+            routes.meeting_sessions_query(ids['meeting_id'], routes.MEETING_SESSION_DEFAULT_FIELDS), routes.SESSION_PAGE_KEYS,
+            descending=True), True),
+        ('GET /api/meetings?hub_id', _page(
+            routes.hub_meetings_query(ids['hub_id'], routes.MEETING_DEFAULT_FIELDS), routes.MEETING_PAGE_KEYS), True),
+        ('GET /api/sessions/<id>/action_points', _page(
+            routes.session_action_items_query(ids['session_id']), routes.ACTION_ITEM_PAGE_KEYS), True),
+        ('GET /api/meetinghubs', routes.user_hubs_query(ids['user_id']).statement, False),
+        ('hub members', select(User.id, User.email).where(
+            with_parent(MeetingHub(id=ids['hub_id']), MeetingHub.users)), False),
+        ('GET /api/subscription-status', entitlements.entitlement_query(ids['company_id'], datetime.utcnow()), False),
+        ('GET /api/companies/<id>/users', _page(routes.company_users_query(ids['company_id']), routes.user_page_keys('id')), True),
+        ('GET /api/search (transcripts)', select(fulltext_search.matches(tsquery, [ids['hub_id']], ('transcript',))), False),
+        ('GET /api/search (summaries)', select(fulltext_search.matches(tsquery, [ids['hub_id']], ('summary',))), False),
+        ('GET /api/search (action items)', select(fulltext_search.matches(tsquery, [ids['hub_id']], ('action_item',))), False),
+        ('GET /api/hubs/<id>/action_items', _page(
+            routes.hub_action_items_query(ids['hub_id']), routes.HUB_ACTION_ITEM_PAGE_KEYS), True),
+        ('GET /api/hubs/<id>/action_items?assigned_to', _page(
+            routes.hub_action_items_query(ids['hub_id'], assigned_to='Person 1'), routes.HUB_ACTION_ITEM_PAGE_KEYS), True),
+    ]
+
+
+def explain(statement):
+    """Returns the JSON plan of a statement."""
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    return connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+
+
+def sequential_scans(plan):
+    """Returns the tables a plan (or any of its subplans) reads with a sequential scan."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    if isinstance(plan, list):
+        plan = plan[0]['Plan']
+
+    tables = [plan['Relation Name']] if plan.get('Node Type') == 'Seq Scan' else []
+    for subplan in plan.get('Plans', []):
+        tables += sequential_scans(subplan)
+    return tables
+
+
+def sorts(plan):
+    """Returns the sort keys of the nodes of a plan (or any of its subplans) that sort rows."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    if isinstance(plan, list):
+        plan = plan[0]['Plan']
+
+    keys = [', '.join(plan.get('Sort Key', []))] if plan.get('Node Type') in ('Sort', 'Incremental Sort') else []
+    for subplan in plan.get('Plans', []):
+        keys += sorts(subplan)
+    return keys
+
+
+plans_cli = AppGroup('plans', help='Query plan checks.')
+
+
+@plans_cli.command('check')
+def check_command():
+    """Seed data in a transaction and fail if an endpoint query uses a sequential scan or a sort."""
+    failures = []
+    try:
+        ids = seed()
+        db.session.execute(text('ANALYZE'))
+        db.session.execute(text('SET LOCAL enable_seqscan = off'))
+        db.session.execute(text('SET LOCAL enable_sort = off'))
+
+        for endpoint, statement, keyset in plan_queries(ids):
+            plan = explain(statement)
+            tables = sequential_scans(plan)
+            sort_keys = sorts(plan) if keyset else []
+            if tables or sort_keys:
+                failures.append(endpoint)
+                if tables:
+                    click.echo(f"FAIL {endpoint}: sequential scan on {', '.join(sorted(set(tables)))}")
+                if sort_keys:
+                    click.echo(f"FAIL {endpoint}: sort on {'; '.join(sort_keys)}")
+            else:
+                click.echo(f"ok   {endpoint}")
+    finally:
+        db.session.rollback()
+
+    if failures:
+        raise click.ClickException(f"Sequential scans or sorts in {len(failures)} of {len(plan_queries(ids))} endpoint queries")
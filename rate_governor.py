@@ -0,0 +1,173 @@
+# minutememo_app/rate_governor.py
+"""
+Distributed OpenAI rate governor.
+
+Every web worker and Celery process draws from the same per-model token
+buckets in Redis: one for requests per minute and one for (estimated) tokens
+per minute. A caller reserves capacity up front and is told how long to wait
+until its reservation is covered, so callers are served in arrival order and
+throughput stays at the configured limit instead of bursting into 429s.
+"""
+import json
+import logging
+import os
+import time
+
+import redis
+
+from extensions import get_redis
+
+logger = logging.getLogger(__name__)
+
+BUCKET_PREFIX = 'openai-rate'
+BUCKET_TTL_MS = 5 * 60 * 1000
+
+# Account limits per model; override with OPENAI_RATE_LIMITS, e.g.
+# '{"gpt-4o-mini": {"rpm": 5000, "tpm": 2000000}}'. A tpm of 0 disables the token bucket.
+DEFAULT_LIMITS = {
+    'gpt-4o-2024-08-06': {'rpm': 500, 'tpm': 30000},
+    'gpt-4o-mini': {'rpm': 500, 'tpm': 200000},
+    'whisper-1': {'rpm': 50, 'tpm': 0},
+    'text-embedding-3-small': {'rpm': 3000, 'tpm': 1000000},
+}
+LIMITS = {**DEFAULT_LIMITS, **json.loads(os.getenv('OPENAI_RATE_LIMITS', '{}'))}
+
+# Reserve capacity in both buckets, refilling them for the time passed since the
+# last reservation. Buckets may go negative: the deficit is the queue ahead of
+# the caller and determines how long it has to wait. The clock is the Redis
+# server's, so skew between worker hosts cannot refill or drain the buckets.
+# KEYS[1]: bucket key; ARGV: rpm, tpm, tokens, max_wait_ms, ttl_ms
+# Returns {granted (1/0), wait_ms}
+_RESERVE_SCRIPT = """
+-- Replicate the writes rather than the script, which reads the clock (implied since Redis 5)
+redis.replicate_commands()
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local tokens = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests_left = tonumber(state[1]) or rpm
+local tokens_left = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+local elapsed = math.max(0, now - ts)
+
+requests_left = math.min(rpm, requests_left + elapsed * rpm / 60000) - 1
+local wait = 0
+if requests_left < 0 then
+    wait = -requests_left * 60000 / rpm
+end
+if tpm > 0 then
+    tokens_left = math.min(tpm, tokens_left + elapsed * tpm / 60000) - tokens
+    if tokens_left < 0 then
+        wait = math.max(wait, -tokens_left * 60000 / tpm)
+    end
+end
+
+if wait > max_wait then
+    return {0, math.ceil(wait)}
+end
+
+redis.call('HSET', KEYS[1], 'requests', tostring(requests_left), 'tokens', tostring(tokens_left), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return {1, math.ceil(wait)}
+"""
+
+_reserve = None
+
+
+class RateBudgetExceeded(Exception):
+    """Raised when the wait for rate-limit capacity would exceed the caller's budget."""
+
+    def __init__(self, model, wait_seconds):
+        super().__init__(f"OpenAI rate budget for {model} exhausted; next slot in {wait_seconds:.1f}s")
+        self.model = model
+        self.wait_seconds = wait_seconds
+
+
+def _bucket_key(model):
+    return f"{BUCKET_PREFIX}:{model}"
+
+
+def estimate_tokens(messages, max_output_tokens=1000):
+    """Rough token estimate for a chat request: ~4 characters per token plus the expected output."""
+    characters = sum(len(message.get('content') or '') for message in messages)
+    return characters // 4 + max_output_tokens
+
+
+def acquire(model, tokens=0, max_wait=60.0):
+    """
+    Reserves one request and the given number of tokens for a model, waiting if needed.
+
+    Models without configured limits, and Redis outages, are not throttled.
+
+    Args:
+        model (str): The OpenAI model the request is for.
+        tokens (int): Estimated prompt plus completion tokens of the request.
+        max_wait (float): Maximum seconds the caller is willing to wait.
+
+    Raises:
+        RateBudgetExceeded: If capacity would only be available after max_wait.
+    """
+    global _reserve
+    limits = LIMITS.get(model)
+    if not limits:
+        return
+
+    try:
+        if _reserve is None:
+            _reserve = get_redis().register_script(_RESERVE_SCRIPT)
+        granted, wait_ms = _reserve(
+            keys=[_bucket_key(model)],
+            args=[limits['rpm'], limits.get('tpm', 0), tokens, int(max_wait * 1000), BUCKET_TTL_MS]
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Rate governor unavailable, not throttling {model}: {str(e)}")
+        return
+
+    if not granted:
+        raise RateBudgetExceeded(model, wait_ms / 1000)
+    if wait_ms > 0:
+        logger.debug(f"Rate governor: waiting {wait_ms} ms for {model} capacity")
+        time.sleep(wait_ms / 1000)
+
+
+def settle(model, estimated_tokens, actual_tokens):
+    """Corrects the token bucket once the actual usage of a request is known."""
+    limits = LIMITS.get(model)
+    if not limits or not limits.get('tpm') or actual_tokens is None:
+        return
+    try:
+        get_redis().hincrbyfloat(_bucket_key(model), 'tokens', estimated_tokens - actual_tokens)
+    except redis.RedisError as e:
+        logger.warning(f"Rate governor could not settle tokens for {model}: {str(e)}")
+
+
+def get_utilization():
+    """
+    Returns the current utilization of each model's buckets.
+
+    Utilization is the share of the per-minute budget that is in use or
+    queued; values above 1.0 mean callers are waiting for capacity.
+    """
+    utilization = {}
+    try:
+        client = get_redis()
+        seconds, microseconds = client.time()
+        now_ms = seconds * 1000 + microseconds / 1000
+        for model, limits in LIMITS.items():
+            requests_left, tokens_left, ts = client.hmget(_bucket_key(model), 'requests', 'tokens', 'ts')
+            rpm, tpm = limits['rpm'], limits.get('tpm', 0)
+            elapsed = max(0.0, now_ms - float(ts)) if ts else 0.0
+
+            requests_left = min(rpm, float(requests_left) + elapsed * rpm / 60000) if requests_left else rpm
+            model_utilization = {'rpm_limit': rpm, 'requests': round(1 - requests_left / rpm, 3)}
+            if tpm:
+                tokens_left = min(tpm, float(tokens_left) + elapsed * tpm / 60000) if tokens_left else tpm
+                model_utilization.update({'tpm_limit': tpm, 'tokens': round(1 - tokens_left / tpm, 3)})
+            utilization[model] = model_utilization
+    except redis.RedisError as e:
+        logger.warning(f"Could not read rate governor state: {str(e)}")
+    return utilization
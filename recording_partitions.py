@@ -0,0 +1,147 @@
+# minutememo_app/recording_partitions.py
+"""
+Monthly range partitions of the recording table.
+
+recording is partitioned by timestamp into one table per month, named
+recording_y<year>m<month>, plus recording_default for rows outside every
+partition. Queries that are bounded or ordered by timestamp (a user's newest
+recordings) only read the recent partitions, and every partition has its own
+small indexes. Lookups of a single recording by id are bounded to the last
+HOT_MONTHS months (hot_cutoff) for the same reason; the id alone would probe
+every partition's index.
+
+Partitions are created ahead of time (MONTHS_AHEAD) by a daily Celery beat
+task, so the default partition stays empty; a month cannot be created while
+the default partition holds rows of it. Partitions older than
+ARCHIVE_AFTER_MONTHS are archived monthly: their media move to a colder
+storage class and the partition is detached. Its recordings are copied to
+archived_recording first, so listings can show them as archived rather than
+missing. A detached partition stays in the database as a standalone table and
+can be re-attached with ALTER TABLE recording ATTACH PARTITION (delete its rows
+from archived_recording afterwards).
+"""
+import logging
+import os
+import re
+from datetime import date, datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'recording'
+DEFAULT_PARTITION = 'recording_default'
+MONTHS_AHEAD = int(os.getenv('RECORDING_PARTITION_MONTHS_AHEAD', 3))
+ARCHIVE_AFTER_MONTHS = int(os.getenv('RECORDING_ARCHIVE_AFTER_MONTHS', 24))
+# Recordings are uploaded, concatenated and processed within days of being made
+HOT_MONTHS = int(os.getenv('RECORDING_HOT_MONTHS', 2))
+
+_PARTITION_NAME = re.compile(r'^recording_y(\d{4})m(\d{2})$')
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"recording_y{month.year}m{month.month:02d}"
+
+
+def partition_month(name):
+    """Returns the month of a partition name, or None for names that are not monthly partitions."""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def attached_partitions():
+    """Returns the names of the monthly partitions currently attached to recording, oldest first."""
+    names = db.session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {'parent': PARENT_TABLE}).scalars()
+    return sorted(name for name in names if partition_month(name))
+
+
+def create_partition(month):
+    """Creates the partition of a month if it does not exist; the caller commits."""
+    name = partition_name(month)
+    db.session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+    return name
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD, today=None):
+    """Creates the partitions of the current month and the next months_ahead months; returns their names."""
+    current = month_start(today or datetime.utcnow().date())
+    names = [create_partition(add_months(current, offset)) for offset in range(months_ahead + 1)]
+    db.session.commit()
+    return names
+
+
+def hot_cutoff(hot_months=HOT_MONTHS, today=None):
+    """Returns the start of the oldest partition that single-recording lookups still read."""
+    return datetime.combine(add_months(month_start(today or datetime.utcnow().date()), -hot_months), datetime.min.time())
+
+
+def archivable_partitions(archive_after_months=ARCHIVE_AFTER_MONTHS, today=None):
+    """Returns the attached partitions whose whole month lies more than archive_after_months in the past."""
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -archive_after_months)
+    return [name for name in attached_partitions() if add_months(partition_month(name), 1) <= cutoff]
+
+
+def recording_ids(name):
+    """Returns the ids of the recordings stored in one partition."""
+    if not partition_month(name):
+        raise ValueError(f"Not a recording partition: {name}")
+    return db.session.execute(text(f"SELECT id FROM {name}")).scalars().all()
+
+
+def detach_partition(name):
+    """
+    Detaches a partition from recording; its rows stay in the standalone table.
+
+    The partition's recordings are copied to archived_recording in the same
+    transaction, so they never disappear from listings without a marker.
+    """
+    if not partition_month(name):
+        raise ValueError(f"Not a recording partition: {name}")
+    db.session.execute(text(
+        f"INSERT INTO archived_recording (id, file_name, timestamp, user_id, meeting_session_id, partition_name, archived_at) "
+        f"SELECT id, file_name, timestamp, user_id, meeting_session_id, :name, now() AT TIME ZONE 'UTC' FROM {name} "
+        f"ON CONFLICT (id) DO NOTHING"
+    ), {'name': name})
+    db.session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    db.session.commit()
+    logger.info(f"Detached recording partition {name}")
+
+
+partitions_cli = AppGroup('partitions', help='Recording partitions.')
+
+
+@partitions_cli.command('ensure')
+@click.option('--months-ahead', type=int, default=MONTHS_AHEAD, help='Number of future months to create.')
+def ensure_command(months_ahead):
+    """Create the recording partitions of this month and the next months."""
+    for name in ensure_partitions(months_ahead):
+        click.echo(name)
+
+
+@partitions_cli.command('list')
+def list_command():
+    """List the attached recording partitions and which of them are due for archival."""
+    archivable = set(archivable_partitions())
+    for name in attached_partitions():
+        click.echo(f"{name}{' (archivable)' if name in archivable else ''}")
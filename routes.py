@@ -1,5 +1,5 @@
 #routes.py
-from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, current_app, send_from_directory, redirect, url_for, Response, stream_with_context
 import os
 import tempfile
 from google.cloud import storage
@@ -15,9 +15,9 @@ from flask_cors import cross_origin
 import ffmpeg
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from decorators import subscription_required
-from models import User, db, Recording, MeetingSession, MeetingHub, Company, Meeting, Subscription, ActionItem
-from extensions import db  # Import from extensions.py
+from decorators import subscription_required, read_replica
+from models import User, db, Recording, ArchivedRecording, MeetingSession, MeetingSessionBody, MeetingHub, Company, Meeting, Subscription, ActionItem, user_meeting_hub
+from extensions import db, get_redis  # Import from extensions.py
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
 from pydantic import BaseModel, ValidationError
@@ -26,12 +26,24 @@ from typing import List
 #from app import credentials
 from celery.result import AsyncResult
 from celery_factory import celery_app  # Import the initialized Celery app
-from openai import OpenAI
-import openai
 import requests
 import json
+from sqlalchemy import select, update, delete, insert, func, case, true, or_
+from sqlalchemy.orm import selectinload, joinedload, aliased, contains_eager, load_only
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional
+import llm_cache
+import openai_client
+import singleflight
+import semantic_search
+import batch_backfill
+import transcript_budget
+import pagination
+import entitlements
+import identity
+import fulltext_search
+import usage_rollups
+import recording_partitions
 
 
 logger = logging.getLogger(__name__)
@@ -56,10 +68,162 @@ class ActionPointsSchema(BaseModel):
     action_items: List[ActionPoint]
 
 
+class ProcessingError(Exception):
+    """Raised when a processing step cannot produce a result; carries the HTTP status to report."""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+# Prompt templates and models for the LLM post-processing steps. Bump the
+# matching *_PROMPT_VERSION whenever a prompt or schema changes meaningfully;
+# cached responses are keyed on it (see llm_cache.py).
+SUMMARY_MODEL = "gpt-4o-mini"
+SUMMARY_PROMPT_VERSION = "summary-v1"
+
+SHORT_SUMMARY_PROMPT = """
+    Summarize the core topics in a maximum of 5 bullet points. Sentences should be short and capture only the core ideas.
+
+    Use HTML for formatting:
+    <strong>This meeting was about:</strong>
+    <ul>
+        <li>.......</li>
+        <li>.......</li>
+        <li>.......</li>
+    </ul>
+
+    <strong>Action points:</strong>
+    <ul>
+        <li>.......</li>
+        <li>.......</li>
+        <li>.......</li>
+    </ul>
+    """
+
+LONG_SUMMARY_PROMPT = """
+    Summarize the meeting in detail, including sections and action points.
+
+    Use HTML for formatting:
+    <strong>Summary of this meeting:</strong>
+
+    <strong>Relevant topic:</strong>
+    <ul>
+        <li>.......</li>
+        <li>.......</li>
+        <li>.......</li>
+    </ul>
+
+    <strong>Action points:</strong>
+    <ul>
+        <li>.......</li>
+        <li>.......</li>
+        <li>.......</li>
+    </ul>
+    """
+
+# Map step for transcripts too long for one call (see transcript_budget.py):
+# each chunk is condensed into notes and the final prompt runs on the notes.
+CHUNK_NOTES_PROMPT = """
+    The following is one part of a longer meeting transcription. Write concise notes of everything
+    discussed in this part: topics, decisions, open questions and action points with owners and due dates.
+    Keep names, numbers and dates exactly as spoken.
+
+    """
+
+ACTION_POINTS_MODEL = "gpt-4o-2024-08-06"
+ACTION_POINTS_PROMPT_VERSION = "action-points-v1"
+ACTION_POINTS_SYSTEM_PROMPT = "You are an AI that extracts action items from meeting transcriptions."
+
+# Structured response schema for action points
+ACTION_ITEM_SCHEMA = {
+    "name": "action_item_schema",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "action_items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "summary": {"type": "string", "description": "Summary of the action item"},
+                        "details": {"type": "string", "description": "Detailed explanation of the action item"},
+                        "assigned_to": {"type": "string", "description": "Person assigned to the action item"},
+                        "due_date": {"type": ["string", "null"], "description": "Due date of the action item in ISO format"},
+                        "completed": {"type": "boolean", "description": "Completion status of the action item"}
+                    },
+                    "required": ["summary", "details"]
+                }
+            }
+        },
+        "required": ["action_items"]
+    }
+}
+
+
+# Combined "session insights": both summaries and the action items from one
+# structured-output call, so the transcript is sent to the model only once.
+INSIGHTS_MODEL = "gpt-4o-2024-08-06"
+INSIGHTS_PROMPT_VERSION = "insights-v1"
+INSIGHTS_SYSTEM_PROMPT = (
+    "You are an AI that analyses meeting transcriptions. For the transcription provided by the user, "
+    "write a short summary, a long summary and extract the action items.\n\n"
+    "Short summary instructions:" + SHORT_SUMMARY_PROMPT + "\n"
+    "Long summary instructions:" + LONG_SUMMARY_PROMPT
+)
+
+INSIGHTS_SCHEMA = {
+    "name": "session_insights_schema",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "short_summary": {"type": "string", "description": "Short HTML summary of the meeting"},
+            "long_summary": {"type": "string", "description": "Detailed HTML summary of the meeting"},
+            "action_items": ACTION_ITEM_SCHEMA["schema"]["properties"]["action_items"]
+        },
+        "required": ["short_summary", "long_summary", "action_items"]
+    }
+}
+
+
+# Rolling summary of a recurring meeting series: each new session is folded
+# into the stored running summary with one small call on its summary and
+# action items, instead of re-reading every transcript of the series.
+SERIES_SUMMARY_MODEL = "gpt-4o-mini"
+# A claim older than this belongs to a worker that died and may be taken over
+SERIES_FOLD_CLAIM_TIMEOUT = timedelta(minutes=15)
+# Folds retried when another session changed the running summary during the call
+SERIES_FOLD_ATTEMPTS = 3
+SERIES_SUMMARY_PROMPT = """
+    You maintain the running summary of a recurring meeting series. You receive the current running
+    summary (empty for the first session) and the summary and action points of the newest session.
+    Return the updated running summary: keep ongoing topics and decisions, mark resolved topics as such,
+    track open action points across sessions and drop details that no longer matter.
+
+    Use HTML for formatting:
+    <strong>Ongoing topics:</strong>
+    <ul>
+        <li>.......</li>
+    </ul>
+
+    <strong>Decisions:</strong>
+    <ul>
+        <li>.......</li>
+    </ul>
+
+    <strong>Open action points:</strong>
+    <ul>
+        <li>.......</li>
+    </ul>
+    """
+
+
 # Load environment settings
 # Load environment settings
 ENVIRONMENT = os.getenv('FLASK_ENV', 'development')
 BUCKET_NAME = 'staging-minutememo-audiofiles'
+ARCHIVE_STORAGE_CLASS = os.getenv('ARCHIVE_STORAGE_CLASS', 'COLDLINE')  # Media of archived recording partitions
 UPLOAD_FOLDER = os.path.join('uploads', 'audio_recordings')
 
 if ENVIRONMENT != 'development':
@@ -112,6 +276,15 @@ def list_gcs_chunks(bucket_name, recording_id):
         chunks.append(blob.name.split('/')[-1])  # Get only the filename
     return chunks
 
+def archive_recording_media(recording_id):
+    """Moves the chunks and concatenated audio of a recording to the archive storage class."""
+    moved = 0
+    for blob in storage_client.bucket(BUCKET_NAME).list_blobs(prefix=f'audio_recordings/{recording_id}'):
+        if blob.storage_class != ARCHIVE_STORAGE_CLASS:
+            blob.update_storage_class(ARCHIVE_STORAGE_CLASS)
+            moved += 1
+    return moved
+
 @main.route('/generate-presigned-url', methods=['GET'])
 @cross_origin()  # Enable CORS for this route
 def generate_presigned_url_route():
@@ -199,10 +372,14 @@ def home_content():
 def settings_content():
     return render_template('settings_content.html')
 
+def recent_recording_query(recording_id):
+    """A recording by id, looked up in the recent partitions only (recording_partitions.hot_cutoff)."""
+    return Recording.query.filter(Recording.id == recording_id, Recording.timestamp >= recording_partitions.hot_cutoff())
+
 def update_concatenation_status(recording_id, status):
     try:
         # Fetch the recording by the given recording_id from the Recording table
-        recording = db.session.query(Recording).filter_by(id=recording_id).first()
+        recording = recent_recording_query(recording_id).first()
 
         if recording:
             # Update the status field
@@ -235,7 +412,7 @@ def update_recording(recording_id):
 
         # Log before fetching the recording
         current_app.logger.info(f"Fetching Recording with ID: {recording_id}")
-        recording = Recording.query.get_or_404(recording_id)
+        recording = recent_recording_query(recording_id).filter_by(user_id=current_user.id).first_or_404()
 
         # Log the current state of the recording before updating
         current_app.logger.info(f"Current recording before update: {recording}")
@@ -265,19 +442,43 @@ def update_recording(recording_id):
         # Log exiting the function
         current_app.logger.info(f"Exiting update_recording function for recording_id: {recording_id}")
 
+# Recordings are listed newest first; the id makes the order total for the keyset cursor
+RECORDING_PAGE_KEYS = [
+    (Recording.timestamp, lambda rec: rec.timestamp),
+    (Recording.id, lambda rec: str(rec.id)),
+]
+RECORDING_PAGE_KEY_TYPES = [datetime.fromisoformat, uuid.UUID]
+ARCHIVED_RECORDING_PAGE_KEYS = [
+    (ArchivedRecording.timestamp, lambda rec: rec.timestamp),
+    (ArchivedRecording.id, lambda rec: str(rec.id)),
+]
+
+
+def user_recordings_query(user_id, hub_id=None):
+    """Recordings of a user, optionally only those of one hub's sessions."""
+    query = Recording.query.filter_by(user_id=user_id)
+    if hub_id:
+        query = query.join(MeetingSession).filter(MeetingSession.meeting_hub_id == hub_id)
+    return query
+
+
 @main.route('/api/recordings', methods=['GET'])
 @login_required
+@read_replica
 def get_user_recordings():
     try:
         # Fetch all recordings for the logged-in user, filtered by meeting hub if provided
-        user_id = current_user.id
-        hub_id = request.args.get('hub_id')
-
-        query = Recording.query.filter_by(user_id=user_id)
-        if hub_id:
-            query = query.join(MeetingSession).filter(MeetingSession.meeting_hub_id == hub_id)
-
-        recordings = query.all()
+        query = user_recordings_query(current_user.id, request.args.get('hub_id'))
+
+        # Newest first, one page at a time
+        recordings, next_cursor = pagination.paginate(
+            query,
+            RECORDING_PAGE_KEYS,
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit')),
+            descending=True,
+            key_types=RECORDING_PAGE_KEY_TYPES
+        )
 
         # Serialize the recordings to return as JSON
         recordings_data = [
@@ -286,15 +487,62 @@ def get_user_recordings():
                 'file_name': rec.file_name,
                 'timestamp': rec.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
                 'concatenation_status': rec.concatenation_status,
-                'file_url': f'/uploads/audio_recordings/{rec.file_name}'  # Ensure this path matches your setup
+                'file_url': f'/uploads/audio_recordings/{rec.file_name}',  # Ensure this path matches your setup
+                'archived': False
             } for rec in recordings
         ]
 
-        return jsonify({'status': 'success', 'recordings': recordings_data}), 200
+        return jsonify({'status': 'success', 'recordings': recordings_data, 'next_cursor': next_cursor}), 200
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching recordings: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
 
+
+def user_archived_recordings_query(user_id, hub_id=None):
+    """Recordings of a user whose partition was archived, optionally only those of one hub's sessions."""
+    query = ArchivedRecording.query.filter_by(user_id=user_id)
+    if hub_id:
+        query = query.join(MeetingSession).filter(MeetingSession.meeting_hub_id == hub_id)
+    return query
+
+
+@main.route('/api/recordings/archived', methods=['GET'])
+@login_required
+@read_replica
+def get_user_archived_recordings():
+    # Recordings of detached partitions; their media is in cold storage, so there is no file_url
+    try:
+        query = user_archived_recordings_query(current_user.id, request.args.get('hub_id'))
+
+        recordings, next_cursor = pagination.paginate(
+            query,
+            ARCHIVED_RECORDING_PAGE_KEYS,
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit')),
+            descending=True,
+            key_types=RECORDING_PAGE_KEY_TYPES
+        )
+
+        recordings_data = [
+            {
+                'id': str(rec.id),
+                'file_name': rec.file_name,
+                'timestamp': rec.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'meeting_session_id': rec.meeting_session_id,
+                'archived': True,
+                'archived_at': rec.archived_at.strftime('%Y-%m-%d %H:%M:%S')
+            } for rec in recordings
+        ]
+
+        return jsonify({'status': 'success', 'recordings': recordings_data, 'next_cursor': next_cursor}), 200
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error fetching archived recordings: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
 @main.route('/profile_content')
 @login_required
 def profile_content():
@@ -318,50 +566,10 @@ def concatenate():
 
         if running_locally:
             # Local processing
-            chunk_files = sorted(
-                [f for f in os.listdir(UPLOAD_FOLDER) if f.startswith(recording_id) and f.endswith('.webm')],
-                key=natural_sort_key
-            )
-
-            if not chunk_files:
-                current_app.logger.error(f"No chunks found for recording_id: {recording_id}")
-                return jsonify({'status': 'error', 'message': 'No chunks found for the given recording_id'}), 400
-
-            # Log the chunk files found
-            current_app.logger.info(f"Local chunk files for recording_id {recording_id}: {chunk_files}")
-
-            list_file_path = os.path.join(UPLOAD_FOLDER, f"{recording_id}_list.txt")
-            with open(list_file_path, 'w') as f:
-                for chunk in chunk_files:
-                    f.write(f"file '{os.path.abspath(os.path.join(UPLOAD_FOLDER, chunk))}'\n")
-
-            # Log the path of the final list file
-            current_app.logger.info(f"List file created at: {list_file_path}")
-            
-            final_output = os.path.join(UPLOAD_FOLDER, f"{recording_id}.webm")
-
             try:
-                # Run FFmpeg locally
-                current_app.logger.info(f"Running FFmpeg locally with list file {list_file_path}")
-                (
-                    ffmpeg
-                    .input(list_file_path, format='concat', safe=0)
-                    .output(final_output, c='copy')
-                    .run()
-                )
-                current_app.logger.info(f"Local concatenation output at {final_output}")
-            except ffmpeg.Error as e:
-                current_app.logger.error(f"Error concatenating files with ffmpeg: {e.stderr.decode('utf-8')}")
-                return jsonify({'status': 'error', 'message': f"Error concatenating files: {str(e)}"}), 500
-
-            # Convert to MP3 locally
-            mp3_filepath = os.path.splitext(final_output)[0] + '.mp3'
-            convert_to_mp3(final_output, mp3_filepath)
-            current_app.logger.info(f"MP3 conversion successful. File saved at {mp3_filepath}")
-
-            # Update the database to reflect successful concatenation
-            update_concatenation_status(recording_id, 'success')
-            current_app.logger.info(f"Concatenation status updated to 'success' in the database for recording_id: {recording_id}")
+                mp3_filepath = concatenate_local(recording_id)
+            except ProcessingError as e:
+                return jsonify({'status': 'error', 'message': e.message}), e.status_code
 
             return jsonify({'status': 'success', 'file_url': f'/uploads/audio_recordings/{os.path.basename(mp3_filepath)}'})
         
@@ -375,6 +583,66 @@ def concatenate():
         current_app.logger.error(f"Error during concatenation: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
     
+def concatenate_local(recording_id):
+    """
+    Concatenates the locally stored chunks of a recording and converts the result to MP3.
+
+    Args:
+        recording_id (str): The ID of the recording being concatenated.
+
+    Returns:
+        str: The local path of the MP3 file.
+
+    Raises:
+        ProcessingError: If no chunks exist or FFmpeg fails.
+    """
+    chunk_files = sorted(
+        [f for f in os.listdir(UPLOAD_FOLDER) if f.startswith(recording_id) and f.endswith('.webm')],
+        key=natural_sort_key
+    )
+
+    if not chunk_files:
+        current_app.logger.error(f"No chunks found for recording_id: {recording_id}")
+        raise ProcessingError('No chunks found for the given recording_id', 400)
+
+    # Log the chunk files found
+    current_app.logger.info(f"Local chunk files for recording_id {recording_id}: {chunk_files}")
+
+    list_file_path = os.path.join(UPLOAD_FOLDER, f"{recording_id}_list.txt")
+    with open(list_file_path, 'w') as f:
+        for chunk in chunk_files:
+            f.write(f"file '{os.path.abspath(os.path.join(UPLOAD_FOLDER, chunk))}'\n")
+
+    # Log the path of the final list file
+    current_app.logger.info(f"List file created at: {list_file_path}")
+
+    final_output = os.path.join(UPLOAD_FOLDER, f"{recording_id}.webm")
+
+    try:
+        # Run FFmpeg locally
+        current_app.logger.info(f"Running FFmpeg locally with list file {list_file_path}")
+        (
+            ffmpeg
+            .input(list_file_path, format='concat', safe=0)
+            .output(final_output, c='copy')
+            .run()
+        )
+        current_app.logger.info(f"Local concatenation output at {final_output}")
+    except ffmpeg.Error as e:
+        current_app.logger.error(f"Error concatenating files with ffmpeg: {e.stderr.decode('utf-8')}")
+        raise ProcessingError(f"Error concatenating files: {str(e)}", 500)
+
+    # Convert to MP3 locally
+    mp3_filepath = os.path.splitext(final_output)[0] + '.mp3'
+    convert_to_mp3(final_output, mp3_filepath)
+    current_app.logger.info(f"MP3 conversion successful. File saved at {mp3_filepath}")
+
+    # Update the database to reflect successful concatenation
+    update_concatenation_status(recording_id, 'success')
+    current_app.logger.info(f"Concatenation status updated to 'success' in the database for recording_id: {recording_id}")
+
+    return mp3_filepath
+
 def convert_to_mp3(webm_filepath, mp3_filepath):
     try:
         (
@@ -386,6 +654,20 @@ def convert_to_mp3(webm_filepath, mp3_filepath):
         print(f"Conversion successful: {mp3_filepath}")
     except ffmpeg.Error as e:
         print(f"Error converting file: {e}")
+
+def probe_audio_seconds(source):
+    """
+    Returns the duration of an audio file or URL in seconds, or None if FFmpeg cannot read it.
+
+    Args:
+        source (str): A local path or a (signed) URL.
+    """
+    try:
+        duration = ffmpeg.probe(source)['format'].get('duration')
+        return float(duration) if duration is not None else None
+    except (ffmpeg.Error, KeyError, ValueError) as e:
+        current_app.logger.warning(f"Could not determine the duration of {source}: {str(e)}")
+        return None
     
 
 
@@ -518,7 +800,7 @@ def concatenate_cloud(self, recording_id):
 
                 # Update the recording with the MP3 URL
                 current_app.logger.info(f"Updating database with MP3 URL for recording_id: {recording_id}")
-                recording = db.session.query(Recording).filter_by(id=recording_id).first()
+                recording = recent_recording_query(recording_id).first()
                 if recording:
                     recording.audio_url = f"audio_recordings/{final_mp3_output_gcs}"  # Updated line
                     current_app.logger.info(f"MP3 URL to be stored in DB: audio_recordings/{final_mp3_output_gcs}")
@@ -566,150 +848,591 @@ def concatenate_cloud(self, recording_id):
             current_app.logger.info(f"Cleanup completed for recording_id: {recording_id}")
 
 
-@main.route('/api/meetingsessions', methods=['GET', 'POST', 'PATCH'])
-@login_required
-@cross_origin()
-def manage_meeting_sessions():
-    if request.method == 'GET':
-        try:
-            hub_id = request.args.get('hub_id')
-            if not hub_id:
-                return jsonify({'status': 'error', 'message': 'Hub ID is required'}), 400
+# Post-recording processing pipeline
+#
+# Once a recording stops, the whole post-processing runs server side as one
+# Celery workflow: concatenation -> transcription -> insights (summaries and
+# action points in one call) -> series summary (recurring meetings) -> finish. Each stage records its state on
+# MeetingSession.processing_state so the frontend only has to start the
+# workflow and, optionally, poll its status.
 
-            current_app.logger.info(f"Fetching meeting sessions for hub ID: {hub_id}")
-            
-            meeting_sessions = (
-                MeetingSession.query.join(Meeting)
-                .filter(Meeting.meeting_hub_id == hub_id)
-                .all()
-            )
+PROCESSING_STAGES = ('concatenation', 'transcription', 'insights', 'series_summary')
 
-            sessions_data = [
-                {
-                    'id': session.id,
-                    'name': session.name,
-                    'session_datetime': session.session_datetime.strftime('%Y-%m-%d %H:%M:%S'),
-                    'meeting_name': session.meeting.name,
-                    'transcription': session.transcription,
-                    'audio_url': session.audio_url  # Include audio URL if it exists
-                }
-                for session in meeting_sessions
-            ]
-            return jsonify({'status': 'success', 'meeting_sessions': sessions_data}), 200
-        except Exception as e:
-            current_app.logger.error(f"Error fetching meeting sessions: {str(e)}")
-            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+_task_app = None
 
-    elif request.method == 'PATCH':
-        try:
-            data = request.get_json()
-            recording_id = data.get('recording_id')
-            audio_url = data.get('audio_url')
 
-            if not recording_id or not audio_url:
-                return jsonify({'status': 'error', 'message': 'Recording ID and audio URL are required'}), 400
+def task_app_context():
+    """Returns an app context for pipeline tasks, reusing one Flask app per worker process."""
+    global _task_app
+    if _task_app is None:
+        from app import create_app
+        _task_app = create_app()
+    return _task_app.app_context()
 
-            # Fetch the meeting session by recording_id
-            session = MeetingSession.query.filter_by(id=recording_id).first()
 
-            if not session:
-                return jsonify({'status': 'error', 'message': 'Meeting session not found'}), 404
+def set_processing_stage(session_id, stage, status, error=None):
+    """Persists the state of one pipeline stage (and the overall status) for a session."""
+    # Lock the row so concurrent updates of the stage state don't overwrite each other
+    session = (
+        MeetingSession.query.filter_by(id=session_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    if not session:
+        current_app.logger.error(f"MeetingSession {session_id} not found while updating stage {stage}")
+        db.session.rollback()
+        return
+
+    state = dict(session.processing_state or {})
+    state[stage] = {'status': status, 'updated_at': datetime.utcnow().isoformat()}
+    if error:
+        state[stage]['error'] = error
+    session.processing_state = state
+
+    if status == 'error':
+        session.processing_status = 'error'
+    elif session.processing_status != 'error':
+        session.processing_status = 'processing'
+    db.session.commit()
+    current_app.logger.info(f"Processing stage {stage} for session {session_id} is now {status}")
 
-            # Update the audio URL in the session
-            session.audio_url = audio_url
-            db.session.commit()
 
-            current_app.logger.info(f"Updated audio URL for recording_id {recording_id}: {audio_url}")
+# Web requests wait this long for a run another request already started, well within
+# gunicorn's --timeout; after that they get a 202 and poll the session instead
+REQUEST_FLIGHT_WAIT_SECONDS = float(os.getenv('REQUEST_FLIGHT_WAIT_SECONDS', 30))
 
-            return jsonify({'status': 'success', 'message': 'Audio URL updated successfully'}), 200
-        except Exception as e:
-            current_app.logger.error(f"Error updating audio URL: {str(e)}")
-            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
 
-    elif request.method == 'POST':
-        try:
-            data = request.json
-            session_name = data.get('name', f"New Meeting Session {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
-            meeting_id = data.get('meeting_id')
+def flight_pending_response(session_id):
+    """The 202 for a request that stopped waiting for a run another request started."""
+    return jsonify({
+        'status': 'pending',
+        'message': 'Already running for this session; check back later',
+        'status_url': url_for('main.get_processing_status', session_id=session_id)
+    }), 202
 
-            if not meeting_id:
-                return jsonify({'status': 'error', 'message': 'Meeting ID is required'}), 400
 
-            new_session = MeetingSession(
-                name=session_name,
-                session_datetime=datetime.utcnow(),
-                meeting_id=meeting_id
-            )
-            db.session.add(new_session)
-            db.session.commit()
+def run_processing_stage(session_id, stage, fn):
+    """Runs fn() as a pipeline stage, recording its state; errors stop the workflow."""
+    set_processing_stage(session_id, stage, 'running')
+    try:
+        result = fn()
+    except Exception as e:
+        db.session.rollback()
+        message = e.message if isinstance(e, (ProcessingError, singleflight.FlightError)) else str(e)
+        current_app.logger.error(f"Processing stage {stage} failed for session {session_id}: {message}")
+        set_processing_stage(session_id, stage, 'error', error=message)
+        raise
+    set_processing_stage(session_id, stage, 'success')
+    return result
 
-            # Logging the creation of a new meeting session
-            current_app.logger.info(f"New meeting session created: {new_session.id} - {new_session.name}")
-            return jsonify({'status': 'success', 'meeting_session_id': new_session.id}), 201
-        except Exception as e:
-            db.session.rollback()
-            current_app.logger.error(f"Error creating meeting session: {str(e)}")
-            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
-        
-@main.route('/api/meetinghubs', methods=['GET', 'POST'])
-@login_required
-def manage_meeting_hubs():
-    if request.method == 'GET':
-        try:
-            # Fetch all meeting hubs for the logged-in user
-            user_id = current_user.id
-            meeting_hubs = MeetingHub.query.filter(MeetingHub.users.any(id=user_id)).all()
 
-            # Fetch the active hub for the user
-            active_hub_id = current_user.active_meeting_hub_id  # Assuming you have an active_meeting_hub_id column in the User model
+def start_session_processing(session_id, recording_id):
+    """
+    Starts the post-recording workflow for a session.
 
-            # Serialize the meeting hubs to return as JSON
-            meeting_hubs_data = [
-                {
-                    'id': hub.id,
-                    'name': hub.name,
-                    'description': hub.description,
-                    'users': [user.email for user in hub.users]  # Assuming User model has an email attribute
-                } for hub in meeting_hubs
-            ]
+    Args:
+        session_id (int): The meeting session the recording belongs to.
+        recording_id (str): The recording whose chunks need to be concatenated.
 
-            return jsonify({
-                'status': 'success',
-                'meeting_hubs': meeting_hubs_data,
-                'active_hub_id': active_hub_id  # Include the active hub ID in the response
-            }), 200
-        except Exception as e:
-            current_app.logger.error(f"Error fetching meeting hubs: {str(e)}")
-            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+    Returns:
+        The Celery AsyncResult of the workflow.
+    """
+    from celery import chain
 
-    elif request.method == 'POST':
-        try:
-            data = request.get_json()
+    session = MeetingSession.query.get(session_id)
+    session.processing_status = 'pending'
+    session.processing_state = {stage: {'status': 'pending'} for stage in PROCESSING_STAGES}
+    db.session.commit()
 
-            if not data:
-                current_app.logger.error("No JSON payload provided in the request.")
-                return jsonify({'status': 'error', 'message': 'No data provided'}), 400
+    workflow = chain(
+        process_session_concatenation.si(session_id, recording_id),
+        process_session_transcription.si(session_id),
+        process_session_insights.si(session_id),
+        process_series_summary.si(session_id),
+        finish_session_processing.si(session_id)
+    )
+    return workflow.apply_async()
 
-            name = data.get('name')
-            description = data.get('description', 'No description')
 
-            if not name:
-                current_app.logger.error("Hub name is missing in the request.")
-                return jsonify({'status': 'error', 'message': 'Name is required'}), 400
+@celery_app.task
+def process_session_concatenation(session_id, recording_id):
+    with task_app_context():
+        def concatenate_recording():
+            if IS_LOCAL:
+                mp3_filepath = concatenate_local(recording_id)
+                audio_url = f"audio_recordings/{os.path.basename(mp3_filepath)}"
+            else:
+                result = concatenate_cloud(recording_id)
+                if result.get('status') != 'success':
+                    raise ProcessingError(result.get('message', 'Concatenation failed'))
+                audio_url = f"audio_recordings/{recording_id}.mp3"
 
-            # Get the company_id from the current user
-            company_id = current_user.company_id
-            if not company_id:
-                current_app.logger.error(f"User {current_user.id} does not belong to any company.")
-                return jsonify({'status': 'error', 'message': 'User does not belong to any company'}), 400
+            if IS_LOCAL:
+                audio_seconds = probe_audio_seconds(mp3_filepath)
+            else:
+                blob = storage_client.bucket(BUCKET_NAME).blob(audio_url)
+                audio_seconds = probe_audio_seconds(blob.generate_signed_url(expiration=timedelta(minutes=30)))
 
-            # Create a new meeting hub
-            new_hub = MeetingHub(
-                name=name,
-                description=description,
-                company_id=company_id  # Ensure the company_id is set
+            session = MeetingSession.query.get(session_id)
+            session.audio_url = audio_url
+            if audio_seconds is not None:
+                # Only the difference counts, so re-running the stage does not count the audio twice
+                usage_rollups.increment_for_session(
+                    session_id, recorded_seconds=audio_seconds - (session.audio_seconds or 0)
+                )
+                session.audio_seconds = audio_seconds
+            db.session.commit()
+
+        run_processing_stage(session_id, 'concatenation', concatenate_recording)
+
+
+@celery_app.task
+def process_session_transcription(session_id):
+    with task_app_context():
+        def transcribe_session():
+            session = MeetingSession.query.get(session_id)
+            if not session or not session.audio_url:
+                raise ProcessingError('No audio file found for this session', 404)
+
+            if IS_LOCAL:
+                local_path = os.path.join(UPLOAD_FOLDER, os.path.basename(session.audio_url))
+                transcription_result = transcribe_audio_file(session_id, local_path)
+            else:
+                blob = storage_client.bucket(BUCKET_NAME).blob(session.audio_url)
+                signed_url = blob.generate_signed_url(expiration=timedelta(minutes=30))
+                transcription_result = transcribe_audio(session_id, signed_url)
+
+            if not transcription_result:
+                raise ProcessingError('Failed to transcribe audio')
+
+            if session.transcription is None:
+                usage_rollups.increment_for_session(session_id, transcriptions=1)
+            session.transcription = transcription_result
+            db.session.commit()
+            index_session_transcript.delay(session_id)
+            return transcription_result
+
+        run_processing_stage(
+            session_id, 'transcription',
+            lambda: singleflight.run(f"session:{session_id}:transcription", transcribe_session)
+        )
+
+
+@celery_app.task
+def process_session_insights(session_id):
+    with task_app_context():
+        run_processing_stage(session_id, 'insights', lambda: run_session_insights(session_id))
+
+
+@celery_app.task
+def process_series_summary(session_id):
+    with task_app_context():
+        run_processing_stage(session_id, 'series_summary', lambda: update_series_summary(session_id))
+
+
+@celery_app.task
+def finish_session_processing(session_id):
+    with task_app_context():
+        session = MeetingSession.query.get(session_id)
+        session.processing_status = 'ready'
+        db.session.commit()
+        current_app.logger.info(f"Post-recording processing finished for session {session_id}")
+
+
+@celery_app.task
+def index_session_transcript(session_id):
+    # Embeds the saved transcript for semantic search, off the request path
+    with task_app_context():
+        try:
+            semantic_search.index_session_transcript(session_id)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error indexing transcript of session {session_id}: {str(e)}")
+
+
+def get_member_session(session_id):
+    """Returns a session of a hub the current user is a member of, or None."""
+    return MeetingSession.query.filter(
+        MeetingSession.id == session_id,
+        MeetingSession.meeting.has(Meeting.meeting_hub.has(MeetingHub.users.any(id=current_user.id)))
+    ).first()
+
+
+@main.route('/api/sessions/<int:session_id>/process', methods=['POST'])
+@login_required
+@cross_origin()
+def process_session(session_id):
+    try:
+        data = request.get_json()
+        if not data or 'recording_id' not in data:
+            current_app.logger.error("Missing recording_id in the request data")
+            return jsonify({'status': 'error', 'message': 'Missing recording_id'}), 400
+
+        session = get_member_session(session_id)
+        if not session:
+            return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+
+        # Only a recording of this session may be processed into it
+        try:
+            recording_id = uuid.UUID(str(data['recording_id']))
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Recording not found'}), 404
+        recording = Recording.query.filter_by(id=recording_id, meeting_session_id=session_id).first()
+        if not recording:
+            return jsonify({'status': 'error', 'message': 'Recording not found'}), 404
+
+        result = start_session_processing(session_id, str(recording.id))
+        current_app.logger.info(f"Started processing workflow {result.id} for session {session_id}")
+        return jsonify({'status': 'pending', 'task_id': result.id}), 202
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error starting processing for session {session_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+
+@main.route('/api/sessions/<int:session_id>/processing-status', methods=['GET'])
+@login_required
+@cross_origin()
+def get_processing_status(session_id):
+    session = get_member_session(session_id)
+    if not session:
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+
+    return jsonify({
+        'status': 'success',
+        'processing_status': session.processing_status,
+        'stages': session.processing_state or {}
+    }), 200
+
+
+
+@main.route('/api/meetinghubs/<int:hub_id>/search', methods=['GET'])
+@login_required
+@cross_origin()
+@read_replica
+def search_meeting_hub(hub_id):
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'status': 'error', 'message': 'Query is required'}), 400
+
+    hub = MeetingHub.query.filter(MeetingHub.id == hub_id, MeetingHub.users.any(id=current_user.id)).first()
+    if not hub:
+        return jsonify({'status': 'error', 'message': 'Meeting hub not found'}), 404
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+        results = semantic_search.search_hub(hub_id, query, limit=limit)
+        return jsonify({'status': 'success', 'results': results}), 200
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid limit'}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error searching meeting hub {hub_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+
+@main.route('/api/search', methods=['GET'])
+@login_required
+@cross_origin()
+@read_replica
+def search_meetings():
+    """Full-text search over the transcripts, summaries and action items of the user's hubs."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'status': 'error', 'message': 'Query is required'}), 400
+
+    kinds = request.args.get('kinds')
+    kinds = [kind.strip() for kind in kinds.split(',') if kind.strip()] if kinds else list(fulltext_search.KINDS)
+    if any(kind not in fulltext_search.KINDS for kind in kinds):
+        return jsonify({'status': 'error', 'message': f"kinds must be among {', '.join(fulltext_search.KINDS)}"}), 400
+
+    try:
+        hub_id = request.args.get('hub_id', type=int)
+        results, next_cursor = fulltext_search.search(
+            current_user.id,
+            query,
+            hub_id=hub_id,
+            kinds=kinds,
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit'), default=fulltext_search.DEFAULT_PAGE_SIZE)
+        )
+        return jsonify({'status': 'success', 'results': results, 'next_cursor': next_cursor}), 200
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 404
+    except Exception as e:
+        current_app.logger.error(f"Error searching for '{query}': {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+
+# Sessions are listed newest first; the id makes the order total for the keyset cursor
+SESSION_PAGE_KEYS = [
+    (MeetingSession.session_datetime, lambda session: session.session_datetime),
+    (MeetingSession.id, lambda session: session.id),
+]
+SESSION_PAGE_KEY_TYPES = [datetime.fromisoformat, None]
+
+# Sparse fieldsets of the session listings: field -> (column to load, serializer).
+# Only the columns of the requested fields are selected, so the large text
+# columns are read only when a client asks for them.
+SESSION_FIELDS = {
+    'id': (MeetingSession.id, lambda session: session.id),
+    'name': (MeetingSession.name, lambda session: session.name),
+    'session_datetime': (MeetingSession.session_datetime, lambda session: session.session_datetime.isoformat()),
+    'meeting_id': (MeetingSession.meeting_id, lambda session: session.meeting_id),
+    'audio_url': (MeetingSession.audio_url, lambda session: session.audio_url),
+    'processing_status': (MeetingSession.processing_status, lambda session: session.processing_status),
+    # Stored in meeting_session_body, loaded with load_body_fields
+    'agenda': (None, lambda session: session.agenda),
+    'notes': (None, lambda session: session.notes),
+    'transcription': (None, lambda session: session.transcription),
+    'short_summary': (None, lambda session: session.short_summary),
+    'long_summary': (None, lambda session: session.long_summary),
+}
+# The hub listing also names the meeting and keeps its original date format
+HUB_SESSION_FIELDS = dict(
+    SESSION_FIELDS,
+    session_datetime=(MeetingSession.session_datetime, lambda session: session.session_datetime.strftime('%Y-%m-%d %H:%M:%S')),
+    meeting_name=(None, lambda session: session.meeting.name),
+)
+HUB_SESSION_DEFAULT_FIELDS = ['id', 'name', 'session_datetime', 'meeting_name', 'audio_url']
+MEETING_SESSION_DEFAULT_FIELDS = ['id', 'name', 'session_datetime']
+
+MEETING_FIELDS = {
+    'id': (Meeting.id, lambda meeting: meeting.id),
+    'name': (Meeting.name, lambda meeting: meeting.name),
+    'description': (Meeting.description, lambda meeting: meeting.description),
+    'is_recurring': (Meeting.is_recurring, lambda meeting: meeting.is_recurring),
+    'series_summary': (Meeting.series_summary, lambda meeting: meeting.series_summary),
+}
+MEETING_DEFAULT_FIELDS = ['id', 'name', 'description', 'is_recurring']
+
+
+def load_only_fields(field_specs, fields, *always):
+    """Returns a load_only option for the columns of the selected fields plus the always-needed ones."""
+    columns = [field_specs[field][0] for field in fields if field_specs[field][0] is not None]
+    return load_only(*dict.fromkeys(columns + list(always)))
+
+
+def load_body_fields(query, fields):
+    """Loads the requested meeting_session_body fields of all sessions of a query in one extra query."""
+    body_fields = [field for field in fields if field in MeetingSessionBody.TEXT_FIELDS]
+    if not body_fields:
+        return query
+    return query.options(
+        selectinload(MeetingSession.body).load_only(*(getattr(MeetingSessionBody, field) for field in body_fields))
+    )
+
+
+def serialize_fields(obj, field_specs, fields):
+    return {field: field_specs[field][1](obj) for field in fields}
+
+
+def hub_sessions_query(hub_id, fields):
+    """Sessions of a hub loading the given HUB_SESSION_FIELDS, for paging by SESSION_PAGE_KEYS."""
+    # Filtered on the session's own hub column so ix_meeting_session_hub_id_datetime_id serves the order
+    query = (
+        MeetingSession.query
+        .filter(MeetingSession.meeting_hub_id == hub_id)
+        .options(load_only_fields(HUB_SESSION_FIELDS, fields, MeetingSession.session_datetime))
+    )
+    if 'meeting_name' in fields:
+        # The meeting comes from the join instead of a query per session
+        query = query.join(Meeting).options(contains_eager(MeetingSession.meeting).load_only(Meeting.name))
+    return load_body_fields(query, fields)
+
+
+def meeting_sessions_query(meeting_id, fields):
+    """Sessions of a meeting loading the given SESSION_FIELDS, for paging by SESSION_PAGE_KEYS."""
+    return load_body_fields(
+        MeetingSession.query.filter_by(meeting_id=meeting_id)
+        .options(load_only_fields(SESSION_FIELDS, fields, MeetingSession.session_datetime)),
+        fields
+    )
+
+
+# Meetings are listed in creation order
+MEETING_PAGE_KEYS = [(Meeting.id, lambda meeting: meeting.id)]
+
+
+def hub_meetings_query(hub_id, fields):
+    """Meetings of a hub loading the given MEETING_FIELDS, for paging by MEETING_PAGE_KEYS."""
+    return Meeting.query.filter_by(meeting_hub_id=hub_id).options(load_only_fields(MEETING_FIELDS, fields))
+
+
+@main.route('/api/meetingsessions', methods=['GET', 'POST', 'PATCH'])
+@login_required
+@cross_origin()
+@read_replica
+def manage_meeting_sessions():
+    if request.method == 'GET':
+        try:
+            hub_id = request.args.get('hub_id')
+            if not hub_id:
+                return jsonify({'status': 'error', 'message': 'Hub ID is required'}), 400
+
+            current_app.logger.info(f"Fetching meeting sessions for hub ID: {hub_id}")
+            fields = pagination.parse_fields(request.args.get('fields'), HUB_SESSION_FIELDS, HUB_SESSION_DEFAULT_FIELDS)
+
+            # Newest first, one page at a time
+            meeting_sessions, next_cursor = pagination.paginate(
+                hub_sessions_query(hub_id, fields),
+                SESSION_PAGE_KEYS,
+                cursor=request.args.get('cursor'),
+                limit=pagination.page_size(request.args.get('limit')),
+                descending=True,
+                key_types=SESSION_PAGE_KEY_TYPES
+            )
+
+            sessions_data = [serialize_fields(session, HUB_SESSION_FIELDS, fields) for session in meeting_sessions]
+            return jsonify({'status': 'success', 'meeting_sessions': sessions_data, 'next_cursor': next_cursor}), 200
+        except (pagination.InvalidCursor, pagination.InvalidFields) as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except Exception as e:
+            current_app.logger.error(f"Error fetching meeting sessions: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+    elif request.method == 'PATCH':
+        try:
+            data = request.get_json()
+            recording_id = data.get('recording_id')
+            audio_url = data.get('audio_url')
+
+            if not recording_id or not audio_url:
+                return jsonify({'status': 'error', 'message': 'Recording ID and audio URL are required'}), 400
+
+            # Fetch the meeting session by recording_id
+            session = MeetingSession.query.filter_by(id=recording_id).first()
+
+            if not session:
+                return jsonify({'status': 'error', 'message': 'Meeting session not found'}), 404
+
+            # Update the audio URL in the session
+            session.audio_url = audio_url
+            db.session.commit()
+
+            current_app.logger.info(f"Updated audio URL for recording_id {recording_id}: {audio_url}")
+
+            return jsonify({'status': 'success', 'message': 'Audio URL updated successfully'}), 200
+        except Exception as e:
+            current_app.logger.error(f"Error updating audio URL: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+    elif request.method == 'POST':
+        try:
+            data = request.json
+            session_name = data.get('name', f"New Meeting Session {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}")
+            meeting_id = data.get('meeting_id')
+
+            if not meeting_id:
+                return jsonify({'status': 'error', 'message': 'Meeting ID is required'}), 400
+
+            new_session = MeetingSession(
+                name=session_name,
+                session_datetime=datetime.utcnow(),
+                meeting_id=meeting_id,
+                meeting_hub_id=select(Meeting.meeting_hub_id).where(Meeting.id == meeting_id).scalar_subquery()
+            )
+            db.session.add(new_session)
+            db.session.flush()
+            usage_rollups.increment_for_session(new_session.id, sessions=1)
+            db.session.commit()
+
+            # Logging the creation of a new meeting session
+            current_app.logger.info(f"New meeting session created: {new_session.id} - {new_session.name}")
+            return jsonify({'status': 'success', 'meeting_session_id': new_session.id}), 201
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error creating meeting session: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+        
+def user_hubs_query(user_id):
+    """Hubs of a user with their member counts, as (hub, member_count) rows."""
+    member_count = (
+        select(func.count())
+        .select_from(user_meeting_hub)
+        .where(user_meeting_hub.c.meeting_hub_id == MeetingHub.id)
+        .correlate(MeetingHub)
+        .scalar_subquery()
+    )
+    return (
+        db.session.query(MeetingHub, member_count.label('member_count'))
+        .join(user_meeting_hub, user_meeting_hub.c.meeting_hub_id == MeetingHub.id)
+        .filter(user_meeting_hub.c.user_id == user_id)
+        .order_by(MeetingHub.id)
+    )
+
+
+@main.route('/api/meetinghubs', methods=['GET', 'POST'])
+@login_required
+@read_replica
+def manage_meeting_hubs():
+    if request.method == 'GET':
+        try:
+            # Fetch all meeting hubs for the logged-in user
+            include_members = request.args.get('include_members', 'true').lower() != 'false'
+
+            # Hubs and their member counts in one query; the sidebar needs nothing more
+            query = user_hubs_query(current_user.id)
+            if include_members:
+                # All members of all hubs in one extra query instead of one per hub
+                query = query.options(selectinload(MeetingHub.users).load_only(User.id, User.email))
+            meeting_hubs = query.all()
+
+            # Fetch the active hub for the user
+            active_hub_id = current_user.active_meeting_hub_id  # Assuming you have an active_meeting_hub_id column in the User model
+
+            # Serialize the meeting hubs to return as JSON
+            meeting_hubs_data = []
+            for hub, hub_member_count in meeting_hubs:
+                hub_data = {
+                    'id': hub.id,
+                    'name': hub.name,
+                    'description': hub.description,
+                    'member_count': hub_member_count
+                }
+                if include_members:
+                    hub_data['users'] = [user.email for user in hub.users]
+                meeting_hubs_data.append(hub_data)
+
+            return jsonify({
+                'status': 'success',
+                'meeting_hubs': meeting_hubs_data,
+                'active_hub_id': active_hub_id  # Include the active hub ID in the response
+            }), 200
+        except Exception as e:
+            current_app.logger.error(f"Error fetching meeting hubs: {str(e)}")
+            return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
+
+    elif request.method == 'POST':
+        try:
+            data = request.get_json()
+
+            if not data:
+                current_app.logger.error("No JSON payload provided in the request.")
+                return jsonify({'status': 'error', 'message': 'No data provided'}), 400
+
+            name = data.get('name')
+            description = data.get('description', 'No description')
+
+            if not name:
+                current_app.logger.error("Hub name is missing in the request.")
+                return jsonify({'status': 'error', 'message': 'Name is required'}), 400
+
+            # Get the company_id from the current user
+            company_id = current_user.company_id
+            if not company_id:
+                current_app.logger.error(f"User {current_user.id} does not belong to any company.")
+                return jsonify({'status': 'error', 'message': 'User does not belong to any company'}), 400
+
+            # Create a new meeting hub
+            new_hub = MeetingHub(
+                name=name,
+                description=description,
+                company_id=company_id  # Ensure the company_id is set
             )
-            new_hub.users.append(current_user)  # Add the current user to the meeting hub
+            new_hub.users.append(db.session.get(User, current_user.id))  # Add the current user to the meeting hub
             db.session.add(new_hub)
             db.session.commit()
 
@@ -779,9 +1502,10 @@ def manage_company():
                     phone_number=data.get('phone_number')
                 )
                 db.session.add(company)
-                current_user.company = company  # Link the company to the current user
+                db.session.get(User, current_user.id).company = company  # Link the company to the current user
 
             db.session.commit()
+            identity.invalidate(current_user.id)
             logger.info(f"Company details updated successfully for user {current_user.email}")
             return jsonify({'status': 'success', 'message': 'Company details updated successfully'}), 200
         except Exception as e:
@@ -790,31 +1514,88 @@ def manage_company():
             return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
 
 
-# Add this new route for fetching all companies
-# Add this new route for fetching all companies with subscription details
+def serialize_subscription(subscription):
+    return {
+        'id': subscription.id,
+        'plan_name': subscription.plan_name,
+        'status': subscription.status,
+        'price': subscription.price,
+        'billing_cycle': subscription.billing_cycle,
+        'start_date': subscription.start_date.strftime('%Y-%m-%d'),
+        'end_date': subscription.end_date.strftime('%Y-%m-%d') if subscription.end_date else 'Ongoing',
+        'is_active': subscription.is_active
+    }
+
+
+# Sortable company columns; nullable ones are coalesced so they can be part of a keyset cursor
+COMPANY_SORT_COLUMNS = {
+    'id': Company.id,
+    'name': Company.name,
+    'city': func.coalesce(Company.city, ''),
+    'country': func.coalesce(Company.country, ''),
+}
+
+
+# Fetch companies with their current subscription details, one page at a time
 @main.route('/api/companies', methods=['GET'])
 @login_required
+@read_replica
 def get_all_companies():
     if current_user.internal_user_role != 'super_admin':
         logger.warning(f"Unauthorized access attempt by {current_user.email}")
         return jsonify({'status': 'error', 'message': 'Unauthorized access'}), 403
 
+    sort = request.args.get('sort', 'name')
+    if sort not in COMPANY_SORT_COLUMNS:
+        return jsonify({'status': 'error', 'message': f"sort must be one of {', '.join(COMPANY_SORT_COLUMNS)}"}), 400
+    descending = request.args.get('order', 'asc') == 'desc'
+    search = request.args.get('q', '').strip()
+    country = request.args.get('country')
+    subscription_status = request.args.get('subscription_status')
+
     try:
-        companies = Company.query.all()
-        companies_data = []
-        for company in companies:
-            # Fetch the first subscription for the company, if it exists
-            subscription = Subscription.query.filter_by(company_id=company.id).first()
-
-            subscription_data = {
-                'plan_name': subscription.plan_name if subscription else 'No Subscription',
-                'status': subscription.status if subscription else 'None',
-                'price': subscription.price if subscription else 0,
-                'start_date': subscription.start_date.strftime('%Y-%m-%d') if subscription else None,
-                'end_date': subscription.end_date.strftime('%Y-%m-%d') if subscription and subscription.end_date else 'Ongoing'
-            } if subscription else {}
-
-            company_data = {
+        # The current subscription of every company, picked in the same query by a lateral
+        # subquery: the active one if any, otherwise the most recently started one
+        current_subscription = aliased(
+            Subscription,
+            select(Subscription)
+            .where(Subscription.company_id == Company.id)
+            .order_by(
+                case((Subscription.status == 'active', 0), else_=1),
+                Subscription.start_date.desc(),
+                Subscription.id.desc()
+            )
+            .limit(1)
+            .correlate(Company)
+            .lateral('current_subscription')
+        )
+        query = db.session.query(Company, current_subscription).outerjoin(current_subscription, true())
+
+        filtered = bool(search or country or subscription_status)
+        if search:
+            query = query.filter(Company.name.ilike(f"%{search}%"))
+        if country:
+            query = query.filter(Company.country == country)
+        if subscription_status == 'none':
+            query = query.filter(current_subscription.id.is_(None))
+        elif subscription_status:
+            query = query.filter(current_subscription.status == subscription_status)
+
+        sort_column = COMPANY_SORT_COLUMNS[sort]
+        total, total_is_estimate = pagination.estimate_total(query, None if filtered else 'company')
+        rows, next_cursor = pagination.paginate(
+            query,
+            [
+                (sort_column, lambda row: getattr(row[0], sort) or ''),
+                (Company.id, lambda row: row[0].id),
+            ],
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit')),
+            descending=descending
+        )
+
+        companies_data = [
+            {
                 'id': company.id,
                 'name': company.name,
                 'address': company.address,
@@ -823,30 +1604,80 @@ def get_all_companies():
                 'zip_code': company.zip_code,
                 'country': company.country,
                 'phone_number': company.phone_number,
-                'subscription': subscription_data  # Add the subscription data
+                'subscription': serialize_subscription(subscription) if subscription else {}
             }
-            companies_data.append(company_data)
+            for company, subscription in rows
+        ]
 
-        logger.info(f"Super admin {current_user.email} fetched all companies successfully")
-        return jsonify({'status': 'success', 'companies': companies_data}), 200
+        logger.info(f"Super admin {current_user.email} fetched {len(companies_data)} companies")
+        return jsonify({
+            'status': 'success',
+            'companies': companies_data,
+            'next_cursor': next_cursor,
+            'total': total,
+            'total_is_estimate': total_is_estimate
+        }), 200
 
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching all companies for super admin {current_user.email}: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
-        
+
+
+# Sortable user columns; nullable ones are coalesced so they can be part of a keyset cursor
+USER_SORT_COLUMNS = {
+    'id': User.id,
+    'email': User.email,
+    'first_name': func.coalesce(User.first_name, ''),
+    'last_name': func.coalesce(User.last_name, ''),
+}
+
+
+def user_page_keys(sort):
+    """Keyset of the user listing sorted by one of USER_SORT_COLUMNS; the id makes the order total."""
+    return [
+        (USER_SORT_COLUMNS[sort], lambda user: getattr(user, sort) or ''),
+        (User.id, lambda user: user.id),
+    ]
+
+
+def company_users_query(company_id, search=''):
+    """Users of a company, optionally only those whose email or name contains search."""
+    query = User.query.filter_by(company_id=company_id)
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(User.email.ilike(pattern), User.first_name.ilike(pattern), User.last_name.ilike(pattern)))
+    return query
+
+
 @main.route('/api/companies/<int:company_id>/users', methods=['GET'])
 @login_required
+@read_replica
 def get_company_users(company_id):
     if current_user.internal_user_role != 'super_admin':
         return jsonify({'status': 'error', 'message': 'Unauthorized access'}), 403
 
+    sort = request.args.get('sort', 'id')
+    if sort not in USER_SORT_COLUMNS:
+        return jsonify({'status': 'error', 'message': f"sort must be one of {', '.join(USER_SORT_COLUMNS)}"}), 400
+    search = request.args.get('q', '').strip()
+
     try:
         company = Company.query.get(company_id)
         if not company:
             return jsonify({'status': 'error', 'message': 'Company not found'}), 404
 
-        users = User.query.filter_by(company_id=company.id).all()
-        subscriptions = Subscription.query.filter_by(company_id=company.id).all()  # Fetch subscriptions
+        query = company_users_query(company.id, search)
+
+        total, total_is_estimate = pagination.estimate_total(query)
+        users, next_cursor = pagination.paginate(
+            query,
+            user_page_keys(sort),
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit')),
+            descending=request.args.get('order', 'asc') == 'desc'
+        )
 
         # Serialize user data
         users_data = [
@@ -860,24 +1691,22 @@ def get_company_users(company_id):
             } for user in users
         ]
 
-        # Serialize subscription data
-        subscription_data = [
-            {
-                'plan_name': sub.plan_name,
-                'status': sub.status,
-                'price': sub.price,
-                'billing_cycle': sub.billing_cycle,
-                'start_date': sub.start_date.strftime('%Y-%m-%d'),
-                'end_date': sub.end_date.strftime('%Y-%m-%d') if sub.end_date else 'Ongoing',
-                'is_active': sub.is_active
-            } for sub in subscriptions
-        ]
+        # A company has a handful of subscriptions; they come along on the first page only
+        subscription_data = None
+        if not request.args.get('cursor'):
+            subscriptions = Subscription.query.filter_by(company_id=company.id).order_by(Subscription.start_date.desc()).all()
+            subscription_data = [serialize_subscription(sub) for sub in subscriptions]
 
         return jsonify({
             'status': 'success',
             'users': users_data,
-            'subscriptions': subscription_data
+            'subscriptions': subscription_data,
+            'next_cursor': next_cursor,
+            'total': total,
+            'total_is_estimate': total_is_estimate
         }), 200
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching users and subscriptions for company {company_id}: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500      
@@ -885,6 +1714,7 @@ def get_company_users(company_id):
 @main.route('/api/meetings', methods=['GET', 'POST'])
 @login_required
 @cross_origin()
+@read_replica
 def manage_meetings():
     if request.method == 'GET':
         try:
@@ -896,52 +1726,57 @@ def manage_meetings():
             if meeting_id:
                 current_app.logger.info(f"Fetching meeting sessions for meeting_id: {meeting_id}")
                 
-                # Fetch meeting sessions for the given meeting_id
-                sessions = MeetingSession.query.filter_by(meeting_id=meeting_id).all()
+                fields = pagination.parse_fields(request.args.get('fields'), SESSION_FIELDS, MEETING_SESSION_DEFAULT_FIELDS)
+
+                # Fetch meeting sessions for the given meeting_id, newest first
+                sessions, next_cursor = pagination.paginate(
+                    meeting_sessions_query(meeting_id, fields),
+                    SESSION_PAGE_KEYS,
+                    cursor=request.args.get('cursor'),
+                    limit=pagination.page_size(request.args.get('limit')),
+                    descending=True,
+                    key_types=SESSION_PAGE_KEY_TYPES
+                )
 
                 if not sessions:
                     current_app.logger.warning(f"No sessions found for meeting_id: {meeting_id}")
-                    return jsonify({'status': 'success', 'sessions': []}), 200  # Return empty list if no sessions found
+                    return jsonify({'status': 'success', 'sessions': [], 'next_cursor': None}), 200  # Return empty list if no sessions found
 
                 # Serialize the sessions to return as JSON
-                sessions_data = [
-                    {
-                        'id': session.id,
-                        'name': session.name,
-                        'session_datetime': session.session_datetime.isoformat()
-                    } for session in sessions
-                ]
+                sessions_data = [serialize_fields(session, SESSION_FIELDS, fields) for session in sessions]
 
                 current_app.logger.info(f"Successfully fetched {len(sessions_data)} sessions for meeting_id: {meeting_id}")
-                return jsonify({'status': 'success', 'sessions': sessions_data}), 200
+                return jsonify({'status': 'success', 'sessions': sessions_data, 'next_cursor': next_cursor}), 200
 
             elif hub_id:
                 current_app.logger.info(f"Fetching meetings for hub_id: {hub_id}")
 
-                # Fetch meetings for the given hub_id
-                meetings = Meeting.query.filter_by(meeting_hub_id=hub_id).all()
+                fields = pagination.parse_fields(request.args.get('fields'), MEETING_FIELDS, MEETING_DEFAULT_FIELDS)
+
+                # Fetch meetings for the given hub_id, in creation order
+                meetings, next_cursor = pagination.paginate(
+                    hub_meetings_query(hub_id, fields),
+                    MEETING_PAGE_KEYS,
+                    cursor=request.args.get('cursor'),
+                    limit=pagination.page_size(request.args.get('limit'))
+                )
 
                 if not meetings:
                     current_app.logger.warning(f"No meetings found for hub_id: {hub_id}")
-                    return jsonify({'status': 'success', 'meetings': []}), 200  # Return empty list if no meetings found
+                    return jsonify({'status': 'success', 'meetings': [], 'next_cursor': None}), 200  # Return empty list if no meetings found
 
                 # Serialize the meetings to return as JSON
-                meetings_data = [
-                    {
-                        'id': meeting.id,
-                        'name': meeting.name,
-                        'description': meeting.description,
-                        'is_recurring': meeting.is_recurring  # Assuming the Meeting model has an is_recurring attribute
-                    } for meeting in meetings
-                ]
+                meetings_data = [serialize_fields(meeting, MEETING_FIELDS, fields) for meeting in meetings]
 
                 current_app.logger.info(f"Successfully fetched {len(meetings_data)} meetings for hub_id: {hub_id}")
-                return jsonify({'status': 'success', 'meetings': meetings_data}), 200
+                return jsonify({'status': 'success', 'meetings': meetings_data, 'next_cursor': next_cursor}), 200
             else:
                 current_app.logger.error("Hub ID or Meeting ID not provided")
                 # Return an error if neither hub_id nor meeting_id is provided
                 return jsonify({'status': 'error', 'message': 'Hub ID or Meeting ID is required'}), 400
 
+        except (pagination.InvalidCursor, pagination.InvalidFields) as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f"Error fetching meetings or sessions: {str(e)}")
             return jsonify({'status': 'error', 'message': 'Internal Server Error'}), 500
@@ -977,9 +1812,12 @@ def manage_meetings():
                 new_session = MeetingSession(
                     name=session_name,
                     session_datetime=datetime.utcnow(),
-                    meeting_id=new_meeting.id
+                    meeting_id=new_meeting.id,
+                    meeting_hub_id=new_meeting.meeting_hub_id
                 )
                 db.session.add(new_session)
+                db.session.flush()
+                usage_rollups.increment_for_session(new_session.id, sessions=1)
                 db.session.commit()
 
                 current_app.logger.info(f"Created new meeting session with id: {new_session.id}")
@@ -998,8 +1836,10 @@ def manage_meetings():
 @cross_origin()
 def get_session(session_id):
     try:
-        # Fetch the MeetingSession by ID
-        session = MeetingSession.query.get(session_id)
+        # Fetch the MeetingSession by ID, with the transcription in the same query
+        session = MeetingSession.query.options(
+            joinedload(MeetingSession.body).undefer(MeetingSessionBody.transcription)
+        ).get(session_id)
         if not session:
             return jsonify({'status': 'error', 'message': 'Session not found'}), 404
 
@@ -1095,6 +1935,7 @@ def create_recording():
             meeting_session_id=meeting_session_id
         )
         db.session.add(new_recording)
+        usage_rollups.record_active_user(current_user.company_id, user_id, new_recording.timestamp.date())
         db.session.commit()
 
         current_app.logger.info(f"Recording {recording_id} created for user {user_id} in session {meeting_session_id}")
@@ -1199,8 +2040,9 @@ def set_active_hub():
 
         # Update the active hub for the current user
         logger.debug(f"Setting active hub to {hub_id} for user {current_user.email}")
-        current_user.active_meeting_hub_id = hub_id
+        db.session.execute(update(User).where(User.id == current_user.id).values(active_meeting_hub_id=hub_id))
         db.session.commit()
+        identity.invalidate(current_user.id)
 
         logger.info(f"Successfully set active hub to {hub_id} for user {current_user.email}")
         return jsonify({"status": "success"}), 200
@@ -1224,9 +2066,7 @@ def check_subscription_status():
         if not company:
             return jsonify({'is_active': False, 'is_empty': True}), 404
 
-        active_subscription = Subscription.query.filter_by(company_id=company.id, status='active').first()
-
-        if active_subscription:
+        if entitlements.is_entitled(company.id):
             return jsonify({'is_active': True, 'is_empty': False}), 200
         else:
             return jsonify({'is_active': False, 'is_empty': False}), 200
@@ -1259,6 +2099,7 @@ def update_subscription(subscription_id):
         data = request.json
         subscription.status = data.get('status', subscription.status)
         db.session.commit()
+        entitlements.invalidate(subscription.company_id)
 
         return jsonify({'status': 'success', 'subscription': subscription.status}), 200
     except Exception as e:
@@ -1288,18 +2129,33 @@ def transcribe(session_id):
         audio_url = url_for('main.download_file', filename=filename, _external=True)
         current_app.logger.info(f"Audio URL for session ID {session_id}: {audio_url}")
 
-        # Begin the transcription process
-        current_app.logger.info(f"Starting transcription process for session ID {session_id} with audio URL {audio_url}")
-        transcription_result = transcribe_audio(session_id, audio_url)
+        def transcribe_session():
+            # Begin the transcription process
+            current_app.logger.info(f"Starting transcription process for session ID {session_id} with audio URL {audio_url}")
+            transcription_result = transcribe_audio(session_id, audio_url)
 
-        if not transcription_result:
-            current_app.logger.error(f"Transcription failed for session ID {session_id}")
-            return jsonify({'error': 'Failed to transcribe audio'}), 500
+            if not transcription_result:
+                current_app.logger.error(f"Transcription failed for session ID {session_id}")
+                raise ProcessingError('Failed to transcribe audio')
 
-        # Store transcription in the database
-        session.transcription = transcription_result
-        db.session.commit()
-        current_app.logger.info(f"Transcription saved successfully for session ID {session_id}")
+            # Store transcription in the database
+            if session.transcription is None:
+                usage_rollups.increment_for_session(session_id, transcriptions=1)
+            session.transcription = transcription_result
+            db.session.commit()
+            current_app.logger.info(f"Transcription saved successfully for session ID {session_id}")
+            index_session_transcript.delay(session_id)
+            return transcription_result
+
+        # Concurrent requests for the same session share one transcription run
+        try:
+            transcription_result = singleflight.run(
+                f"session:{session_id}:transcription", transcribe_session, wait_timeout=REQUEST_FLIGHT_WAIT_SECONDS
+            )
+        except (ProcessingError, singleflight.FlightError) as e:
+            return jsonify({'error': e.message}), e.status_code
+        except singleflight.FlightTimeout:
+            return flight_pending_response(session_id)
 
         return jsonify({'transcription': transcription_result}), 200
 
@@ -1314,11 +2170,7 @@ def transcribe_audio(session_id, audio_url):
         import tempfile
         import requests
         from flask import current_app
-        from openai import OpenAI
         import json  # Import json to handle JSON responses if necessary
-        
-        # Initialize the OpenAI client
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
         # Log the audio URL and session ID
         current_app.logger.info(f"Transcribing audio for session ID {session_id} from URL: {audio_url}")
@@ -1338,192 +2190,355 @@ def transcribe_audio(session_id, audio_url):
 
         current_app.logger.info(f"Temporary audio file created at {temp_audio_file_path}")
 
-        # Use the OpenAI Whisper API to transcribe the audio, requesting plain text output
-        with open(temp_audio_file_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language="nl",
-                response_format='text'  # Ask for plain text response
-            )
-
-        # transcription is now a string since we set `response_format='text'`
-        current_app.logger.info(f"Transcription result for session ID {session_id}: {transcription}")
-
-        # Clean up the temporary file
-        os.remove(temp_audio_file_path)
-        current_app.logger.info(f"Temporary audio file deleted: {temp_audio_file_path}")
-
-        return transcription  # Return the plain text transcription
+        try:
+            return transcribe_audio_file(session_id, temp_audio_file_path)
+        finally:
+            # Clean up the temporary file
+            os.remove(temp_audio_file_path)
+            current_app.logger.info(f"Temporary audio file deleted: {temp_audio_file_path}")
 
     except Exception as e:
         current_app.logger.error(f"Error during transcription process for session ID {session_id}: {str(e)}")
         return None
 
 
-@main.route('/api/extract_action_points/<int:session_id>', methods=['POST'])
-def extract_action_points(session_id):
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def transcribe_audio_file(session_id, file_path):
+    """Transcribes a local audio file with Whisper and returns the plain text."""
+    # Use the OpenAI Whisper API to transcribe the audio, requesting plain text output
+    transcription = openai_client.transcription(
+        'transcription',
+        file_path,
+        model="whisper-1",
+        language="nl",
+        response_format='text'  # Ask for plain text response
+    )
 
-    logger.debug(f"Starting action point extraction for session_id: {session_id}")
+    # transcription is now a string since we set `response_format='text'`
+    current_app.logger.info(f"Transcription result for session ID {session_id}: {transcription}")
+    return transcription  # Return the plain text transcription
+
+
+def record_token_usage(session_id, usage):
+    """Adds the tokens of one LLM call to the session's totals; the caller commits."""
+    if usage is None:
+        return
+    db.session.execute(
+        update(MeetingSession)
+        .where(MeetingSession.id == session_id)
+        .values(
+            llm_input_tokens=MeetingSession.llm_input_tokens + (usage.prompt_tokens or 0),
+            llm_output_tokens=MeetingSession.llm_output_tokens + (usage.completion_tokens or 0)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    usage_rollups.increment_for_session(
+        session_id, llm_input_tokens=usage.prompt_tokens, llm_output_tokens=usage.completion_tokens
+    )
 
-    # Fetch the MeetingSession by ID
-    session = MeetingSession.query.get(session_id)
-    if not session:
-        logger.error(f"Session not found for session_id: {session_id}")
-        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
 
-    # Ensure transcription exists
-    if not session.transcription:
-        logger.error(f"No transcription found for session_id: {session_id}")
-        return jsonify({'status': 'error', 'message': 'No transcription available'}), 400
+def condense_transcript(session_id, transcript_plan):
+    """
+    Returns the text a final prompt runs on for a transcript plan.
 
-    try:
-        logger.debug(f"Sending transcription to OpenAI for action item extraction with structured output, session_id: {session_id}")
-
-        # Define the structured response schema for action points
-        action_item_schema = {
-            "name": "action_item_schema",
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "action_items": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "summary": {"type": "string", "description": "Summary of the action item"},
-                                "details": {"type": "string", "description": "Detailed explanation of the action item"},
-                                "assigned_to": {"type": "string", "description": "Person assigned to the action item"},
-                                "due_date": {"type": ["string", "null"], "description": "Due date of the action item in ISO format"},
-                                "completed": {"type": "boolean", "description": "Completion status of the action item"}
-                            },
-                            "required": ["summary", "details"]
-                        }
-                    }
-                },
-                "required": ["action_items"]
-            }
-        }
+    That is the compressed transcript itself, or for map-reduce plans the
+    notes of every chunk, which are cached so the short and long summary
+    share one map pass.
+    """
+    if not transcript_plan.map_reduce:
+        return transcript_plan.text
+
+    def compute_notes(chunk):
+        response = openai_client.chat_completion(
+            'chunk_notes',
+            model=SUMMARY_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": CHUNK_NOTES_PROMPT + chunk}
+            ]
+        )
+        record_token_usage(session_id, response.usage)
+        return response.choices[0].message.content
+
+    notes = []
+    for number, chunk in enumerate(transcript_plan.chunks, start=1):
+        chunk_notes = llm_cache.cached(
+            'chunk_notes',
+            chunk,
+            model=SUMMARY_MODEL,
+            prompt=CHUNK_NOTES_PROMPT,
+            prompt_version=SUMMARY_PROMPT_VERSION,
+            compute=lambda: compute_notes(chunk)
+        )
+        notes.append(f"Part {number} of {len(transcript_plan.chunks)}:\n{chunk_notes}")
+    return "\n\n".join(notes)
+
+
+def store_action_items(session, action_items):
+    """
+    Replaces a session's action items with the ones returned by the model.
+
+    The replacement is one DELETE and one multi-row INSERT ... RETURNING, so
+    re-extraction costs two statements regardless of the number of items.
+    The session row is locked first: extraction and insights runs use
+    different single-flight keys, and two unserialized replacements would
+    each miss the rows the other inserted and leave both sets behind.
+    Nothing is committed; the caller commits so the replacement lands in the
+    same transaction as any other changes it makes, and readers never see the
+    session without action items.
+
+    Args:
+        session (MeetingSession): The session the action items belong to.
+        action_items (list): Action item dicts as defined by ACTION_ITEM_SCHEMA.
+
+    Returns:
+        list: The new ActionItem objects, in sorting order.
+
+    Raises:
+        ProcessingError: If an action item lacks a summary or details.
+    """
+    session_id = session.id
+    hub_id = session.meeting_hub_id
+
+    # Validate everything before touching the stored rows
+    rows = []
+    for sorting_id, action in enumerate(action_items, start=1):
+        title = action.get('summary', 'No summary provided')
+        details = action.get('details', 'No details provided')
+        due_date = action.get('due_date')  # Due date might be parsed from the action items
+
+        # Ensure required fields are present
+        if not title or not details:
+            logger.error(f"Missing fields in action item: {action}")
+            raise ProcessingError('Missing required fields', 400)
+
+        # Convert due_date if present
+        due_date_obj = None
+        if due_date:
+            try:
+                due_date_obj = datetime.fromisoformat(due_date)
+            except ValueError:
+                logger.error(f"Invalid date format for due_date: {due_date}")
+
+        rows.append({
+            'title': title,
+            'description': details,
+            'assigned_to': action.get('assigned_to', 'Unassigned'),
+            'due_date': due_date_obj,
+            'completed': action.get('completed', False),
+            'status': 'explicit',  # Assuming all are explicit; you can modify if needed
+            'meeting_session_id': session_id,
+            'meeting_hub_id': hub_id,
+            'sorting_id': sorting_id
+        })
+
+    # Concurrent replacements of this session's items wait here until the other one commits
+    db.session.execute(select(MeetingSession.id).where(MeetingSession.id == session_id).with_for_update())
+
+    # Clear existing action points if any
+    deleted = db.session.execute(delete(ActionItem).where(ActionItem.meeting_session_id == session_id)).rowcount
+    logger.info(f"Replacing {deleted} existing action points with {len(rows)} new ones for session {session_id}")
+
+    if not rows:
+        return []
+    return db.session.scalars(
+        insert(ActionItem).returning(ActionItem, sort_by_parameter_order=True),
+        rows
+    ).all()
+
+
+def generate_action_points(session):
+    """
+    Extracts action points from a session's transcription and replaces the stored ones.
 
+    Args:
+        session (MeetingSession): The session to extract action points for.
+
+    Returns:
+        list: The newly stored ActionItem objects, in sorting order.
+
+    Raises:
+        ProcessingError: If the model returned no usable action points.
+    """
+    session_id = session.id
+    logger.debug(f"Sending transcription to OpenAI for action item extraction with structured output, session_id: {session_id}")
+
+    # Compress the transcript and pick the model tier (or map-reduce) for its length
+    transcript_plan = transcript_budget.plan(session.transcription, ACTION_POINTS_MODEL, structured=True)
+
+    def extract(text):
         # Define the messages with system instructions and the transcription content
         messages = [
-            {"role": "system", "content": "You are an AI that extracts action items from meeting transcriptions."},
-            {"role": "user", "content": session.transcription}
+            {"role": "system", "content": ACTION_POINTS_SYSTEM_PROMPT},
+            {"role": "user", "content": text}
         ]
 
         # Call the OpenAI API with the structured response format
-        response = client.chat.completions.create(
-            model="gpt-4o-2024-08-06",
+        response = openai_client.chat_completion(
+            'action_points',
+            model=transcript_plan.model,
             messages=messages,
             response_format={
                 "type": "json_schema",
-                "json_schema": action_item_schema
+                "json_schema": ACTION_ITEM_SCHEMA
             }
         )
+        record_token_usage(session_id, response.usage)
 
         # Log the full OpenAI response
         logger.debug(f"Full OpenAI response: {response}")
+        return response.choices[0].message.content
+
+    def compute_action_points():
+        if not transcript_plan.map_reduce:
+            return extract(transcript_plan.text)
+
+        # Extract per chunk and merge, skipping items already found in an earlier chunk
+        merged, seen = [], set()
+        for chunk in transcript_plan.chunks:
+            for item in json.loads(extract(chunk)).get('action_items', []):
+                key = ' '.join(item.get('summary', '').lower().split())
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        return json.dumps({'action_items': merged})
+
+    # Extract the action points from the content of the message, reusing a cached response
+    # when the transcript and prompt have not changed
+    response_content = llm_cache.cached(
+        'action_points',
+        transcript_plan.text,
+        model=transcript_plan.model,
+        prompt=ACTION_POINTS_SYSTEM_PROMPT,
+        prompt_version=ACTION_POINTS_PROMPT_VERSION,
+        compute=compute_action_points,
+        schema=ACTION_ITEM_SCHEMA
+    )
+    logger.debug(f"Response content: {response_content}")
 
-        # Extract the action points from the content of the message
-        response_content = response.choices[0].message.content
-        logger.debug(f"Response content: {response_content}")
-
-        # Parse the content into a dictionary
-        action_points_data = json.loads(response_content)
-        action_items = action_points_data.get('action_items', [])
-        if not action_items:
-            logger.error("No action items found in the response")
-            return jsonify({'status': 'error', 'message': 'No action items found'}), 500
-
-        # Clear existing action points if any
-        existing_action_points = ActionItem.query.filter_by(meeting_session_id=session_id).all()
-        if existing_action_points:
-            logger.info(f"Deleting {len(existing_action_points)} existing action points for session {session_id}")
-            for action_item in existing_action_points:
-                db.session.delete(action_item)
-            db.session.commit()
-            logger.info(f"Existing action points deleted successfully for session {session_id}")
-
-        # Process and store the new action points
-        new_action_items = []
-        sorting_id = 1  # Initialize sorting_id for ordering
-
-        for action in action_items:
-            title = action.get('summary', 'No summary provided')
-            details = action.get('details', 'No details provided')
-            assigned_to = action.get('assigned_to', 'Unassigned')
-            due_date = action.get('due_date')  # Due date might be parsed from the action items
-            completed = action.get('completed', False)
-
-            # Convert due_date if present
-            due_date_obj = None
-            if due_date:
-                try:
-                    due_date_obj = datetime.fromisoformat(due_date)
-                except ValueError:
-                    logger.error(f"Invalid date format for due_date: {due_date}")
-
-            # Ensure required fields are present
-            if not title or not details:
-                logger.error(f"Missing fields in action item: {action}")
-                return jsonify({'status': 'error', 'message': 'Missing required fields'}), 400
-
-            # Store action points in the database
-            action_item = ActionItem(
-                title=title,
-                description=details,
-                assigned_to=assigned_to,
-                due_date=due_date_obj,
-                completed=completed,
-                status='explicit',  # Assuming all are explicit; you can modify if needed
-                meeting_session_id=session.id,
-                sorting_id=sorting_id
-            )
-            new_action_items.append(action_item)
-            db.session.add(action_item)
-            sorting_id += 1
+    # Parse the content into a dictionary
+    action_points_data = json.loads(response_content)
+    action_items = action_points_data.get('action_items', [])
+    if not action_items:
+        logger.error("No action items found in the response")
+        raise ProcessingError('No action items found', 500)
 
-        # Commit to the database
-        db.session.commit()
-        logger.info(f"Action points saved successfully for session_id: {session_id}")
+    try:
+        new_action_items = store_action_items(session, action_items)
+    except ProcessingError:
+        db.session.rollback()
+        raise
+
+    # Commit to the database
+    session.action_points_prompt_version = ACTION_POINTS_PROMPT_VERSION
+    db.session.commit()
+    logger.info(f"Action points saved successfully for session_id: {session_id}")
+    return new_action_items
+
+
+@main.route('/api/extract_action_points/<int:session_id>', methods=['POST'])
+def extract_action_points(session_id):
+    logger.debug(f"Starting action point extraction for session_id: {session_id}")
+
+    # Fetch the MeetingSession by ID
+    session = MeetingSession.query.get(session_id)
+    if not session:
+        logger.error(f"Session not found for session_id: {session_id}")
+        return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+
+    # Ensure transcription exists
+    if not session.transcription:
+        logger.error(f"No transcription found for session_id: {session_id}")
+        return jsonify({'status': 'error', 'message': 'No transcription available'}), 400
+
+    try:
+        # Concurrent requests for the same session share one extraction (and one replacement of the rows)
+        action_items = singleflight.run(
+            f"session:{session_id}:action_points",
+            lambda: [ap.to_dict() for ap in generate_action_points(session)],
+            wait_timeout=REQUEST_FLIGHT_WAIT_SECONDS
+        )
 
         # Return the saved action items as a JSON response
         return jsonify({
             'status': 'success',
-            'action_items': [ap.to_dict() for ap in new_action_items]
+            'action_items': action_items
         }), 200
 
+    except (ProcessingError, singleflight.FlightError) as e:
+        return jsonify({'status': 'error', 'message': e.message}), e.status_code
+    except singleflight.FlightTimeout:
+        return flight_pending_response(session_id)
     except Exception as e:
         logger.error(f"Error extracting action points: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error extracting action points'}), 500
 
 
-@main.route('/api/update_action_point_title/<int:action_item_id>', methods=['PUT'])
-def update_action_point_title(action_item_id):
-    data = request.get_json()  # Get the data from the request
-    new_title = data.get('title')  # Extract the new title from the data
+# Fields of an action item that can be changed through the bulk update endpoint
+ACTION_ITEM_UPDATABLE_FIELDS = ('title', 'completed', 'sorting_id')
 
-    if not new_title:
-        return jsonify({'status': 'error', 'message': 'Title is required'}), 400
 
-    # Fetch the action item by ID
-    action_item = ActionItem.query.get(action_item_id)
-    if not action_item:
-        return jsonify({'status': 'error', 'message': 'Action item not found'}), 404
+@main.route('/api/sessions/<int:session_id>/action_points', methods=['PATCH'])
+@login_required
+def update_action_points(session_id):
+    """
+    Updates titles, completion flags and/or the order of several action items at once.
 
-    # Update the title
-    action_item.title = new_title
+    Expects {'action_items': [{'id': 1, 'sorting_id': 2, 'completed': true, 'title': '...'}, ...]};
+    every entry needs an id and may contain any of ACTION_ITEM_UPDATABLE_FIELDS.
+    """
+    data = request.get_json() or {}
+    changes = data.get('action_items')
+    if not isinstance(changes, list) or not changes:
+        return jsonify({'status': 'error', 'message': 'action_items must be a non-empty list'}), 400
+
+    rows = []
+    for change in changes:
+        if not isinstance(change, dict) or not isinstance(change.get('id'), int):
+            return jsonify({'status': 'error', 'message': 'Every action item needs an id'}), 400
+        row = {field: change[field] for field in ACTION_ITEM_UPDATABLE_FIELDS if field in change}
+        if 'title' in row and not (isinstance(row['title'], str) and row['title'].strip()):
+            return jsonify({'status': 'error', 'message': 'Title is required'}), 400
+        if 'completed' in row and not isinstance(row['completed'], bool):
+            return jsonify({'status': 'error', 'message': 'completed must be a boolean'}), 400
+        if 'sorting_id' in row and not isinstance(row['sorting_id'], int):
+            return jsonify({'status': 'error', 'message': 'sorting_id must be an integer'}), 400
+        if row:
+            rows.append({'id': change['id'], **row})
+
+    ids = {row['id'] for row in rows}
+    found = set(db.session.scalars(
+        select(ActionItem.id).where(ActionItem.meeting_session_id == session_id, ActionItem.id.in_(ids))
+    ))
+    if found != ids:
+        return jsonify({'status': 'error', 'message': 'Action item not found'}), 404
 
-    # Commit the changes to the database
     try:
+        # One executemany UPDATE by primary key for all changed items
+        db.session.execute(update(ActionItem), rows)
         db.session.commit()
-        return jsonify({'status': 'success', 'message': 'Action item title updated successfully'}), 200
-    except Exception as e:
+    except SQLAlchemyError as e:
         db.session.rollback()
-        return jsonify({'status': 'error', 'message': 'Failed to update title'}), 500       
+        logger.error(f"Error updating action points of session {session_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Failed to update action points'}), 500
+
+    action_items = ActionItem.query.filter_by(meeting_session_id=session_id).order_by(ActionItem.sorting_id).all()
+    return jsonify({'status': 'success', 'action_items': [item.to_dict() for item in action_items]}), 200
+
+
+# Action items of a session are listed in display order
+ACTION_ITEM_PAGE_KEYS = [
+    (ActionItem.sorting_id, lambda item: item.sorting_id),
+    (ActionItem.id, lambda item: item.id),
+]
+
+
+def session_action_items_query(session_id):
+    """Action items of a session, for paging by ACTION_ITEM_PAGE_KEYS."""
+    return ActionItem.query.filter_by(meeting_session_id=session_id)
+
 
 @main.route('/api/sessions/<int:session_id>/action_points', methods=['GET'])
+@read_replica
 def get_action_points(session_id):
     logger.debug(f"Fetching action points for session_id: {session_id}")
     
@@ -1532,11 +2547,20 @@ def get_action_points(session_id):
         logger.error(f"Session not found for session_id: {session_id}")
         return jsonify({'status': 'error', 'message': 'Session not found'}), 404
 
-    action_items = ActionItem.query.filter_by(meeting_session_id=session_id).all()
+    # In display order, one page at a time
+    try:
+        action_items, next_cursor = pagination.paginate(
+            session_action_items_query(session_id),
+            ACTION_ITEM_PAGE_KEYS,
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit'))
+        )
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
     if not action_items:
         logger.info(f"No action items found for session_id: {session_id}")
-        return jsonify({'status': 'success', 'action_items': []}), 200  # Return an empty list with success status
+        return jsonify({'status': 'success', 'action_items': [], 'next_cursor': None}), 200  # Return an empty list with success status
 
     # Serialize the action items with sorting_id
     action_items_list = [
@@ -1553,10 +2577,141 @@ def get_action_points(session_id):
     ]
 
     logger.debug(f"Returning action points for session_id: {session_id}")
-    return jsonify({'status': 'success', 'action_items': action_items_list}), 200
+    return jsonify({'status': 'success', 'action_items': action_items_list, 'next_cursor': next_cursor}), 200
+
+
+def session_hub_id(session_id):
+    """Returns the hub a session belongs to, or None."""
+    return db.session.scalar(select(MeetingSession.meeting_hub_id).where(MeetingSession.id == session_id))
+
+
+# The hub board lists items by due date (items without one last); the id makes the order total
+HUB_ACTION_ITEM_PAGE_KEYS = [
+    (ActionItem.due_date_sort, lambda item: item.due_date_sort),
+    (ActionItem.id, lambda item: item.id),
+]
+HUB_ACTION_ITEM_PAGE_KEY_TYPES = [datetime.fromisoformat, None]
+
 
+def hub_action_items_query(hub_id, completed='false', assigned_to=None, due_from=None, due_to=None):
+    """
+    Action items of a hub's board, for paging by HUB_ACTION_ITEM_PAGE_KEYS.
+
+    Every filter is a column of ix_action_item_hub_id_(assignee_)completed_due_sort_id.
+
+    Args:
+        hub_id (int): The hub.
+        completed (str): 'false' (open items), 'true' or 'all'.
+        assigned_to (str, optional): Only items assigned to exactly this name.
+        due_from (datetime, optional): Only items due on or after this time.
+        due_to (datetime, optional): Only items due before this time.
+    """
+    query = ActionItem.query.filter(ActionItem.meeting_hub_id == hub_id)
+    if completed != 'all':
+        query = query.filter(ActionItem.completed.is_(completed == 'true'))
+    if assigned_to is not None:
+        query = query.filter(ActionItem.assigned_to == assigned_to)
+    if due_from:
+        query = query.filter(ActionItem.due_date_sort >= due_from, ActionItem.due_date.isnot(None))
+    if due_to:
+        query = query.filter(ActionItem.due_date_sort < due_to)
+    return query
+
+
+@main.route('/api/hubs/<int:hub_id>/action_items', methods=['GET'])
+@login_required
+@read_replica
+def get_hub_action_items(hub_id):
+    """
+    Action items of all sessions of a hub, by due date.
+
+    Query arguments: completed ('false' by default, 'true' or 'all'), assigned_to,
+    due_from and due_to (ISO dates, inclusive), cursor and limit.
+    """
+    is_member = db.session.scalar(
+        select(user_meeting_hub.c.user_id)
+        .where(user_meeting_hub.c.user_id == current_user.id, user_meeting_hub.c.meeting_hub_id == hub_id)
+    )
+    if not is_member:
+        return jsonify({'status': 'error', 'message': 'Meeting hub not found'}), 404
+
+    completed = request.args.get('completed', 'false').lower()
+    if completed not in ('true', 'false', 'all'):
+        return jsonify({'status': 'error', 'message': "completed must be 'true', 'false' or 'all'"}), 400
+    try:
+        due_from = datetime.fromisoformat(request.args['due_from']) if request.args.get('due_from') else None
+        due_to = datetime.fromisoformat(request.args['due_to']) + timedelta(days=1) if request.args.get('due_to') else None
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'due_from and due_to must be ISO dates (YYYY-MM-DD)'}), 400
+
+    try:
+        action_items, next_cursor = pagination.paginate(
+            hub_action_items_query(hub_id, completed, request.args.get('assigned_to'), due_from, due_to),
+            HUB_ACTION_ITEM_PAGE_KEYS,
+            cursor=request.args.get('cursor'),
+            limit=pagination.page_size(request.args.get('limit')),
+            key_types=HUB_ACTION_ITEM_PAGE_KEY_TYPES
+        )
+    except pagination.InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify({
+        'status': 'success',
+        'action_items': [item.to_dict() for item in action_items],
+        'next_cursor': next_cursor
+    }), 200
+
+
+def generate_summaries(session):
+    """
+    Generates the short and long summary for a session and stores them.
+
+    Args:
+        session (MeetingSession): The session to summarize; must have a transcription.
+
+    Returns:
+        tuple: The (short_summary, long_summary) HTML strings.
+    """
+    # Compress the transcript and pick the model tier (or map-reduce) for its length
+    transcript_plan = transcript_budget.plan(session.transcription, SUMMARY_MODEL)
+
+    def complete(operation, prompt):
+        response = openai_client.chat_completion(
+            operation,
+            model=transcript_plan.model,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt + condense_transcript(session.id, transcript_plan)}
+            ]
+        )
+        record_token_usage(session.id, response.usage)
+        return response.choices[0].message.content
+
+    # Short and long summaries are served from the LLM cache when the transcript and prompts are unchanged
+    short_summary = llm_cache.cached(
+        'short_summary',
+        transcript_plan.text,
+        model=transcript_plan.model,
+        prompt=SHORT_SUMMARY_PROMPT,
+        prompt_version=SUMMARY_PROMPT_VERSION,
+        compute=lambda: complete('short_summary', SHORT_SUMMARY_PROMPT)
+    )
+    long_summary = llm_cache.cached(
+        'long_summary',
+        transcript_plan.text,
+        model=transcript_plan.model,
+        prompt=LONG_SUMMARY_PROMPT,
+        prompt_version=SUMMARY_PROMPT_VERSION,
+        compute=lambda: complete('long_summary', LONG_SUMMARY_PROMPT)
+    )
+
+    # Save summaries to the session
+    session.short_summary = short_summary
+    session.long_summary = long_summary
+    session.summary_prompt_version = SUMMARY_PROMPT_VERSION
+    db.session.commit()
+    return short_summary, long_summary
 
-from openai import OpenAI
 
 @main.route('/api/sessions/<int:session_id>/summarize', methods=['POST'])
 def summarize_session(session_id):
@@ -1564,87 +2719,460 @@ def summarize_session(session_id):
     if not session or not session.transcription:
         return jsonify({'status': 'error', 'message': 'Session not found or transcription is missing'}), 404
 
-    transcription_text = session.transcription
+    try:
+        # Concurrent requests for the same session share one summarization run
+        short_summary, long_summary = singleflight.run(
+            f"session:{session_id}:summaries",
+            lambda: list(generate_summaries(session)),
+            wait_timeout=REQUEST_FLIGHT_WAIT_SECONDS
+        )
+    except singleflight.FlightError as e:
+        return jsonify({'status': 'error', 'message': e.message}), e.status_code
+    except singleflight.FlightTimeout:
+        return flight_pending_response(session_id)
 
-    # Short summary prompt
-    short_summary_prompt = f"""
-    Summarize the core topics in a maximum of 5 bullet points. Sentences should be short and capture only the core ideas.
+    return jsonify({
+        'status': 'success',
+        'short_summary': short_summary,
+        'long_summary': long_summary
+    }), 200
 
-    Use HTML for formatting:
-    <strong>This meeting was about:</strong>
-    <ul>
-        <li>.......</li>
-        <li>.......</li>
-        <li>.......</li>
-    </ul>
 
-    <strong>Action points:</strong>
-    <ul>
-        <li>.......</li>
-        <li>.......</li>
-        <li>.......</li>
-    </ul>
+
+def generate_session_insights(session):
     """
+    Generates both summaries and the action items of a session in a single model call.
 
-    # Long summary prompt
-    long_summary_prompt = f"""
-    Summarize the meeting in detail, including sections and action points.
+    The summaries and the replaced action items are written in one transaction.
 
-    Use HTML for formatting:
-    <strong>Summary of this meeting:</strong>
+    Args:
+        session (MeetingSession): The session to process; must have a transcription.
 
-    <strong>Relevant topic:</strong>
-    <ul>
-        <li>.......</li>
-        <li>.......</li>
-        <li>.......</li>
-    </ul>
+    Returns:
+        tuple: (short_summary, long_summary, list of new ActionItem objects).
 
-    <strong>Action points:</strong>
-    <ul>
-        <li>.......</li>
-        <li>.......</li>
-        <li>.......</li>
-    </ul>
+    Raises:
+        ProcessingError: If the model returned no usable result.
     """
+    transcript_plan = transcript_budget.plan(session.transcription, INSIGHTS_MODEL, structured=True)
+
+    def compute_insights():
+        response = openai_client.chat_completion(
+            'insights',
+            model=transcript_plan.model,
+            messages=[
+                {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+                {"role": "user", "content": condense_transcript(session.id, transcript_plan)}
+            ],
+            response_format={
+                "type": "json_schema",
+                "json_schema": INSIGHTS_SCHEMA
+            }
+        )
+        record_token_usage(session.id, response.usage)
+        return response.choices[0].message.content
+
+    response_content = llm_cache.cached(
+        'insights',
+        transcript_plan.text,
+        model=transcript_plan.model,
+        prompt=INSIGHTS_SYSTEM_PROMPT,
+        prompt_version=INSIGHTS_PROMPT_VERSION,
+        compute=compute_insights,
+        schema=INSIGHTS_SCHEMA
+    )
 
+    insights = json.loads(response_content)
+    short_summary = insights.get('short_summary')
+    long_summary = insights.get('long_summary')
+    if not short_summary or not long_summary:
+        logger.error(f"Incomplete insights returned for session {session.id}")
+        raise ProcessingError('No summaries found', 500)
 
-    client = OpenAI()
+    try:
+        session.short_summary = short_summary
+        session.long_summary = long_summary
+        session.summary_prompt_version = INSIGHTS_PROMPT_VERSION
+        session.action_points_prompt_version = INSIGHTS_PROMPT_VERSION
+        new_action_items = store_action_items(session, insights.get('action_items', []))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
 
-    # Short summary API call
-    short_summary_response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": short_summary_prompt + transcription_text}
-        ]
-    )
+    logger.info(f"Insights saved successfully for session_id: {session.id}")
+    return short_summary, long_summary, new_action_items
 
-    # Long summary API call
-    long_summary_response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": long_summary_prompt + transcription_text}
-        ]
-    )
 
-    # Extract summaries from responses correctly
-    short_summary = short_summary_response.choices[0].message.content
-    long_summary = long_summary_response.choices[0].message.content
+def run_session_insights(session_id, wait_timeout=singleflight.WAIT_TIMEOUT_SECONDS):
+    """
+    Runs generate_session_insights once for all concurrent callers of a session.
 
-    # Save summaries to the session
-    session.short_summary = short_summary
-    session.long_summary = long_summary
+    Args:
+        session_id (int): The session to process.
+        wait_timeout (float): Seconds to wait for a run another caller started.
+
+    Returns:
+        dict: The summaries and the serialized action items.
+
+    Raises:
+        singleflight.FlightTimeout: If another caller's run did not finish within wait_timeout.
+    """
+    def run_insights():
+        short_summary, long_summary, action_items = generate_session_insights(MeetingSession.query.get(session_id))
+        return {
+            'short_summary': short_summary,
+            'long_summary': long_summary,
+            'action_items': [item.to_dict() for item in action_items]
+        }
+
+    # Concurrent requests (and the post-recording workflow) share one insights run per session
+    return singleflight.run(f"session:{session_id}:insights", run_insights, wait_timeout=wait_timeout)
+
+
+def update_series_summary(session_id):
+    """
+    Folds a session's summary and action items into its meeting's running series summary.
+
+    Only sessions of recurring meetings are folded, and each session only once.
+
+    Args:
+        session_id (int): The session to fold in; must have been summarized.
+
+    Returns:
+        bool: True if the series summary was updated.
+    """
+    session = MeetingSession.query.get(session_id)
+    if not session or not session.meeting or not session.meeting.is_recurring or session.in_series_summary:
+        return False
+    if not session.short_summary:
+        raise ProcessingError('Session has no summary to add to the series summary', 400)
+
+    # Claim the session under a short lock on the meeting; the LLM call runs without it
+    lock_series_meeting(session)
+    claimed_at = session.series_folding_at
+    if session.in_series_summary or (claimed_at and claimed_at > datetime.utcnow() - SERIES_FOLD_CLAIM_TIMEOUT):
+        db.session.rollback()
+        return False
+    session.series_folding_at = datetime.utcnow()
     db.session.commit()
 
+    try:
+        action_items = ActionItem.query.filter_by(meeting_session_id=session_id).order_by(ActionItem.sorting_id).all()
+        session_digest = (
+            f"Session: {session.name} ({session.session_datetime.strftime('%Y-%m-%d')})\n"
+            f"Summary:\n{session.short_summary}\n"
+            "Action points:\n" + "\n".join(f"- {item.title} ({item.assigned_to or 'Unassigned'})" for item in action_items)
+        )
+
+        for _ in range(SERIES_FOLD_ATTEMPTS):
+            series_summary, series_session_count = db.session.execute(
+                select(Meeting.series_summary, Meeting.series_session_count).where(Meeting.id == session.meeting_id)
+            ).one()
+            db.session.commit()
+
+            response = openai_client.chat_completion(
+                'series_summary',
+                model=SERIES_SUMMARY_MODEL,
+                messages=[
+                    {"role": "system", "content": SERIES_SUMMARY_PROMPT},
+                    {"role": "user", "content": f"Current running summary:\n{series_summary or ''}\n\nNewest session:\n{session_digest}"}
+                ]
+            )
+            record_token_usage(session_id, response.usage)
+            db.session.commit()
+
+            # Apply only if no other session was folded in since the running summary was read
+            meeting = lock_series_meeting(session)
+            if session.in_series_summary:
+                # A worker that took over an expired claim got there first
+                db.session.rollback()
+                return False
+            if meeting.series_session_count != series_session_count:
+                db.session.rollback()
+                continue
+
+            meeting.series_summary = response.choices[0].message.content
+            meeting.series_session_count = series_session_count + 1
+            meeting.series_summary_updated_at = datetime.utcnow()
+            session.in_series_summary = True
+            session.series_folding_at = None
+            db.session.commit()
+            logger.info(f"Series summary of meeting {meeting.id} updated with session {session_id}")
+            return True
+
+        raise ProcessingError('Series summary kept changing while folding in the session', 409)
+    except Exception:
+        # Release the claim so a retry can fold the session
+        db.session.rollback()
+        db.session.execute(
+            update(MeetingSession).where(MeetingSession.id == session_id).values(series_folding_at=None)
+        )
+        db.session.commit()
+        raise
+
+
+def lock_series_meeting(session):
+    """Locks the row of a session's meeting and reloads the session under the lock."""
+    meeting = (
+        Meeting.query.filter_by(id=session.meeting_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    db.session.refresh(session)
+    return meeting
+
+
+@main.route('/api/meetings/<int:meeting_id>/series_summary', methods=['GET'])
+@login_required
+def get_series_summary(meeting_id):
+    meeting = Meeting.query.get(meeting_id)
+    if not meeting:
+        return jsonify({'status': 'error', 'message': 'Meeting not found'}), 404
+
     return jsonify({
         'status': 'success',
-        'short_summary': session.short_summary,
-        'long_summary': session.long_summary
+        'series_summary': meeting.series_summary,
+        'session_count': meeting.series_session_count,
+        'updated_at': meeting.series_summary_updated_at.isoformat() if meeting.series_summary_updated_at else None
     }), 200
 
 
+@main.route('/api/sessions/<int:session_id>/insights', methods=['POST'])
+@login_required
+def session_insights(session_id):
+    session = MeetingSession.query.get(session_id)
+    if not session or not session.transcription:
+        return jsonify({'status': 'error', 'message': 'Session not found or transcription is missing'}), 404
+
+    try:
+        insights = run_session_insights(session_id, wait_timeout=REQUEST_FLIGHT_WAIT_SECONDS)
+    except (ProcessingError, singleflight.FlightError) as e:
+        return jsonify({'status': 'error', 'message': e.message}), e.status_code
+    except singleflight.FlightTimeout:
+        return flight_pending_response(session_id)
+    except Exception as e:
+        logger.error(f"Error generating insights for session {session_id}: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error generating insights'}), 500
+
+    return jsonify({'status': 'success', **insights}), 200
+
+
+# Summary kinds that can be streamed: (operation, prompt); the operation also names the MeetingSession column
+SUMMARY_KINDS = {
+    'short': ('short_summary', SHORT_SUMMARY_PROMPT),
+    'long': ('long_summary', LONG_SUMMARY_PROMPT),
+}
+
+
+def sse_event(event, data):
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@main.route('/api/sessions/<int:session_id>/summarize/stream', methods=['GET'])
+@login_required
+def stream_summary(session_id):
+    kind = request.args.get('kind', 'short')
+    if kind not in SUMMARY_KINDS:
+        return jsonify({'status': 'error', 'message': 'kind must be short or long'}), 400
+
+    session = MeetingSession.query.get(session_id)
+    if not session or not session.transcription:
+        return jsonify({'status': 'error', 'message': 'Session not found or transcription is missing'}), 404
+
+    operation, prompt = SUMMARY_KINDS[kind]
+    transcript_plan = transcript_budget.plan(session.transcription, SUMMARY_MODEL)
+    cache_key = llm_cache.make_key(operation, transcript_plan.text, transcript_plan.model, prompt, SUMMARY_PROMPT_VERSION)
+
+    def generate():
+        usage = []
+        summary = llm_cache.get(cache_key)
+        if summary is not None:
+            # Nothing to generate; send the cached text in one go
+            yield sse_event('token', {'text': summary})
+        else:
+            parts = []
+            try:
+                # For map-reduce plans the chunk notes are made first; only the final pass is streamed
+                for text in openai_client.stream_chat_completion(
+                    operation,
+                    on_usage=usage.append,
+                    model=transcript_plan.model,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant."},
+                        {"role": "user", "content": prompt + condense_transcript(session_id, transcript_plan)}
+                    ]
+                ):
+                    parts.append(text)
+                    yield sse_event('token', {'text': text})
+            except Exception as e:
+                logger.error(f"Error streaming {operation} for session {session_id}: {str(e)}")
+                yield sse_event('error', {'message': 'Error summarizing'})
+                return
+
+            summary = ''.join(parts)
+            llm_cache.store(cache_key, summary)
+
+        # Persist the final text once the stream has ended
+        stored_session = MeetingSession.query.get(session_id)
+        setattr(stored_session, operation, summary)
+        stored_session.summary_prompt_version = SUMMARY_PROMPT_VERSION
+        if usage:
+            record_token_usage(session_id, usage[0])
+        db.session.commit()
+        yield sse_event('done', {operation: summary})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let proxies buffer the token stream
+    return response
+
+
+# Batch API backfill: regenerate summaries or action items of historical sessions
+# after a prompt or schema change (see batch_backfill.py and `flask backfill`).
+BACKFILL_POLL_SECONDS = 300
+
+
+def build_summary_batch_requests(session):
+    # Batches have no map step, so even long transcripts are sent compressed in one request
+    transcript_plan = transcript_budget.plan(session.transcription, SUMMARY_MODEL)
+    return {
+        operation: {
+            "model": transcript_plan.model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": prompt + transcript_plan.text}
+            ]
+        }
+        for operation, prompt in SUMMARY_KINDS.values()
+    }
+
+
+def apply_summary_batch_results(sessions_results, prompt_version):
+    if not sessions_results:
+        return 0
+
+    # Bulk UPDATEs by primary key for the whole chunk: the summaries live in meeting_session_body
+    # (every selected session has one, it holds the transcription), the version on the session
+    db.session.execute(update(MeetingSessionBody), [
+        {
+            'meeting_session_id': session.id,
+            'short_summary': results['short_summary'],
+            'long_summary': results['long_summary']
+        }
+        for session, results in sessions_results
+    ])
+    db.session.execute(update(MeetingSession), [
+        {'id': session.id, 'summary_prompt_version': prompt_version}
+        for session, results in sessions_results
+    ])
+    for session, results in sessions_results:
+        transcript_plan = transcript_budget.plan(session.transcription, SUMMARY_MODEL)
+        for operation, prompt in SUMMARY_KINDS.values():
+            llm_cache.store(
+                llm_cache.make_key(operation, transcript_plan.text, transcript_plan.model, prompt, prompt_version),
+                results[operation]
+            )
+    return len(sessions_results)
+
+
+def build_action_points_batch_requests(session):
+    transcript_plan = transcript_budget.plan(session.transcription, ACTION_POINTS_MODEL, structured=True)
+    return {
+        'action_points': {
+            "model": transcript_plan.model,
+            "messages": [
+                {"role": "system", "content": ACTION_POINTS_SYSTEM_PROMPT},
+                {"role": "user", "content": transcript_plan.text}
+            ],
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": ACTION_ITEM_SCHEMA
+            }
+        }
+    }
+
+
+def apply_action_points_batch_results(sessions_results, prompt_version):
+    written = 0
+    for session, results in sessions_results:
+        try:
+            # A savepoint per session so one malformed response doesn't discard the chunk
+            with db.session.begin_nested():
+                store_action_items(session, json.loads(results['action_points']).get('action_items', []))
+                session.action_points_prompt_version = prompt_version
+        except (ProcessingError, ValueError) as e:
+            logger.warning(f"Skipping backfilled action points of session {session.id}: {str(e)}")
+            continue
+
+        transcript_plan = transcript_budget.plan(session.transcription, ACTION_POINTS_MODEL, structured=True)
+        llm_cache.store(
+            llm_cache.make_key(
+                'action_points', transcript_plan.text, transcript_plan.model,
+                ACTION_POINTS_SYSTEM_PROMPT, prompt_version, schema=ACTION_ITEM_SCHEMA
+            ),
+            results['action_points']
+        )
+        written += 1
+    return written
+
+
+batch_backfill.register_kind(
+    'summaries', SUMMARY_PROMPT_VERSION, 'summary_prompt_version',
+    build_summary_batch_requests, apply_summary_batch_results
+)
+batch_backfill.register_kind(
+    'action_points', ACTION_POINTS_PROMPT_VERSION, 'action_points_prompt_version',
+    build_action_points_batch_requests, apply_action_points_batch_results
+)
+
+
+@celery_app.task
+def run_backfill_job(job_id):
+    with task_app_context():
+        # Only one worker advances a job at a time; a concurrent run just leaves it to the other
+        lock_key = f"backfill:{job_id}:lock"
+        if not get_redis().set(lock_key, 1, nx=True, ex=3600):
+            current_app.logger.info(f"Backfill job {job_id} is already being advanced")
+            return
+
+        try:
+            status = batch_backfill.advance_job(job_id)
+        finally:
+            get_redis().delete(lock_key)
+
+        current_app.logger.info(f"Backfill job {job_id} is {status}")
+        if status == 'running':
+            run_backfill_job.apply_async((job_id,), countdown=BACKFILL_POLL_SECONDS)
+
+
+@celery_app.task
+def compact_usage_rollups(days=usage_rollups.COMPACT_DAYS):
+    # Scheduled nightly by Celery beat (celery_factory.py)
+    with task_app_context():
+        usage_rollups.compact_recent(days)
+
+
+@celery_app.task
+def maintain_recording_partitions():
+    # Scheduled daily by Celery beat (celery_factory.py)
+    with task_app_context():
+        names = recording_partitions.ensure_partitions()
+        current_app.logger.info(f"Recording partitions ensured: {', '.join(names)}")
+
+
+@celery_app.task
+def archive_recording_partitions():
+    # Scheduled monthly by Celery beat: cold storage for the media of old partitions, then detach them
+    with task_app_context():
+        for name in recording_partitions.archivable_partitions():
+            if storage_client is not None:
+                moved = sum(archive_recording_media(recording_id) for recording_id in recording_partitions.recording_ids(name))
+                current_app.logger.info(f"Moved {moved} media files of {name} to {ARCHIVE_STORAGE_CLASS}")
+            recording_partitions.detach_partition(name)
+
 
 @main.route('/api/sessions/<int:session_id>/action_points', methods=['POST'])
 @login_required
@@ -1659,6 +3187,7 @@ def add_action_point(session_id):
     action_item = ActionItem(
         title=title,
         meeting_session_id=session_id,
+        meeting_hub_id=session_hub_id(session_id),
         description='',
         assigned_to='',
         sorting_id=1,  # Adjust this accordingly
@@ -1707,26 +3236,6 @@ def get_summaries(session_id):
     }), 200
 
 
-@main.route('/api/action_item/<int:id>/complete', methods=['PUT'])
-def update_action_item_status(action_item_id):
-    data = request.get_json()
-    completed = data.get('completed')
-
-    # Fetch the action item by ID
-    action_item = ActionItem.query.get(action_item_id)
-    if not action_item:
-        return jsonify({'status': 'error', 'message': 'Action item not found'}), 404
-
-    # Update the completion status
-    action_item.completed = completed
-
-    try:
-        db.session.commit()
-        return jsonify({'status': 'success', 'message': 'Action item updated successfully'}), 200
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
 @main.route('/api/sessions', methods=['POST'])
 def create_session():
     try:
@@ -1747,11 +3256,14 @@ def create_session():
         new_session = MeetingSession(
             name=f'Session for {meeting.name}',  # Example naming convention
             session_datetime=datetime.utcnow(),
-            meeting_id=meeting_id
+            meeting_id=meeting_id,
+            meeting_hub_id=meeting.meeting_hub_id
         )
 
         # Add the new session to the database
         db.session.add(new_session)
+        db.session.flush()
+        usage_rollups.increment_for_session(new_session.id, sessions=1)
         db.session.commit()
 
         # Return the created session ID
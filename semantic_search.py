@@ -0,0 +1,383 @@
+# minutememo_app/semantic_search.py
+"""
+Semantic search over meeting transcripts.
+
+Transcripts are split into segments that are embedded in batches when the
+transcript is saved and stored as float32 bytes on TranscriptSegment. Search
+runs against a per-hub in-memory index: a brute-force NumPy dot product for
+normal hubs and an HNSW graph (when hnswlib is installed) for very large ones.
+Re-indexing a transcript logs the session in Redis; cached hub indexes then
+swap in just that session's segments instead of reloading the whole hub.
+
+The embedding provider is chosen with EMBEDDING_PROVIDER: 'openai' (default)
+or 'local', a deterministic feature-hashing stub that needs no network access.
+"""
+import base64
+import hashlib
+import logging
+import os
+import re
+import threading
+
+import numpy as np
+import redis
+from cachetools import LRUCache
+
+import llm_cache
+import openai_client
+from extensions import db, get_redis
+from models import TranscriptSegment, MeetingSession
+
+try:
+    import hnswlib
+except ImportError:  # Optional; large hubs fall back to brute force
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_TARGET_WORDS = 80
+EMBEDDING_BATCH_SIZE = 64
+ANN_MIN_SEGMENTS = int(os.getenv('SEMANTIC_ANN_MIN_SEGMENTS', 20000))
+INDEX_VERSION_PREFIX = 'semantic-index'
+# Re-indexed sessions kept in the change log; indexes further behind are reloaded
+INDEX_CHANGES_KEPT = 1000
+
+_hub_indexes = LRUCache(maxsize=int(os.getenv('SEMANTIC_INDEX_CACHE_SIZE', 32)))
+_hub_indexes_lock = threading.Lock()
+
+
+class OpenAIEmbeddingProvider:
+    """Embeds text with the OpenAI embeddings API through the shared client."""
+
+    model = 'text-embedding-3-small'
+    dimensions = 512
+
+    @property
+    def name(self):
+        return f"{self.model}@{self.dimensions}"
+
+    def embed(self, texts):
+        response = openai_client.call(
+            'embeddings',
+            lambda client, timeout: client.embeddings.create(
+                model=self.model,
+                input=texts,
+                dimensions=self.dimensions,
+                timeout=timeout
+            ),
+            model=self.model,
+            estimated_tokens=sum(len(text) for text in texts) // 4,
+        )
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+
+
+class HashingEmbeddingProvider:
+    """Local stand-in for development and tests: hashed bag-of-words vectors."""
+
+    dimensions = 256
+
+    @property
+    def name(self):
+        return f"local-hash@{self.dimensions}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r'\w+', text.lower()):
+                digest = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+                vectors[row, digest % self.dimensions] += 1.0 if digest & (1 << 63) else -1.0
+        return vectors
+
+
+PROVIDERS = {
+    'openai': OpenAIEmbeddingProvider,
+    'local': HashingEmbeddingProvider,
+}
+
+_provider = None
+
+
+def get_provider():
+    """Returns the configured embedding provider."""
+    global _provider
+    if _provider is None:
+        _provider = PROVIDERS[os.getenv('EMBEDDING_PROVIDER', 'openai')]()
+    return _provider
+
+
+def split_segments(text, target_words=SEGMENT_TARGET_WORDS):
+    """Splits a transcript into segments of roughly target_words words along sentence boundaries."""
+    segments = []
+    current = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text or ''):
+        words = sentence.split()
+        while len(words) > 2 * target_words:
+            # Unpunctuated stretches are cut into fixed-size pieces
+            segments.append(' '.join(current + words[:target_words]))
+            current, words = [], words[target_words:]
+        current.extend(words)
+        if len(current) >= target_words:
+            segments.append(' '.join(current))
+            current = []
+    if current:
+        segments.append(' '.join(current))
+    return segments
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def embed_texts(texts):
+    """
+    Embeds texts in batches, reusing cached embeddings of identical texts.
+
+    Returns:
+        np.ndarray: One L2-normalized float32 row per text.
+    """
+    provider = get_provider()
+    vectors = [None] * len(texts)
+    missing = []
+    for i, text in enumerate(texts):
+        cached = llm_cache.get(_embedding_cache_key(provider, text))
+        if cached is not None:
+            vectors[i] = np.frombuffer(base64.b64decode(cached), dtype=np.float32)
+        else:
+            missing.append(i)
+
+    for start in range(0, len(missing), EMBEDDING_BATCH_SIZE):
+        batch = missing[start:start + EMBEDDING_BATCH_SIZE]
+        embedded = _normalize(provider.embed([texts[i] for i in batch]))
+        for i, vector in zip(batch, embedded):
+            vectors[i] = vector
+            llm_cache.store(_embedding_cache_key(provider, texts[i]), base64.b64encode(vector.tobytes()).decode('ascii'))
+
+    if not vectors:
+        return np.zeros((0, provider.dimensions), dtype=np.float32)
+    return np.vstack(vectors).astype(np.float32)
+
+
+def _embedding_cache_key(provider, text):
+    return f"{llm_cache.CACHE_PREFIX}:embedding:{provider.name}:{llm_cache.content_hash(text)}"
+
+
+def index_session_transcript(session_id):
+    """
+    (Re)builds the embedded segments of a session's transcript.
+
+    Args:
+        session_id (int): The session whose transcription was saved.
+
+    Returns:
+        int: The number of stored segments.
+    """
+    session = MeetingSession.query.get(session_id)
+    if not session:
+        return 0
+
+    hub_id = session.meeting_hub_id
+    texts = split_segments(session.transcription)
+    vectors = embed_texts(texts)
+    provider = get_provider()
+
+    TranscriptSegment.query.filter_by(meeting_session_id=session_id).delete(synchronize_session=False)
+    db.session.add_all([
+        TranscriptSegment(
+            meeting_session_id=session_id,
+            meeting_hub_id=hub_id,
+            position=position,
+            text=text,
+            embedding=vector.tobytes(),
+            embedding_model=provider.name
+        )
+        for position, (text, vector) in enumerate(zip(texts, vectors))
+    ])
+    db.session.commit()
+
+    if hub_id is not None:
+        _record_index_change(hub_id, session_id)
+    logger.info(f"Indexed {len(texts)} transcript segments for session {session_id}")
+    return len(texts)
+
+
+def _index_version_key(hub_id):
+    return f"{INDEX_VERSION_PREFIX}:{hub_id}:version"
+
+
+def _index_changes_key(hub_id):
+    return f"{INDEX_VERSION_PREFIX}:{hub_id}:changes"
+
+
+def _record_index_change(hub_id, session_id):
+    """Logs a re-indexed session; the version counts every change ever logged."""
+    try:
+        pipeline = get_redis().pipeline(transaction=True)
+        pipeline.rpush(_index_changes_key(hub_id), session_id)
+        pipeline.ltrim(_index_changes_key(hub_id), -INDEX_CHANGES_KEPT, -1)
+        pipeline.incr(_index_version_key(hub_id))
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Could not invalidate semantic index of hub {hub_id}: {str(e)}")
+
+
+def _index_changes(hub_id):
+    """Returns the hub's index version and the latest re-indexed sessions (oldest first), or (None, [])."""
+    try:
+        pipeline = get_redis().pipeline(transaction=True)
+        pipeline.get(_index_version_key(hub_id))
+        pipeline.lrange(_index_changes_key(hub_id), 0, -1)
+        version, changes = pipeline.execute()
+    except redis.RedisError:
+        return None, []
+    return int(version or 0), [int(session_id) for session_id in changes]
+
+
+def _load_segments(hub_id, *criteria):
+    """Returns the segment ids, session ids and embedding matrix of a hub's segments matching criteria."""
+    rows = (
+        db.session.query(TranscriptSegment.id, TranscriptSegment.meeting_session_id, TranscriptSegment.embedding)
+        .filter(
+            TranscriptSegment.meeting_hub_id == hub_id,
+            TranscriptSegment.embedding_model == get_provider().name,
+            *criteria
+        )
+        .all()
+    )
+    if not rows:
+        return (
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+            np.zeros((0, get_provider().dimensions), dtype=np.float32)
+        )
+    return (
+        np.array([row.id for row in rows], dtype=np.int64),
+        np.array([row.meeting_session_id for row in rows], dtype=np.int64),
+        np.vstack([np.frombuffer(row.embedding, dtype=np.float32) for row in rows])
+    )
+
+
+class HubIndex:
+    """
+    In-memory vector index over the transcript segments of one hub.
+
+    Instances are not modified once built; updated() returns a new index.
+    The HNSW graph is the exception: it is updated in place and shared with
+    the new index, which is safe because hnswlib locks around its updates.
+    """
+
+    def __init__(self, segment_ids, session_ids, matrix, ann=None):
+        self.segment_ids = segment_ids
+        self.session_ids = session_ids
+        self.matrix = matrix
+        self.ann = ann
+        if ann is None and hnswlib is not None and len(segment_ids) >= ANN_MIN_SEGMENTS:
+            # Labels are the segment ids, so segments can be replaced without renumbering
+            self.ann = hnswlib.Index(space='ip', dim=matrix.shape[1])
+            self.ann.init_index(max_elements=len(segment_ids), ef_construction=200, M=16)
+            self.ann.add_items(matrix, segment_ids)
+            self.ann.set_ef(64)
+
+    @classmethod
+    def load(cls, hub_id):
+        return cls(*_load_segments(hub_id))
+
+    def updated(self, hub_id, session_ids):
+        """Returns the index with the segments of the given sessions replaced by their stored ones."""
+        session_ids = list(session_ids)
+        new_segment_ids, new_session_ids, new_matrix = _load_segments(
+            hub_id, TranscriptSegment.meeting_session_id.in_(session_ids)
+        )
+        stale = np.isin(self.session_ids, session_ids)
+
+        if self.ann is not None:
+            for label in self.segment_ids[stale]:
+                self.ann.mark_deleted(int(label))
+            if len(new_segment_ids):
+                needed = self.ann.get_current_count() + len(new_segment_ids)
+                if needed > self.ann.get_max_elements():
+                    self.ann.resize_index(max(needed, 2 * self.ann.get_max_elements()))
+                self.ann.add_items(new_matrix, new_segment_ids)
+
+        return HubIndex(
+            np.concatenate([self.segment_ids[~stale], new_segment_ids]),
+            np.concatenate([self.session_ids[~stale], new_session_ids]),
+            np.vstack([self.matrix[~stale], new_matrix]),
+            ann=self.ann
+        )
+
+    def search(self, query_vector, limit):
+        if len(self.segment_ids) == 0:
+            return []
+        limit = min(limit, len(self.segment_ids))
+        if self.ann is not None:
+            labels, distances = self.ann.knn_query(query_vector, k=limit)
+            return [(int(label), float(1 - d)) for label, d in zip(labels[0], distances[0])]
+
+        scores = self.matrix @ query_vector
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.segment_ids[i]), float(scores[i])) for i in top]
+
+
+def get_hub_index(hub_id):
+    """
+    Returns the hub's index, brought up to date with the transcripts re-indexed since it was built.
+
+    Only a hub that is not cached, or that fell further behind than the change
+    log reaches, is loaded in full.
+    """
+    version, changes = _index_changes(hub_id)
+    cached = _hub_indexes.get(hub_id)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+
+    with _hub_indexes_lock:
+        cached = _hub_indexes.get(hub_id)
+        if cached is not None and version is not None:
+            cached_version, index = cached
+            if cached_version == version:
+                return index
+            missed = version - cached_version if cached_version is not None else None
+            if missed is not None and 0 < missed <= len(changes):
+                index = index.updated(hub_id, set(changes[-missed:]))
+                _hub_indexes[hub_id] = (version, index)
+                return index
+
+        index = HubIndex.load(hub_id)
+        _hub_indexes[hub_id] = (version, index)
+        return index
+
+
+def search_hub(hub_id, query, limit=10):
+    """
+    Finds the transcript segments of a hub that are most similar to the query.
+
+    Returns:
+        list: Dicts with the segment text, its session and the similarity score.
+    """
+    query_vector = embed_texts([query])[0]
+    matches = get_hub_index(hub_id).search(query_vector, limit)
+    if not matches:
+        return []
+
+    scores = dict(matches)
+    rows = (
+        db.session.query(TranscriptSegment, MeetingSession.name, MeetingSession.session_datetime)
+        .join(MeetingSession, MeetingSession.id == TranscriptSegment.meeting_session_id)
+        .filter(TranscriptSegment.id.in_(scores.keys()))
+        .all()
+    )
+    results = [
+        {
+            'segment_id': segment.id,
+            'session_id': segment.meeting_session_id,
+            'session_name': session_name,
+            'session_datetime': session_datetime.isoformat(),
+            'position': segment.position,
+            'text': segment.text,
+            'score': round(scores[segment.id], 4)
+        }
+        for segment, session_name, session_datetime in rows
+    ]
+    return sorted(results, key=lambda result: result['score'], reverse=True)
@@ -0,0 +1,131 @@
+# minutememo_app/singleflight.py
+"""
+Single-flight execution of expensive operations across processes.
+
+The first caller for a key becomes the leader and runs the operation while
+holding a Redis lock; callers arriving in the meantime wait for the leader's
+result instead of starting their own run. Results are shared as JSON, so the
+operation must return something JSON-serializable.
+"""
+import json
+import logging
+import time
+import uuid
+
+import redis
+
+from extensions import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'singleflight'
+POLL_INTERVAL_SECONDS = 0.25
+LOCK_TTL_SECONDS = 900
+# Waiting suits background tasks; web requests pass a wait_timeout within the request timeout
+WAIT_TIMEOUT_SECONDS = 900
+
+# Delete the lock only if it still belongs to this flight
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class FlightError(Exception):
+    """Raised to waiting callers when the leader's run failed."""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+class FlightTimeout(Exception):
+    """Raised when a waiting caller gives up on the in-flight run."""
+
+
+def _lock_key(key):
+    return f"{KEY_PREFIX}:{key}:lock"
+
+
+def _result_key(key, flight_id):
+    return f"{KEY_PREFIX}:{key}:result:{flight_id}"
+
+
+def run(key, fn, lock_ttl=LOCK_TTL_SECONDS, wait_timeout=WAIT_TIMEOUT_SECONDS, result_ttl=60):
+    """
+    Runs fn() at most once at a time per key and shares its result with concurrent callers.
+
+    Args:
+        key (str): Identifies the operation, e.g. 'session:12:transcription'.
+        fn (callable): The operation; must return a JSON-serializable value.
+        lock_ttl (int): Seconds after which a crashed leader's lock expires.
+        wait_timeout (float): Seconds a waiting caller waits for the result.
+        result_ttl (int): Seconds the result stays available to late waiters.
+
+    Returns:
+        The value returned by fn(), either from this call or from the leader.
+
+    Raises:
+        FlightError: In waiting callers, if the leader's run failed.
+        FlightTimeout: If no result arrived within wait_timeout.
+        Any exception raised by fn() in the leader.
+    """
+    try:
+        client = get_redis()
+        client.ping()
+    except redis.RedisError as e:
+        logger.warning(f"Single-flight unavailable for {key}, running without coalescing: {str(e)}")
+        return fn()
+
+    lock_key = _lock_key(key)
+    expires = time.monotonic() + wait_timeout
+
+    while True:
+        flight_id = uuid.uuid4().hex
+        if client.set(lock_key, flight_id, nx=True, ex=lock_ttl):
+            return _lead(client, key, flight_id, fn, result_ttl)
+
+        leader_flight = client.get(lock_key)
+        if leader_flight is None:
+            continue  # The leader just finished; try to take the lock again
+        leader_flight = leader_flight.decode()
+        logger.info(f"Joining in-flight {key} ({leader_flight})")
+
+        while time.monotonic() < expires:
+            payload = client.get(_result_key(key, leader_flight))
+            if payload is not None:
+                result = json.loads(payload)
+                if 'error' in result:
+                    raise FlightError(result['error'], result.get('status_code', 500))
+                return result['value']
+
+            current_flight = client.get(lock_key)
+            if current_flight is None or current_flight.decode() != leader_flight:
+                # The leader went away without publishing a result (e.g. it crashed); start over
+                if client.get(_result_key(key, leader_flight)) is None:
+                    break
+                continue
+            time.sleep(POLL_INTERVAL_SECONDS)
+        else:
+            raise FlightTimeout(f"Timed out waiting for in-flight {key}")
+
+
+def _lead(client, key, flight_id, fn, result_ttl):
+    result_key = _result_key(key, flight_id)
+    try:
+        value = fn()
+    except Exception as e:
+        payload = {
+            'error': getattr(e, 'message', str(e)),
+            'status_code': getattr(e, 'status_code', 500),
+        }
+        client.set(result_key, json.dumps(payload), ex=result_ttl)
+        raise
+    else:
+        client.set(result_key, json.dumps({'value': value}), ex=result_ttl)
+        return value
+    finally:
+        client.eval(_RELEASE_SCRIPT, 1, _lock_key(key), flight_id)
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_user, current_user, login_required
 from models import User  # Adjust based on your models location
+import openai_client
+import rate_governor
+import usage_rollups
+from datetime import date, datetime, timedelta
 
 # Define the blueprint for the super admin section
 super_admin_bp = Blueprint('super_admin', __name__, url_prefix='/superadmin')
@@ -34,5 +38,45 @@ def super_admin_dashboard():
     if current_user.internal_user_role != 'super_admin':
         return jsonify({"message": "You do not have the required access"}), 403  # Forbidden access for non-super_admins
 
-    # Super admin access confirmed, return dashboard data
-    return jsonify({"message": "Welcome to the Super Admin Dashboard"}), 200
\ No newline at end of file
+    # Super admin access confirmed, return dashboard data with usage from the daily rollups
+    today = datetime.utcnow().date()
+    return jsonify({
+        "message": "Welcome to the Super Admin Dashboard",
+        "usage": {
+            "today": usage_rollups.totals(today, today),
+            "last_30_days": usage_rollups.totals(today - timedelta(days=29), today)
+        }
+    }), 200
+
+# Daily usage of one company, for billing
+@super_admin_bp.route('/companies/<int:company_id>/usage', methods=['GET'])
+@login_required
+def company_usage(company_id):
+    if current_user.internal_user_role != 'super_admin':
+        return jsonify({"message": "You do not have the required access"}), 403
+
+    try:
+        until = date.fromisoformat(request.args['until']) if 'until' in request.args else datetime.utcnow().date()
+        since = date.fromisoformat(request.args['since']) if 'since' in request.args else until - timedelta(days=29)
+    except ValueError:
+        return jsonify({"message": "since and until must be ISO dates (YYYY-MM-DD)"}), 400
+    if since > until:
+        return jsonify({"message": "since must not be after until"}), 400
+
+    return jsonify({
+        "company_id": company_id,
+        "totals": usage_rollups.totals(since, until, company_id=company_id),
+        "days": [rollup.to_dict() for rollup in usage_rollups.daily(company_id, since, until)]
+    }), 200
+
+# OpenAI rate budget utilization across all processes, plus this process's call metrics
+@super_admin_bp.route('/openai-usage', methods=['GET'])
+@login_required
+def openai_usage():
+    if current_user.internal_user_role != 'super_admin':
+        return jsonify({"message": "You do not have the required access"}), 403
+
+    return jsonify({
+        "utilization": rate_governor.get_utilization(),
+        "process_metrics": openai_client.get_metrics()
+    }), 200
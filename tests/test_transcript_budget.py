@@ -0,0 +1,42 @@
+import transcript_budget
+from transcript_budget import compress
+
+
+def test_dutch_er_is_kept():
+    assert compress("Er zijn drie punten op de agenda.") == "Er zijn drie punten op de agenda."
+    assert compress("Jan, kun je er naar kijken?") == "Jan, kun je er naar kijken?"
+
+
+def test_grammatical_repeated_words_are_kept():
+    assert compress("Ik denk dat dat klopt.") == "Ik denk dat dat klopt."
+    assert compress("De mensen die die auto kochten waren tevreden.") == "De mensen die die auto kochten waren tevreden."
+
+
+def test_units_are_kept():
+    assert compress("De plaat is 5 mm dik.") == "De plaat is 5 mm dik."
+
+
+def test_dutch_fillers_are_removed():
+    assert compress("Ehm, we moeten euh de begroting bespreken.") == "we moeten de begroting bespreken."
+    assert compress("Dat is, uhm, lastig.") == "Dat is lastig."
+
+
+def test_verbatim_repeated_sentences_are_dropped():
+    assert compress("Gaat het goed? Gaat het goed? Ja.") == "Gaat het goed? Ja."
+
+
+def test_compression_is_deterministic():
+    text = "Uh, goedemorgen allemaal. Er is, ehm, een nieuw voorstel."
+    assert compress(text) == compress(text)
+
+
+def test_short_transcript_plan_keeps_text():
+    plan = transcript_budget.plan("Er zijn drie punten op de agenda.", 'gpt-4o-2024-08-06')
+    assert plan.text == "Er zijn drie punten op de agenda."
+    assert plan.chunks == [plan.text]
+
+
+def test_structured_calls_keep_the_configured_model():
+    transcript = "Er zijn drie punten op de agenda."
+    assert transcript_budget.plan(transcript, 'gpt-4o-2024-08-06').model == transcript_budget.SMALL_MODEL
+    assert transcript_budget.plan(transcript, 'gpt-4o-2024-08-06', structured=True).model == 'gpt-4o-2024-08-06'
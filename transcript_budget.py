@@ -0,0 +1,156 @@
+# minutememo_app/transcript_budget.py
+"""
+Token budgeting for transcripts sent to the LLM.
+
+Transcripts are compressed deterministically first: filler interjections are
+removed, sentences repeated verbatim are dropped and whitespace is normalized,
+so identical recordings always produce identical prompts (and hit the LLM
+cache). Meetings are transcribed in Dutch, so compression never touches real
+words: repeated words are kept because they are often grammatical ("Ik denk
+dat dat klopt"). The compressed transcript is then counted and planned: short
+transcripts go to the small model tier, very long ones are split into chunks
+for a map-reduce pass so no single call exceeds the context budget.
+Structured extraction (json_schema action points and insights) always stays on
+the configured model: the small model misses and misattributes action items
+noticeably more often, and those errors end up in stored rows, not prose.
+"""
+import logging
+import os
+import re
+from typing import List, NamedTuple
+
+try:
+    import tiktoken
+except ImportError:  # Optional; token counts fall back to a characters/4 estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SMALL_MODEL = 'gpt-4o-mini'
+SMALL_MODEL_MAX_TOKENS = int(os.getenv('LLM_SMALL_MODEL_MAX_TOKENS', 3000))
+MAP_REDUCE_MIN_TOKENS = int(os.getenv('LLM_MAP_REDUCE_MIN_TOKENS', 60000))
+CHUNK_TOKENS = int(os.getenv('LLM_CHUNK_TOKENS', 12000))
+
+# USD per million (input, output) tokens, for cost estimates in the logs
+PRICES = {
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o-2024-08-06': (2.50, 10.00),
+}
+
+# Interjections that carry no content and are not words in Dutch or English
+# ('er' and 'mm' are left alone: "Er zijn drie punten", "5 mm")
+FILLER_WORDS = ('uh', 'uhm', 'um', 'umm', 'uhh', 'erm', 'eh', 'ehm', 'euh', 'hmm', 'hm', 'mhm')
+_FILLER_RE = re.compile(r",?\s*(?<![\w'])(?:" + '|'.join(FILLER_WORDS) + r")(?![\w'])[,.]?", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+_encodings = {}
+
+
+class TranscriptPlan(NamedTuple):
+    text: str  # Compressed transcript
+    original_tokens: int
+    tokens: int  # Tokens of the compressed transcript
+    model: str
+    chunks: List[str]  # More than one chunk means a map-reduce pass
+
+    @property
+    def map_reduce(self):
+        return len(self.chunks) > 1
+
+
+def count_tokens(text, model=SMALL_MODEL):
+    """Counts the tokens of text for a model; estimates ~4 characters per token without tiktoken."""
+    if not text:
+        return 0
+    if tiktoken is None:
+        return len(text) // 4 + 1
+
+    encoding = _encodings.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding('o200k_base')
+        _encodings[model] = encoding
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def compress(text):
+    """
+    Removes disfluencies from a transcript without changing its content.
+
+    The result depends only on the input, so compressing the same transcript
+    twice gives the same text.
+    """
+    if not text:
+        return ''
+
+    text = _FILLER_RE.sub('', text)
+
+    # Drop sentences that repeat the previous one verbatim
+    sentences = []
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = ' '.join(sentence.split())
+        if sentence and (not sentences or sentence.lower() != sentences[-1].lower()):
+            sentences.append(sentence)
+    text = ' '.join(sentences)
+
+    # Tidy the punctuation left behind by removed words
+    text = re.sub(r'\s+([,.!?])', r'\1', text)
+    text = re.sub(r'([,.!?])(?:\s*,)+', r'\1', text)
+    return text.strip(' ,')
+
+
+def split_chunks(text, max_tokens=CHUNK_TOKENS, model=SMALL_MODEL):
+    """Splits text into chunks of at most max_tokens tokens along sentence boundaries."""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence in _SENTENCE_RE.split(text):
+        sentence_tokens = count_tokens(sentence, model)
+        if current and current_tokens + sentence_tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def estimate_cost(model, input_tokens, output_tokens=0):
+    """Returns the estimated USD cost of a call, or None for models without a known price."""
+    if model not in PRICES:
+        return None
+    input_price, output_price = PRICES[model]
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def plan(transcript, model, structured=False):
+    """
+    Compresses a transcript and decides how to send it to the LLM.
+
+    Args:
+        transcript (str): The raw transcript.
+        model (str): The model the operation normally uses.
+        structured (bool): Whether the call extracts structured data; those
+            keep the configured model even for short transcripts.
+
+    Returns:
+        TranscriptPlan: The compressed text, its token counts, the model tier
+        to use and the chunks for map-reduce (a single chunk otherwise).
+    """
+    original_tokens = count_tokens(transcript, model)
+    text = compress(transcript)
+    tokens = count_tokens(text, model)
+
+    if tokens <= SMALL_MODEL_MAX_TOKENS and not structured:
+        model = SMALL_MODEL
+    chunks = split_chunks(text, CHUNK_TOKENS, model) if tokens > MAP_REDUCE_MIN_TOKENS else [text]
+
+    cost = estimate_cost(model, tokens)
+    logger.info(
+        f"Transcript budget: {original_tokens} -> {tokens} tokens, model {model}, {len(chunks)} chunk(s)"
+        + (f", estimated input cost ${cost:.4f}" if cost is not None else '')
+    )
+    return TranscriptPlan(text, original_tokens, tokens, model, chunks)
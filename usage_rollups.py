@@ -0,0 +1,206 @@
+# minutememo_app/usage_rollups.py
+"""
+Usage per company and day, pre-aggregated for dashboards and billing.
+
+UsageRollup holds one row per company and UTC day with recorded seconds,
+sessions, transcriptions, LLM tokens and active users. The pipeline keeps it
+current with single-statement upserts that add deltas as events happen, so
+reading usage never scans recordings or sessions. Session metrics count
+towards the day of the session (session_datetime); active users count towards
+the day they recorded.
+
+Increments can drift (a failed request after the upsert, a session moved to
+another meeting), so a nightly job recomputes recent days from the source
+tables with compact(). Running it over a longer range backfills history:
+`flask usage compact --days 400`.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import Date, cast, delete, distinct, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from extensions import db
+from models import Meeting, MeetingHub, MeetingSession, MeetingSessionBody, Recording, UsageActiveUser, UsageRollup, User
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('recorded_seconds', 'sessions', 'transcriptions', 'llm_input_tokens', 'llm_output_tokens', 'active_users')
+COMPACT_DAYS = 3  # The nightly job recomputes this many days, ending yesterday
+
+
+def _upsert_increment(select_rows, counters):
+    """INSERT the selected (company_id, day, *counters) rows, adding to the counters of existing rows."""
+    statement = insert(UsageRollup).from_select(['company_id', 'day', *counters, 'updated_at'], select_rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[UsageRollup.company_id, UsageRollup.day],
+        set_={
+            **{counter: getattr(UsageRollup, counter) + getattr(statement.excluded, counter) for counter in counters},
+            'updated_at': statement.excluded.updated_at,
+        }
+    )
+    db.session.execute(statement)
+
+
+def increment_for_session(session_id, **deltas):
+    """
+    Adds deltas to the rollup of the company and day of a session; the caller commits.
+
+    Sessions that do not belong to a meeting (and so to no company) are not counted.
+    """
+    deltas = {counter: value for counter, value in deltas.items() if value}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown usage counters: {', '.join(sorted(unknown))}")
+
+    counters = list(deltas)
+    _upsert_increment(
+        select(
+            MeetingHub.company_id,
+            cast(MeetingSession.session_datetime, Date),
+            *(literal(int(round(deltas[counter]))) for counter in counters),
+            literal(datetime.utcnow())
+        )
+        .join(Meeting, Meeting.id == MeetingSession.meeting_id)
+        .join(MeetingHub, MeetingHub.id == Meeting.meeting_hub_id)
+        .where(MeetingSession.id == session_id),
+        counters
+    )
+
+
+def record_active_user(company_id, user_id, day=None):
+    """Counts a user as active for their company on a day (today by default), once; the caller commits."""
+    if company_id is None:
+        return
+    day = day or datetime.utcnow().date()
+    inserted = db.session.execute(
+        insert(UsageActiveUser)
+        .values(company_id=company_id, day=day, user_id=user_id)
+        .on_conflict_do_nothing()
+        .returning(UsageActiveUser.user_id)
+    ).first()
+    if inserted:
+        _upsert_increment(
+            select(literal(company_id), literal(day, Date), literal(1), literal(datetime.utcnow())),
+            ['active_users']
+        )
+
+
+def compact(day):
+    """Recomputes the rollups and active users of one day from the source tables; the caller commits."""
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+
+    db.session.execute(delete(UsageRollup).where(UsageRollup.day == day))
+    db.session.execute(delete(UsageActiveUser).where(UsageActiveUser.day == day))
+
+    db.session.execute(
+        insert(UsageRollup).from_select(
+            ['company_id', 'day', 'recorded_seconds', 'sessions', 'transcriptions',
+             'llm_input_tokens', 'llm_output_tokens', 'active_users', 'updated_at'],
+            select(
+                MeetingHub.company_id,
+                literal(day, Date),
+                cast(func.round(func.coalesce(func.sum(MeetingSession.audio_seconds), 0)), db.Integer),
+                func.count(MeetingSession.id),
+                func.count(MeetingSessionBody.transcription),
+                func.coalesce(func.sum(MeetingSession.llm_input_tokens), 0),
+                func.coalesce(func.sum(MeetingSession.llm_output_tokens), 0),
+                literal(0),
+                literal(datetime.utcnow())
+            )
+            .join(Meeting, Meeting.id == MeetingSession.meeting_id)
+            .join(MeetingHub, MeetingHub.id == Meeting.meeting_hub_id)
+            .outerjoin(MeetingSessionBody, MeetingSessionBody.meeting_session_id == MeetingSession.id)
+            .where(MeetingSession.session_datetime >= start, MeetingSession.session_datetime < end)
+            .group_by(MeetingHub.company_id)
+        )
+    )
+
+    db.session.execute(
+        insert(UsageActiveUser).from_select(
+            ['company_id', 'day', 'user_id'],
+            select(User.company_id, literal(day, Date), User.id)
+            .join(Recording, Recording.user_id == User.id)
+            .where(User.company_id.isnot(None), Recording.timestamp >= start, Recording.timestamp < end)
+            .distinct()
+        )
+    )
+    _upsert_increment(
+        select(UsageActiveUser.company_id, UsageActiveUser.day, func.count(), literal(datetime.utcnow()))
+        .where(UsageActiveUser.day == day)
+        .group_by(UsageActiveUser.company_id, UsageActiveUser.day),
+        ['active_users']
+    )
+
+
+def compact_recent(days=COMPACT_DAYS, until=None):
+    """Compacts the given number of days ending with until (yesterday by default), one transaction per day."""
+    until = until or datetime.utcnow().date() - timedelta(days=1)
+    for offset in range(days):
+        day = until - timedelta(days=offset)
+        try:
+            compact(day)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    logger.info(f"Compacted usage rollups for {days} day(s) up to {until.isoformat()}")
+
+
+def totals(since, until=None, company_id=None):
+    """
+    Sums the rollups of a date range (inclusive), for one company or all.
+
+    Active users are counted distinctly over the whole range, not summed per day.
+    """
+    until = until or datetime.utcnow().date()
+    filters = [UsageRollup.day >= since, UsageRollup.day <= until]
+    active_filters = [UsageActiveUser.day >= since, UsageActiveUser.day <= until]
+    if company_id is not None:
+        filters.append(UsageRollup.company_id == company_id)
+        active_filters.append(UsageActiveUser.company_id == company_id)
+
+    row = db.session.execute(
+        select(*(func.coalesce(func.sum(getattr(UsageRollup, counter)), 0) for counter in COUNTERS[:-1]))
+        .where(*filters)
+    ).one()
+    active_users = db.session.execute(
+        select(func.count(distinct(UsageActiveUser.user_id))).where(*active_filters)
+    ).scalar()
+
+    recorded_seconds, sessions, transcriptions, llm_input_tokens, llm_output_tokens = (int(value) for value in row)
+    return {
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'recorded_minutes': round(recorded_seconds / 60, 1),
+        'sessions': sessions,
+        'transcriptions': transcriptions,
+        'llm_input_tokens': llm_input_tokens,
+        'llm_output_tokens': llm_output_tokens,
+        'active_users': active_users
+    }
+
+
+def daily(company_id, since, until=None):
+    """Returns the rollup rows of one company for a date range (inclusive), oldest first."""
+    until = until or datetime.utcnow().date()
+    return UsageRollup.query.filter(
+        UsageRollup.company_id == company_id, UsageRollup.day >= since, UsageRollup.day <= until
+    ).order_by(UsageRollup.day).all()
+
+
+usage_cli = AppGroup('usage', help='Usage rollups.')
+
+
+@usage_cli.command('compact')
+@click.option('--days', type=int, default=COMPACT_DAYS, help='Number of days to recompute.')
+@click.option('--until', help='Last day to recompute (ISO date); defaults to yesterday.')
+def compact_command(days, until):
+    """Recompute usage rollups from the source tables."""
+    compact_recent(days, date.fromisoformat(until) if until else None)
+    click.echo(f"Compacted usage rollups for {days} day(s)")